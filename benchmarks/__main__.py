@@ -0,0 +1,213 @@
+import argparse
+import gc
+import json
+import os
+import random
+import shutil
+import sys
+import tempfile
+import time
+import tracemalloc
+
+from irc import const
+from irc.client import Client
+from irc.handlers import CommandHandler
+from irc.search import SearchIndex, SearchQuery
+from irc.view import BaseView, NullView
+from benchmarks import traffic
+
+
+class RenderView(NullView):
+    def display_server_message(self, message):
+        str(message)
+
+    def display_batch(self, messages: list):
+        for message in messages:
+            str(message)
+
+
+def create_client(encoding: str, view: BaseView) -> Client:
+    client = Client("bench", encoding, {}, view)
+    client.is_connected = True
+    client.hostname = "irc.example.net"
+    client.joined_channels.update(traffic.CHANNELS)
+    client.current_channel = traffic.CHANNELS[0]
+    return client
+
+
+def bench_receive(mix: str, count: int, view_type: type) -> tuple:
+    data, encoding, lines = traffic.generate(mix, count)
+    chunks = traffic.split_chunks(data, const.BUFFER_SIZE)
+    session = create_client(encoding, view_type()).active
+
+    def run():
+        for chunk in chunks:
+            session.handle_data(chunk)
+        return session
+
+    return run, lines
+
+
+def bench_parse(mix: str, count: int) -> tuple:
+    data, encoding, lines = traffic.generate(mix, count)
+    handler = create_client(encoding, NullView()).active.message_handler
+    decoded_lines = data.decode(encoding).split("\r\n")
+
+    def run():
+        get_message = handler.get_message
+        return [get_message(line) for line in decoded_lines]
+
+    return run, lines
+
+
+def bench_commands(count: int) -> tuple:
+    handler = CommandHandler(create_client("utf-8", NullView()))
+    inputs = (traffic.COMMANDS * (count // len(traffic.COMMANDS) + 1))[:count]
+
+    def run():
+        return [handler.get_command(text) for text in inputs]
+
+    return run, count
+
+
+def bench_search(count: int, queries: int = 100) -> tuple:
+    rnd = random.Random(1)
+    directory = tempfile.mkdtemp()
+    index = SearchIndex(os.path.join(directory, "history.db"))
+    rows = [
+        (
+            float(i),
+            "irc.example.net",
+            rnd.choice(traffic.CHANNELS),
+            rnd.choice(traffic.NICKS),
+            traffic.get_text(rnd, traffic.WORDS) + f" token{i}",
+        )
+        for i in range(count)
+    ]
+    index.write_batch(rows)
+    searches = [
+        SearchQuery(f"token{rnd.randrange(count)}") for _ in range(queries)
+    ]
+    searches += [
+        SearchQuery("lorem ipsum", channel=rnd.choice(traffic.CHANNELS))
+        for _ in range(queries)
+    ]
+
+    def run():
+        return [index.search(query) for query in searches]
+
+    def close():
+        index.close()
+        shutil.rmtree(directory)
+
+    return run, len(searches), close
+
+
+def get_benchmarks(count: int) -> dict:
+    benchmarks = {
+        "commands": lambda: bench_commands(count),
+        "search": lambda: bench_search(count),
+    }
+    for mix in traffic.MIXES:
+        benchmarks[f"parse.{mix}"] = lambda m=mix: bench_parse(m, count)
+        benchmarks[f"receive.{mix}"] = lambda m=mix: bench_receive(
+            m, count, NullView
+        )
+        benchmarks[f"render.{mix}"] = lambda m=mix: bench_receive(
+            m, count, RenderView
+        )
+    return benchmarks
+
+
+def measure(factory: callable, repeat: int) -> dict:
+    timings = []
+    for _ in range(repeat):
+        run, lines, *teardown = factory()
+        gc.collect()
+        started = time.perf_counter()
+        run()
+        timings.append(time.perf_counter() - started)
+        for close in teardown:
+            close()
+    best = min(timings)
+
+    run, lines, *teardown = factory()
+    gc.collect()
+    tracemalloc.start()
+    before = tracemalloc.take_snapshot()
+    retained = run()
+    after = tracemalloc.take_snapshot()
+    tracemalloc.stop()
+    for close in teardown:
+        close()
+    stats = after.compare_to(before, "filename")
+    blocks = sum(max(stat.count_diff, 0) for stat in stats)
+    size = sum(max(stat.size_diff, 0) for stat in stats)
+    del retained
+    return {
+        "lines": lines,
+        "lines_per_sec": lines / best,
+        "us_per_line": best / lines * 1e6,
+        "retained_blocks_per_line": blocks / lines,
+        "retained_bytes_per_line": size / lines,
+    }
+
+
+def compare(results: dict, baseline: dict, threshold: float) -> list:
+    regressions = []
+    for name, result in results.items():
+        if name not in baseline:
+            continue
+        old = baseline[name]["us_per_line"]
+        change = (result["us_per_line"] - old) / old * 100
+        result["change"] = change
+        if change > threshold:
+            regressions.append(name)
+    return regressions
+
+
+def print_report(results: dict, regressions: list) -> None:
+    header = f"{'benchmark':<20}{'lines/s':>12}{'us/line':>10}"
+    header += f"{'kept blk/line':>15}{'kept B/line':>13}{'change':>10}"
+    print(header)
+    for name, result in results.items():
+        change = result.get("change")
+        change = f"{change:+.1f}%" if change is not None else "-"
+        mark = "  REGRESSION" if name in regressions else ""
+        print(
+            f"{name:<20}{result['lines_per_sec']:>12.0f}"
+            f"{result['us_per_line']:>10.2f}"
+            f"{result['retained_blocks_per_line']:>15.2f}"
+            f"{result['retained_bytes_per_line']:>13.0f}{change:>10}{mark}"
+        )
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="IRC parser benchmarks")
+    parser.add_argument("-n", "--lines", type=int, default=20000)
+    parser.add_argument("-r", "--repeat", type=int, default=5)
+    parser.add_argument("-k", "--filter", default="")
+    parser.add_argument("--save", help="write results to a baseline file")
+    parser.add_argument("--compare", help="compare with a baseline file")
+    parser.add_argument("--threshold", type=float, default=10.0)
+    args = parser.parse_args()
+
+    results = {}
+    for name, factory in get_benchmarks(args.lines).items():
+        if args.filter in name:
+            results[name] = measure(factory, args.repeat)
+
+    regressions = []
+    if args.compare:
+        with open(args.compare) as file:
+            regressions = compare(results, json.load(file), args.threshold)
+    print_report(results, regressions)
+
+    if args.save:
+        with open(args.save, "w") as file:
+            json.dump(results, file, indent=2)
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
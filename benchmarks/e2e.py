@@ -0,0 +1,109 @@
+import argparse
+import contextlib
+import os
+import sys
+import time
+
+from irc.cli.view import CliView
+from irc.client import Client
+from irc.engine import AsyncEngine
+from irc.testing.fake_server import FakeIrcServer
+
+CHANNEL = "#load"
+
+
+class LatencyView(CliView):
+    def __init__(self):
+        self.received = 0
+        self.latencies = []
+        self.first_at = None
+        self.last_at = None
+
+    def display_server_message(self, message):
+        super().display_server_message(message)
+        params = message.line.params if message.line else ()
+        if len(params) == 2 and params[0] == CHANNEL:
+            sent_at = float(params[1].split(" ", 2)[1])
+            self.last_at = time.monotonic()
+            if self.first_at is None:
+                self.first_at = self.last_at
+            self.latencies.append(self.last_at - sent_at)
+            self.received += 1
+
+
+def percentile(values: list, share: float) -> float:
+    if not values:
+        return float("nan")
+    values = sorted(values)
+    return values[min(int(len(values) * share), len(values) - 1)]
+
+
+def run_rate(server_engine, server, client, rate: float, count: int) -> dict:
+    view = client.view
+    view.received = 0
+    view.latencies = []
+    view.first_at = view.last_at = None
+    server_engine.run(server.push_traffic(CHANNEL, count, rate))
+    deadline = time.monotonic() + 30
+    while view.received < count and time.monotonic() < deadline:
+        time.sleep(0.01)
+    elapsed = view.last_at - view.first_at if view.received > 1 else 0
+    return {
+        "target": rate or float("inf"),
+        "received": view.received,
+        "ingested_per_sec": (view.received - 1) / elapsed if elapsed else 0,
+        "p50_ms": percentile(view.latencies, 0.5) * 1000,
+        "p99_ms": percentile(view.latencies, 0.99) * 1000,
+    }
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="End-to-end IRC load test")
+    parser.add_argument("-n", "--lines", type=int, default=20000)
+    parser.add_argument(
+        "--rates",
+        default="1000,5000,20000,50000,0",
+        help="comma separated lines/sec, 0 means as fast as possible",
+    )
+    parser.add_argument("--max-p99", type=float, default=1000.0)
+    args = parser.parse_args()
+
+    server_engine = AsyncEngine()
+    server_engine.start()
+    server = FakeIrcServer(flood_burst=100, flood_rate=100)
+    server_engine.run(server.start())
+    client_engine = AsyncEngine()
+    client_engine.start()
+    client = Client("bench", "utf-8", {}, LatencyView(), client_engine)
+
+    results = []
+    with open(os.devnull, "w") as devnull:
+        with contextlib.redirect_stdout(devnull):
+            client.process_user_input(f"/server 127.0.0.1 {server.port}")
+            client.process_user_input(f"/join {CHANNEL}")
+            server_engine.run(server.wait_for_members(CHANNEL, 1))
+            for rate in map(float, args.rates.split(",")):
+                results.append(
+                    run_rate(server_engine, server, client, rate, args.lines)
+                )
+            client.exit_client()
+    server_engine.run(server.stop())
+    server_engine.stop()
+
+    print(
+        f"{'target/s':>10}{'received':>10}{'ingest/s':>12}"
+        f"{'p50 ms':>10}{'p99 ms':>10}"
+    )
+    for result in results:
+        behind = result["received"] < args.lines
+        behind = behind or result["p99_ms"] > args.max_p99
+        print(
+            f"{result['target']:>10.0f}{result['received']:>10}"
+            f"{result['ingested_per_sec']:>12.0f}{result['p50_ms']:>10.1f}"
+            f"{result['p99_ms']:>10.1f}{'  FALLING BEHIND' if behind else ''}"
+        )
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
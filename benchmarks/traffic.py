@@ -0,0 +1,89 @@
+import random
+
+NICKS = [f"user{i}" for i in range(500)]
+CHANNELS = [f"#channel{i}" for i in range(50)]
+WORDS = "lorem ipsum dolor sit amet consectetur adipiscing elit sed do".split()
+CYRILLIC_WORDS = "привет как дела что нового сегодня хорошая погода".split()
+
+
+def get_source(rnd: random.Random) -> str:
+    nick = rnd.choice(NICKS)
+    return f"{nick}!~{nick}@host-{rnd.randrange(256)}.example.net"
+
+
+def get_text(rnd: random.Random, words: list) -> str:
+    return " ".join(rnd.choice(words) for _ in range(rnd.randint(3, 15)))
+
+
+def chat_lines(rnd: random.Random, count: int, words=WORDS) -> list:
+    lines = []
+    for _ in range(count):
+        kind = rnd.random()
+        source = get_source(rnd)
+        channel = rnd.choice(CHANNELS)
+        if kind < 0.85:
+            text = get_text(rnd, words)
+            lines.append(f":{source} PRIVMSG {channel} :{text}")
+        elif kind < 0.9:
+            lines.append(f":{source} NOTICE {channel} :{get_text(rnd, words)}")
+        elif kind < 0.95:
+            lines.append(f":{source} JOIN :{channel}")
+        else:
+            lines.append(f":{source} PART {channel}")
+    return lines
+
+
+def burst_lines(rnd: random.Random, count: int) -> list:
+    lines = [":irc.example.net 321 bench Channel :Users  Name"]
+    for i in range(count // 2):
+        topic = get_text(rnd, WORDS)
+        users = rnd.randrange(1, 5000)
+        lines.append(f":irc.example.net 322 bench #list{i} {users} :{topic}")
+    for i in range(count - count // 2 - 2):
+        names = " ".join(rnd.choice(("@", "+", "")) + n for n in NICKS[:40])
+        lines.append(f":irc.example.net 353 bench = #names{i} :{names}")
+    lines.append(":irc.example.net 323 bench :End of /LIST")
+    return lines
+
+
+def netsplit_lines(rnd: random.Random, count: int) -> list:
+    lines = []
+    sources = [get_source(rnd) for _ in range(count // 2)]
+    for source in sources:
+        lines.append(f":{source} QUIT :hub.example.net leaf.example.net")
+    for source in sources:
+        lines.append(f":{source} JOIN :{rnd.choice(CHANNELS)}")
+    return lines[:count]
+
+
+def cyrillic_lines(rnd: random.Random, count: int) -> list:
+    return chat_lines(rnd, count, CYRILLIC_WORDS)
+
+
+MIXES = {
+    "chat": (chat_lines, "utf-8"),
+    "burst": (burst_lines, "utf-8"),
+    "netsplit": (netsplit_lines, "utf-8"),
+    "cp1251": (cyrillic_lines, "cp1251"),
+    "koi8_r": (cyrillic_lines, "koi8_r"),
+}
+
+COMMANDS = [
+    "/join #channel",
+    "/pm nick some private text",
+    "/switch #test",
+    "/nick new_nick",
+    "/list",
+    "plain text to the active channel",
+    '/pm nick "quoted text with spaces"',
+]
+
+
+def generate(mix: str, count: int, seed: int = 1) -> tuple:
+    lines_factory, encoding = MIXES[mix]
+    lines = lines_factory(random.Random(seed), count)
+    return "\r\n".join(lines).encode(encoding) + b"\r\n", encoding, len(lines)
+
+
+def split_chunks(data: bytes, size: int) -> list:
+    return [data[i : i + size] for i in range(0, len(data), size)]
@@ -0,0 +1,95 @@
+import argparse
+import logging
+import sys
+
+from irc import const
+
+MODES = ("cli", "gui", "headless", "daemon", "attach")
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(prog="irc", description="IRC-клиент")
+    modes = parser.add_subparsers(dest="mode")
+    cli = modes.add_parser("cli", help="консольный клиент (по умолчанию)")
+    cli.add_argument(
+        "--threaded",
+        action="store_true",
+        help="читать сокеты в отдельном потоке вместо asyncio",
+    )
+    headless = modes.add_parser(
+        "headless", help="выполнить команды без интерактивного ввода"
+    )
+    headless.add_argument(
+        "commands",
+        nargs="*",
+        help="команды клиента; без аргументов читаются из stdin",
+    )
+    headless.add_argument(
+        "--async",
+        dest="use_async",
+        action="store_true",
+        help="обслуживать сеть через asyncio",
+    )
+    headless.add_argument(
+        "--wait",
+        action="store_true",
+        help="не завершаться после выполнения команд",
+    )
+    daemon = modes.add_parser(
+        "daemon", help="держать подключения в фоне для команды attach"
+    )
+    daemon.add_argument(
+        "commands", nargs="*", help="команды, выполняемые при запуске"
+    )
+    daemon.add_argument(
+        "--async",
+        dest="use_async",
+        action="store_true",
+        help="обслуживать сеть через asyncio",
+    )
+    attach = modes.add_parser(
+        "attach", help="подключиться к запущенному демону"
+    )
+    attach.add_argument(
+        "--name",
+        default=const.DAEMON_FRONTEND,
+        help="имя клиента, по которому демон помнит прочитанное",
+    )
+    attach.add_argument(
+        "--gui", action="store_true", help="открыть графический клиент"
+    )
+    for mode in (daemon, attach):
+        mode.add_argument(
+            "--socket",
+            default=const.DAEMON_SOCKET,
+            help="путь к Unix-сокету демона",
+        )
+    for mode in (cli, headless, daemon):
+        mode.add_argument("--capture", help="записывать трафик в файл")
+    modes.add_parser("gui", help="графический клиент")
+    return parser
+
+
+def main(argv: list = None) -> None:
+    argv = sys.argv[1:] if argv is None else argv
+    if not argv or argv[0] not in MODES and argv[0] not in ("-h", "--help"):
+        argv = ["cli"] + argv
+    args = build_parser().parse_args(argv)
+    logging.basicConfig(level=logging.ERROR)
+    if args.mode == "gui":
+        from irc.gui.__main__ import main as run
+    elif args.mode == "headless":
+        from irc.cli.app import run_headless as run
+    elif args.mode == "daemon":
+        from irc.cli.app import run_daemon as run
+    elif args.mode == "attach" and args.gui:
+        from irc.gui.__main__ import attach as run
+    elif args.mode == "attach":
+        from irc.cli.app import run_attach as run
+    else:
+        from irc.cli.app import run
+    run(args)
+
+
+if __name__ == "__main__":
+    main()
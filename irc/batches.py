@@ -0,0 +1,53 @@
+from irc import const
+
+
+class Batch:
+    __slots__ = ("reference", "type", "params", "parent", "messages")
+
+    def __init__(self, reference: str, params: list, parent: str = None):
+        self.reference = reference
+        self.type = params[0].lower() if params else ""
+        self.params = params[1:]
+        self.parent = parent
+        self.messages = []
+
+
+class BatchCollector:
+    def __init__(self, max_size: int = const.BATCH_MAX_SIZE):
+        self.max_size = max_size
+        self.open = {}
+
+    def reset(self) -> None:
+        self.open = {}
+
+    def feed(self, message) -> list:
+        line = message.line
+        reference = line.tags.get("batch") if line.tags else None
+        if line.command == "BATCH":
+            return self.on_batch(line.params, reference)
+
+        batch = self.open.get(reference)
+        if batch is None:
+            return [message]
+        batch.messages.append(message)
+        if len(batch.messages) >= self.max_size and batch.parent is None:
+            ready, batch.messages = batch.messages, []
+            return ready
+        return []
+
+    def on_batch(self, params: list, parent: str) -> list:
+        if not params or len(params[0]) < 2:
+            return []
+        sign, reference = params[0][0], params[0][1:]
+        if sign == "+":
+            self.open[reference] = Batch(reference, params[1:], parent)
+            return []
+
+        batch = self.open.pop(reference, None)
+        if batch is None:
+            return []
+        outer = self.open.get(batch.parent)
+        if outer is not None:
+            outer.messages.extend(batch.messages)
+            return []
+        return batch.messages
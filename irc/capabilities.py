@@ -0,0 +1,75 @@
+import logging
+
+from irc.models.line import IrcLine
+
+logger = logging.getLogger(__name__)
+
+WANTED_CAPS = {
+    "message-tags",
+    "server-time",
+    "batch",
+    "echo-message",
+    "multi-prefix",
+    "draft/chathistory",
+}
+
+
+class CapNegotiator:
+    def __init__(self, client):
+        self.client = client
+        self.available = {}
+        self.enabled = set()
+        self.is_negotiating = False
+
+    def reset(self) -> None:
+        self.available = {}
+        self.enabled = set()
+        self.is_negotiating = False
+
+    def start(self) -> str:
+        self.reset()
+        self.is_negotiating = True
+        return "CAP LS 302"
+
+    def on_cap(self, line: IrcLine) -> None:
+        if len(line.params) < 3:
+            return
+        subcommand = line.params[1].upper()
+        caps = line.params[-1].split()
+        if subcommand in ("LS", "NEW"):
+            for cap in caps:
+                name, _, value = cap.partition("=")
+                self.available[name] = value
+            is_last = subcommand == "NEW" or line.params[2] != "*"
+            if is_last:
+                self.request(set(self.available) - self.enabled)
+        elif subcommand == "ACK":
+            for cap in caps:
+                if cap.startswith("-"):
+                    self.enabled.discard(cap[1:])
+                else:
+                    self.enabled.add(cap)
+            logger.info(f"Enabled capabilities: {' '.join(self.enabled)}")
+            self.end()
+        elif subcommand == "NAK":
+            logger.info(f"Server rejected capabilities: {' '.join(caps)}")
+            self.end()
+        elif subcommand == "DEL":
+            for cap in caps:
+                self.available.pop(cap, None)
+                self.enabled.discard(cap)
+
+    def request(self, caps: set) -> None:
+        wanted = WANTED_CAPS & caps
+        if wanted:
+            self.send(f"CAP REQ :{' '.join(sorted(wanted))}")
+        else:
+            self.end()
+
+    def end(self) -> None:
+        if self.is_negotiating:
+            self.is_negotiating = False
+            self.send("CAP END")
+
+    def send(self, text: str) -> None:
+        self.client.send(f"{text}\r\n".encode(self.client.code_page))
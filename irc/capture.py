@@ -0,0 +1,59 @@
+import struct
+import threading
+import time
+
+MAGIC = b"IRCCAP1\n"
+RECORD = struct.Struct("<BdHI")
+
+OPEN = 0
+RECEIVED = 1
+SENT = 2
+
+FLUSH_INTERVAL = 1
+
+
+class CaptureWriter:
+    def __init__(self, path: str):
+        self.path = path
+        self._file = open(path, "wb")
+        self._file.write(MAGIC)
+        self._lock = threading.Lock()
+        self._streams = 0
+        self._flushed_at = time.monotonic()
+
+    def open_stream(self, hostname: str, encoding: str) -> int:
+        with self._lock:
+            self._streams += 1
+            stream_id = self._streams
+        self.write(OPEN, stream_id, f"{hostname} {encoding}".encode())
+        return stream_id
+
+    def write(self, kind: int, stream_id: int, data: bytes) -> None:
+        now = time.monotonic()
+        with self._lock:
+            if self._file.closed:
+                return
+            self._file.write(RECORD.pack(kind, now, stream_id, len(data)))
+            self._file.write(data)
+            if now - self._flushed_at >= FLUSH_INTERVAL:
+                self._file.flush()
+                self._flushed_at = now
+
+    def close(self) -> None:
+        with self._lock:
+            self._file.close()
+
+
+def read_capture(path: str):
+    with open(path, "rb") as file:
+        if file.read(len(MAGIC)) != MAGIC:
+            raise ValueError(f"{path} is not a traffic capture")
+        while True:
+            header = file.read(RECORD.size)
+            if len(header) < RECORD.size:
+                return
+            kind, timestamp, stream_id, length = RECORD.unpack(header)
+            data = file.read(length)
+            if len(data) < length:
+                return
+            yield kind, timestamp, stream_id, data
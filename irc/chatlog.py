@@ -0,0 +1,142 @@
+import collections
+import datetime
+import gzip
+import os
+import re
+import shutil
+import time
+
+from irc import const
+from irc.writer import BackgroundWriter
+
+SERVER_LOG = "server"
+UNSAFE_CHARS = re.compile(r"[^\w#&+.-]")
+
+
+def safe_name(name: str) -> str:
+    name = UNSAFE_CHARS.sub("_", name.lower()).lstrip(".")
+    return name or "_"
+
+
+def compress(path: str) -> None:
+    with open(path, "rb") as source, gzip.open(path + ".gz", "wb") as target:
+        shutil.copyfileobj(source, target)
+    os.remove(path)
+
+
+class LogFile:
+    def __init__(self, directory: str, max_size: int):
+        self.directory = directory
+        self.max_size = max_size
+        self.file = None
+        self.day = None
+        self.size = 0
+        self.is_dirty = False
+        os.makedirs(directory, exist_ok=True)
+
+    @property
+    def path(self) -> str:
+        return os.path.join(self.directory, f"{self.day}.log")
+
+    def write(self, day: datetime.date, text: str) -> None:
+        if day != self.day:
+            self.close()
+            self.day = day
+            self.compress_old_segments()
+        elif self.size >= self.max_size:
+            self.rotate()
+        if self.file is None:
+            self.file = open(self.path, "a", encoding="utf-8")
+            self.size = self.file.tell()
+        data = text + "\n"
+        self.file.write(data)
+        self.size += len(data.encode("utf-8"))
+        self.is_dirty = True
+
+    def flush(self, sync: bool) -> None:
+        if self.file is None or not self.is_dirty:
+            return
+        self.file.flush()
+        if sync:
+            os.fsync(self.file.fileno())
+            self.is_dirty = False
+
+    def rotate(self) -> None:
+        self.close()
+        index = 1
+        while os.path.exists(self.segment_path(index) + ".gz"):
+            index += 1
+        os.replace(self.path, self.segment_path(index))
+        compress(self.segment_path(index))
+
+    def segment_path(self, index: int) -> str:
+        return os.path.join(self.directory, f"{self.day}.{index}.log")
+
+    def compress_old_segments(self) -> None:
+        current = os.path.basename(self.path)
+        for name in os.listdir(self.directory):
+            if name.endswith(".log") and name != current:
+                compress(os.path.join(self.directory, name))
+
+    def close(self) -> None:
+        if self.file is not None:
+            self.flush(True)
+            self.file.close()
+            self.file = None
+
+
+class ChatLogger(BackgroundWriter):
+    name = "chat-log"
+
+    def __init__(
+        self,
+        directory: str,
+        max_size: int = const.LOG_MAX_SIZE,
+        queue_size: int = const.LOG_QUEUE_SIZE,
+        fsync_interval: float = const.LOG_FSYNC_INTERVAL,
+        open_files: int = const.LOG_OPEN_FILES,
+    ):
+        super().__init__(queue_size, fsync_interval)
+        self.directory = directory
+        self.max_size = max_size
+        self.open_files = open_files
+        self._files = collections.OrderedDict()
+        self.start()
+
+    def write(
+        self, network: str, target: str, message, timestamp: float = None
+    ) -> None:
+        timestamp = timestamp or time.time()
+        self.put((timestamp, network, target or SERVER_LOG, message))
+
+    def write_batch(self, batch: list) -> None:
+        for timestamp, network, target, message in batch:
+            moment = datetime.datetime.fromtimestamp(timestamp)
+            log_file = self._get_file(network, target)
+            log_file.write(moment.date(), f"[{moment:%H:%M:%S}] {message}")
+        for log_file in self._files.values():
+            log_file.flush(False)
+
+    def sync(self) -> None:
+        for log_file in self._files.values():
+            log_file.flush(True)
+
+    def finish(self) -> None:
+        for log_file in self._files.values():
+            log_file.close()
+
+    def _get_file(self, network: str, target: str) -> LogFile:
+        key = network, target
+        log_file = self._files.get(key)
+        if log_file is not None:
+            self._files.move_to_end(key)
+            return log_file
+        if len(self._files) >= self.open_files:
+            _, oldest = self._files.popitem(last=False)
+            oldest.close()
+        directory = os.path.join(
+            self.directory, safe_name(network), safe_name(target)
+        )
+        log_file = LogFile(directory, self.max_size)
+        self._files[key] = log_file
+        return log_file
@@ -0,0 +1,144 @@
+import logging
+import signal
+import sys
+import threading
+import time
+
+from irc import const, errors
+from irc.cli.view import CliView
+from irc.client import Client
+from irc.config import ClientConfig
+
+logger = logging.getLogger(__name__)
+
+
+def create_client(args, use_engine: bool, view=None) -> Client:
+    config = ClientConfig.get_parser()
+    settings = ClientConfig.get_settings(config)
+    if args.capture:
+        settings["capture_path"] = args.capture
+    engine = None
+    if use_engine:
+        from irc.engine import AsyncEngine
+
+        engine = AsyncEngine()
+        engine.start()
+    return Client(
+        config["Settings"]["nickname"],
+        config["Settings"]["codepage"],
+        dict(config["Servers"]),
+        view or CliView(),
+        engine,
+        **settings,
+    )
+
+
+def wait_until(predicate: callable, timeout: float) -> bool:
+    deadline = time.monotonic() + timeout
+    while not predicate() and time.monotonic() < deadline:
+        time.sleep(const.POLL_INTERVAL)
+    return predicate()
+
+
+def run(args) -> None:
+    try:
+        client = create_client(args, not args.threaded)
+        input_thread = None
+        if not client.engine:
+            input_thread = threading.Thread(target=client.wait_for_response)
+            input_thread.start()
+        logger.info("Starting client...")
+        while client.is_working:
+            client.process_user_input(input())
+        if input_thread:
+            input_thread.join()
+    except errors.ApiError as e:
+        logger.error(f"Client exception caught - {str(e)}")
+    except Exception as e:
+        logger.exception(f"Caught exception of type - {type(e)}:")
+    finally:
+        exit()
+
+
+def is_settled(client: Client) -> bool:
+    if client.is_connected and not client.is_registered:
+        return False
+    sessions = list(client.sessions.values())
+    return not any(session.send_queue.depth for session in sessions)
+
+
+def start_network(client: Client) -> None:
+    if not client.engine:
+        threading.Thread(target=client.wait_for_response, daemon=True).start()
+
+
+def run_commands(client: Client, commands) -> None:
+    for text in commands:
+        client.process_user_input(text)
+        if not client.is_working:
+            return
+        wait_until(lambda: is_settled(client), const.CONNECT_TIMEOUT)
+
+
+def run_headless(args) -> None:
+    client = create_client(args, args.use_async)
+    start_network(client)
+    commands = args.commands or (line.rstrip("\n") for line in sys.stdin)
+    try:
+        run_commands(client, commands)
+        if args.wait and client.is_working:
+            threading.Event().wait()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        if client.is_working:
+            client.exit_client()
+
+
+def run_daemon(args) -> None:
+    from irc.daemon import BroadcastView, Daemon
+
+    signal.signal(signal.SIGTERM, signal.default_int_handler)
+    daemon = None
+    client = None
+    try:
+        client = create_client(args, args.use_async, BroadcastView())
+        daemon = Daemon(client, args.socket)
+        daemon.start()
+        start_network(client)
+        run_commands(client, args.commands)
+        while client.is_working:
+            time.sleep(const.POLL_INTERVAL)
+    except errors.ApiError as e:
+        logger.error(f"Client exception caught - {str(e)}")
+    except KeyboardInterrupt:
+        pass
+    finally:
+        if daemon:
+            daemon.close()
+        if client and client.is_working:
+            client.exit_client()
+
+
+def run_attach(args) -> None:
+    from irc.daemon import DETACH_COMMANDS, RemoteClient
+
+    try:
+        client = RemoteClient(CliView(), args.socket, args.name)
+    except errors.ApiError as e:
+        logger.error(f"Client exception caught - {str(e)}")
+        return
+    receiver = threading.Thread(target=client.receive, daemon=True)
+    receiver.start()
+    client.attach()
+    try:
+        for line in sys.stdin:
+            text = line.rstrip("\n")
+            if text.strip() in DETACH_COMMANDS:
+                break
+            client.process_user_input(text)
+    except (KeyboardInterrupt, OSError):
+        pass
+    finally:
+        client.detach()
+        receiver.join(const.CONNECT_TIMEOUT)
@@ -1,15 +1,26 @@
+import typing
 from irc.view import BaseView
-from irc.models.messages import ServerMessage
+
+if typing.TYPE_CHECKING:
+    from irc.models.messages import ServerMessage
 
 
 class CliView(BaseView):
-    def display_server_message(self, message: ServerMessage):
+    def display_server_message(self, message: "ServerMessage"):
         if message:
             print(message)
 
+    def display_batch(self, messages: list):
+        print("\n".join(map(str, messages)))
+
     def display_chat_text(self, text: str):
         if text:
             print(text)
 
-    def display_channel(self, channel: str):
+    def display_channel(
+        self, hostname: str, channel: str, users: int, topic: str
+    ):
+        pass
+
+    def display_lag(self, lag: float):
         pass
@@ -1,50 +1,221 @@
-import socket
-import time
+import selectors
 import logging
 
 from irc import const
-from irc.handlers import CommandHandler, MessageHandler
+from irc.handlers import CommandHandler
+from irc.resolver import Resolver
+from irc.servers import split_server
+from irc.session import Session
 from irc.view import BaseView
 
 logger = logging.getLogger(__name__)
 
 
+def session_attribute(name: str) -> property:
+    def getter(client):
+        return getattr(client.active, name)
+
+    def setter(client, value):
+        setattr(client.active, name, value)
+
+    return property(getter, setter)
+
+
 class Client:
+    sock = session_attribute("sock")
+    connection = session_attribute("connection")
+    nickname = session_attribute("nickname")
+    prev_nick = session_attribute("prev_nick")
+    preferred_nick = session_attribute("preferred_nick")
+    hostname = session_attribute("hostname")
+    joined_channels = session_attribute("joined_channels")
+    current_channel = session_attribute("current_channel")
+    members = session_attribute("members")
+    capabilities = session_attribute("capabilities")
+    is_connected = session_attribute("is_connected")
+    is_registered = session_attribute("is_registered")
+    keepalive = session_attribute("keepalive")
+    metrics = session_attribute("metrics")
+
     def __init__(
-        self, nickname: str, encoding: str, favourites: dict, view: BaseView
+        self,
+        nickname: str,
+        encoding: str,
+        favourites: dict,
+        view: BaseView,
+        engine=None,
+        ping_interval: float = const.PING_INTERVAL,
+        ping_timeout: float = const.PING_TIMEOUT,
+        flood_burst: float = const.FLOOD_BURST,
+        flood_rate: float = const.FLOOD_RATE,
+        send_queue_size: int = const.SEND_QUEUE_SIZE,
+        capture_path: str = None,
+        log_dir: str = None,
+        log_max_size: int = const.LOG_MAX_SIZE,
+        search_path: str = None,
+        reconnect_delay: float = const.RECONNECT_DELAY,
+        reconnect_max_delay: float = const.RECONNECT_MAX_DELAY,
+        tls_verify: bool = True,
+        tls_ca: str = None,
+        tls_cert: str = None,
+        tls_key: str = None,
+        metrics_port: int = None,
+        state_path: str = None,
     ):
-        self.sock = socket.socket()
+        self.engine = engine
         self.favourites = favourites
-        self.nickname = nickname
-        self.prev_nick = nickname
         self.code_page = encoding
-        self.hostname = None
         self.view = view
-        self.joined_channels = set()
-        self.current_channel = None
-        self.is_connected = False
+        self.ping_interval = ping_interval
+        self.ping_timeout = ping_timeout
+        self.flood_burst = flood_burst
+        self.flood_rate = flood_rate
+        self.send_queue_size = send_queue_size
+        self.reconnect_delay = reconnect_delay
+        self.reconnect_max_delay = reconnect_max_delay
+        self.capture = None
+        if capture_path:
+            from irc.capture import CaptureWriter
+
+            self.capture = CaptureWriter(capture_path)
+        self.chat_log = None
+        if log_dir:
+            from irc.chatlog import ChatLogger
+
+            self.chat_log = ChatLogger(log_dir, log_max_size)
+        self.search_index = None
+        if search_path:
+            from irc.search import SearchIndex
+
+            self.search_index = SearchIndex(search_path)
+        self.state = None
+        if state_path:
+            from irc.state import StateStore
+
+            self.state = StateStore(state_path)
         self.is_working = True
+        self.history_marks = {}
+        self.resolver = Resolver()
+        self.tls_settings = (tls_verify, tls_ca, tls_cert, tls_key)
+        self._tls = None
+        self.sessions = {}
+        self.active = Session(self, nickname)
+        self.metrics_server = None
+        if metrics_port is not None:
+            from irc.metrics import MetricsServer
+
+            self.metrics_server = MetricsServer(
+                self, const.METRICS_HOST, metrics_port
+            )
+            self.metrics_server.start()
         self.command_handler = CommandHandler(self)
 
+    @property
+    def tls(self):
+        if self._tls is None:
+            from irc.tls import TlsContexts
+
+            self._tls = TlsContexts(*self.tls_settings)
+        return self._tls
+
     def process_user_input(self, text: str) -> None:
         command = self.command_handler.get_command(text)
         execution_result = command().encode(self.code_page)
-        if self.is_connected:
-            self.sock.sendall(execution_result)
+        if self.is_connected and execution_result:
+            self.send(execution_result)
         self.view.display_chat_text(command.output)
+        if self.is_working:
+            self.save_state()
+
+    def connect(self, hostname: str, port: int, is_tls: bool = False) -> None:
+        session = self.active
+        if session.is_connected or session.is_reconnecting or session.hostname:
+            session = Session(self, session.preferred_nick)
+        session.connect(hostname, port, is_tls)
+        self.sessions[session.hostname] = session
+        self.active = session
+
+    def save_state(self) -> None:
+        if not self.state:
+            return
+        servers = dict(self.favourites)
+        for hostname, session in list(self.sessions.items()):
+            entry = self.find_favourite(hostname)
+            if entry:
+                servers[entry] = ",".join(sorted(session.joined_channels))
+        self.state.save(
+            {
+                "nickname": self.preferred_nick,
+                "codepage": self.code_page,
+                "servers": servers,
+            }
+        )
+
+    def find_favourite(self, hostname: str) -> str:
+        for entry in self.favourites:
+            if split_server(entry)[0] == hostname.lower():
+                return entry
+        return None
+
+    def switch_session(self, hostname: str) -> None:
+        self.active = self.sessions[hostname]
+
+    def remove_session(self, session: Session) -> None:
+        if self.sessions.get(session.hostname) is session:
+            del self.sessions[session.hostname]
+        if session is self.active:
+            remaining = list(self.sessions.values())
+            if remaining:
+                self.active = remaining[0]
+            else:
+                self.active = Session(self, session.preferred_nick)
+
+    def send(self, data: bytes) -> None:
+        self.active.send(data)
+
+    def disconnect(self) -> None:
+        session = self.active
+        self.remove_session(session)
+        session.disconnect()
 
     def wait_for_response(self) -> None:
-        handler = MessageHandler(self)
-        while self.is_working:
-            time.sleep(0.1)
-            while self.is_connected:
-                raw_data = self.sock.recv(const.BUFFER_SIZE)
-                decoded_data = raw_data.decode(self.code_page)
-                for msg in handler.get_messages(decoded_data):
-                    self.view.display_server_message(msg)
+        with selectors.DefaultSelector() as selector:
+            while self.is_working:
+                self._update_selector(selector)
+                events = selector.select(const.POLL_INTERVAL)
+                for key, _ in events:
+                    if key.data.is_connected:
+                        key.data.receive()
+
+    def _update_selector(self, selector: selectors.BaseSelector) -> None:
+        connected = {}
+        for session in list(self.sessions.values()):
+            if session.is_connected:
+                connected[session.sock] = session
+                session.keepalive.check()
+                if session.send_queue.depth:
+                    session.flush()
+
+        for key in list(selector.get_map().values()):
+            if connected.pop(key.fileobj, None) is not key.data:
+                selector.unregister(key.fileobj)
+        for sock, session in connected.items():
+            selector.register(sock, selectors.EVENT_READ, session)
 
     def exit_client(self) -> None:
         self.is_working = False
-        if self.is_connected:
-            self.is_connected = False
-            self.sock.shutdown(socket.SHUT_WR)
+        for session in list(self.sessions.values()):
+            session.disconnect()
+        if self.engine:
+            self.engine.stop()
+        if self.capture:
+            self.capture.close()
+        if self.chat_log:
+            self.chat_log.close()
+        if self.search_index:
+            self.search_index.close()
+        if self.state:
+            self.save_state()
+            self.state.close()
+        if self.metrics_server:
+            self.metrics_server.close()
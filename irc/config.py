@@ -2,7 +2,6 @@ import os
 
 from configparser import ConfigParser
 from irc import const, errors
-from irc.client import Client
 
 
 class ClientConfig:
@@ -12,7 +11,7 @@ class ClientConfig:
         if not os.path.exists(const.CONFIG_PATH):
             raise errors.ConfigNotFoundError(os.getcwd())
 
-        current_config.read(const.CONFIG_PATH)
+        current_config.read(const.CONFIG_PATH, encoding="utf-8")
         if not current_config.has_section(
             "Settings"
         ) or not current_config.has_section("Servers"):
@@ -21,14 +20,40 @@ class ClientConfig:
         return current_config
 
     @staticmethod
-    def refresh_file(client: Client):
-        config = ClientConfig.get_parser()
-        config["Settings"]["nickname"] = client.nickname
-        config["Settings"]["codepage"] = client.code_page
-        config["Servers"].update(client.favourites)
-        if client.hostname in client.favourites:
-            channels = ",".join(client.joined_channels)
-            config["Servers"][client.hostname] = channels
-
-        with open(const.CONFIG_PATH, "w") as file:
-            config.write(file)
+    def get_settings(config: ConfigParser) -> dict:
+        settings = config["Settings"]
+        return {
+            "ping_interval": settings.getfloat(
+                "ping_interval", const.PING_INTERVAL
+            ),
+            "ping_timeout": settings.getfloat(
+                "ping_timeout", const.PING_TIMEOUT
+            ),
+            "flood_burst": settings.getfloat("flood_burst", const.FLOOD_BURST),
+            "flood_rate": settings.getfloat("flood_rate", const.FLOOD_RATE),
+            "send_queue_size": settings.getint(
+                "send_queue_size", const.SEND_QUEUE_SIZE
+            ),
+            "capture_path": settings.get("capture") or None,
+            "log_dir": settings.get("log_dir") or None,
+            "log_max_size": settings.getint(
+                "log_max_size", const.LOG_MAX_SIZE
+            ),
+            "search_path": settings.get("search_db") or None,
+            "reconnect_delay": settings.getfloat(
+                "reconnect_delay", const.RECONNECT_DELAY
+            ),
+            "reconnect_max_delay": settings.getfloat(
+                "reconnect_max_delay", const.RECONNECT_MAX_DELAY
+            ),
+            "tls_verify": settings.getboolean("tls_verify", True),
+            "tls_ca": settings.get("tls_ca") or None,
+            "tls_cert": settings.get("tls_cert") or None,
+            "tls_key": settings.get("tls_key") or None,
+            "state_path": const.CONFIG_PATH,
+            "metrics_port": (
+                settings.getint("metrics_port")
+                if settings.get("metrics_port")
+                else None
+            ),
+        }
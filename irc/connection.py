@@ -0,0 +1,191 @@
+import asyncio
+import logging
+import socket
+import time
+
+from irc import capture, const
+from irc.engine import AsyncEngine
+
+logger = logging.getLogger(__name__)
+
+
+class AsyncConnection:
+    def __init__(self, client, engine: AsyncEngine):
+        self._client = client
+        self._engine = engine
+        self._reader = None
+        self._writer = None
+        self._reader_task = None
+        self._keepalive_task = None
+        self._writer_task = None
+        self._wakeup = None
+
+    @property
+    def ssl_object(self):
+        if self._writer:
+            return self._writer.get_extra_info("ssl_object")
+        return None
+
+    def open(self, hostname: str, port: int, context=None) -> None:
+        self._engine.run(self._open(hostname, port, context))
+
+    def wake_writer(self) -> None:
+        if self._wakeup:
+            self._engine.call_soon(self._wakeup.set)
+
+    def close(self) -> None:
+        future = self._engine.submit(self._close())
+        if not self._engine.in_loop_thread():
+            future.result()
+
+    async def _open(self, hostname: str, port: int, context) -> None:
+        try:
+            sock = await asyncio.wait_for(
+                self._connect(hostname, port), const.CONNECT_TIMEOUT
+            )
+        except asyncio.TimeoutError:
+            raise socket.timeout(f"Connection to {hostname} timed out")
+        if context:
+            await self._start_tls(sock, context, hostname)
+        else:
+            self._reader, self._writer = await asyncio.open_connection(
+                sock=sock
+            )
+        self._wakeup = asyncio.Event()
+        self._wakeup.set()
+        self._writer_task = asyncio.ensure_future(self._write_loop())
+        self._reader_task = asyncio.ensure_future(self._read_loop())
+        self._keepalive_task = asyncio.ensure_future(self._keepalive_loop())
+
+    async def _connect(self, hostname: str, port: int) -> socket.socket:
+        loop = asyncio.get_running_loop()
+        resolver = self._client.resolver
+        addresses = await resolver.resolve_async(hostname, port, loop)
+        return await connect_staggered_async(
+            addresses, self._client.on_connect_attempt
+        )
+
+    async def _start_tls(self, sock, context, hostname: str) -> None:
+        started = time.monotonic()
+        try:
+            self._reader, self._writer = await asyncio.open_connection(
+                sock=sock,
+                ssl=context,
+                server_hostname=hostname,
+                ssl_handshake_timeout=const.CONNECT_TIMEOUT,
+            )
+        except BaseException:
+            sock.close()
+            raise
+        elapsed = time.monotonic() - started
+        self._client.on_tls_handshake(self.ssl_object, elapsed)
+
+    async def _read_loop(self) -> None:
+        while True:
+            try:
+                raw_data = await self._reader.read(const.BUFFER_SIZE)
+            except OSError as e:
+                logger.info(f"Connection lost by reason - {str(e)}")
+                break
+            if not raw_data:
+                break
+            try:
+                self._client.handle_data(raw_data)
+            except Exception:
+                logger.exception("Failed to handle received data:")
+        self._keepalive_task.cancel()
+        self._writer_task.cancel()
+        self._client.on_connection_lost()
+
+    async def _keepalive_loop(self) -> None:
+        delay = self._client.keepalive.check()
+        while delay is not None:
+            await asyncio.sleep(delay)
+            delay = self._client.keepalive.check()
+
+    async def _write_loop(self) -> None:
+        send_queue = self._client.send_queue
+        while True:
+            await self._wakeup.wait()
+            self._wakeup.clear()
+            data, delay = send_queue.pop_batch()
+            while data or delay is not None:
+                if data:
+                    self._writer.write(data)
+                    self._client.record(capture.SENT, data)
+                    await self._writer.drain()
+                elif delay:
+                    try:
+                        await asyncio.wait_for(self._wakeup.wait(), delay)
+                        self._wakeup.clear()
+                    except asyncio.TimeoutError:
+                        pass
+                data, delay = send_queue.pop_batch()
+
+    async def _close(self) -> None:
+        if self._writer and not self._writer.is_closing():
+            data, _ = self._client.send_queue.pop_batch()
+            if data:
+                self._writer.write(data)
+                self._client.record(capture.SENT, data)
+        tasks = (self._reader_task, self._keepalive_task, self._writer_task)
+        for task in tasks:
+            if task and task is not asyncio.current_task():
+                task.cancel()
+        if self._writer and not self._writer.is_closing():
+            self._writer.close()
+            try:
+                await asyncio.wait_for(
+                    self._writer.wait_closed(), const.CONNECT_TIMEOUT
+                )
+            except (OSError, asyncio.TimeoutError):
+                pass
+
+
+async def connect_staggered_async(
+    addresses: list,
+    on_attempt: callable,
+    delay: float = const.HAPPY_EYEBALLS_DELAY,
+) -> socket.socket:
+    loop = asyncio.get_running_loop()
+
+    async def attempt(family, type_, proto, _, sockaddr) -> socket.socket:
+        sock = socket.socket(family, type_, proto)
+        sock.setblocking(False)
+        try:
+            await loop.sock_connect(sock, sockaddr)
+        except BaseException:
+            sock.close()
+            raise
+        return sock
+
+    candidates = iter(addresses)
+    pending = set()
+    errors = []
+    winner = None
+    try:
+        while winner is None:
+            address = next(candidates, None)
+            if address is not None:
+                on_attempt(address[4])
+                pending.add(asyncio.ensure_future(attempt(*address)))
+            elif not pending:
+                break
+            done, pending = await asyncio.wait(
+                pending,
+                timeout=delay if address is not None else None,
+                return_when=asyncio.FIRST_COMPLETED,
+            )
+            for task in done:
+                if task.exception():
+                    errors.append(task.exception())
+                elif winner is None:
+                    winner = task.result()
+                else:
+                    task.result().close()
+    finally:
+        for task in pending:
+            task.cancel()
+    if winner is None:
+        raise errors[-1] if errors else OSError("No addresses to connect to")
+    return winner
@@ -1,8 +1,9 @@
 HELP_MESSAGE = "| /add | Добавить текущий сервер в список избранного. | \n\
 | /nick NICKNAME | Сменить ник на NICKNAME. | \n\
 | /pm TARGET TEXT | Отправить сообщение пользователю/каналу/сервис-боту. |\n\
-| /server HOSTNAME [PORT] | Подключиться к серверу по HOSTNAME и PORT. |\n\
+| /server HOST [[+]PORT] [--tls] | Подключиться к серверу (+PORT — TLS). |\n\
 | /disconnect | Отключиться от сервера. |\n\
+| /network [HOSTNAME] | Переключить активную сеть на HOSTNAME. |\n\
 | /chcp CODEPAGE| Изменить текущую кодировку на CODEPAGE. |\n\
 | /fav | Показать список избранных серверов. |\n\
 | /names | Вывести список пользователей на активном канале. |\n\
@@ -10,6 +11,9 @@ HELP_MESSAGE = "| /add | Добавить текущий сервер в спи
 | /join CHANNEL | Присоединиться к каналу CHANNEL. |\n\
 | /leave | Покинуть активный канал. |\n\
 | /switch CHANNEL | Переключить активный канал на CHANNEL. |\n\
+| /lag | Показать задержку до сервера. |\n\
+| /search [#CHANNEL] [net:HOST] [from:NICK] [since:DATE] [until:DATE] TEXT | Поиск по истории. |\n\
+| /stats | Статистика текущего подключения. |\n\
 | /exit | Выход из приложения. |"
 
 CONFIG_PATH = "config.ini"
@@ -17,3 +21,97 @@ CONFIG_PATH = "config.ini"
 BUFFER_SIZE = 4096
 
 CODE_PAGES = {"cp1251", "koi8_r", "cp866", "mac_cyrillic", "iso8859_5"}
+
+DEFAULT_PORT = 6667
+
+TLS_PORT = 6697
+
+CONNECT_TIMEOUT = 10
+
+HAPPY_EYEBALLS_DELAY = 0.25
+
+DNS_CACHE_TTL = 300
+
+DNS_TIMEOUT = 5
+
+MAX_LINE_LENGTH = 16384
+
+PING_INTERVAL = 60
+
+PING_TIMEOUT = 120
+
+POLL_INTERVAL = 0.1
+
+FLOOD_BURST = 5
+
+FLOOD_RATE = 0.5
+
+SEND_QUEUE_SIZE = 1000
+
+SEND_DELAY_THRESHOLD = 0.05
+
+SCROLLBACK = 10000
+
+CHANNEL_PREFIXES = "#&"
+
+GUI_FRAME_INTERVAL = 16
+
+GUI_BATCH_SIZE = 500
+
+GUI_MAX_PENDING = 10000
+
+GUI_DROPPED_TEXT = "[Пропущено строк: {}, окно не успевало их выводить]"
+
+GUI_MEMBERS_INTERVAL = 250
+
+LOG_MAX_SIZE = 10 * 1024 * 1024
+
+LOG_QUEUE_SIZE = 10000
+
+LOG_BATCH_SIZE = 1000
+
+LOG_FSYNC_INTERVAL = 1
+
+LOG_OPEN_FILES = 64
+
+SEARCH_LIMIT = 50
+
+STATE_INTERVAL = 2
+
+STATE_QUEUE_SIZE = 100
+
+METRICS_HOST = "127.0.0.1"
+
+METRICS_SAMPLE_RATE = 16
+
+METRICS_LATENCY_BUCKETS = (
+    0.00001,
+    0.00005,
+    0.0001,
+    0.0005,
+    0.001,
+    0.005,
+    0.01,
+    0.05,
+    0.1,
+)
+
+METRICS_LAG_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30)
+
+BATCH_MAX_SIZE = 10000
+
+CHATHISTORY_LIMIT = 100
+
+RECONNECT_DELAY = 2
+
+RECONNECT_MAX_DELAY = 300
+
+MAX_JOIN_LENGTH = 400
+
+DAEMON_SOCKET = "irc.sock"
+
+DAEMON_BACKLOG = 1000
+
+DAEMON_QUEUE_SIZE = 10000
+
+DAEMON_FRONTEND = "cli"
@@ -0,0 +1,465 @@
+import collections
+import contextlib
+import json
+import logging
+import os
+import socket
+import socketserver
+import threading
+
+from irc import const, errors
+from irc.view import BaseView
+from irc.writer import BackgroundWriter
+
+logger = logging.getLogger(__name__)
+
+DETACH_COMMANDS = ("/detach", "/exit")
+SHUTDOWN_COMMAND = "/shutdown"
+
+
+def encode_event(event: dict) -> bytes:
+    return (json.dumps(event, ensure_ascii=False) + "\n").encode("utf-8")
+
+
+def describe_sessions(client) -> str:
+    lines = []
+    for hostname, session in list(client.sessions.items()):
+        channels = ", ".join(sorted(session.joined_channels))
+        lines.append(f"{hostname}: {channels or 'нет каналов'}")
+    if not lines:
+        return "Демон не подключён ни к одному серверу"
+    return "Демон подключён к " + "; ".join(lines)
+
+
+class Attachment(BackgroundWriter):
+    name = "attachment"
+
+    def __init__(self, sock: socket.socket, frontend: str):
+        super().__init__(const.DAEMON_QUEUE_SIZE, const.POLL_INTERVAL)
+        self.sock = sock
+        self.frontend = frontend
+        self.position = 0
+
+    def send(self, seq: int, data: bytes) -> None:
+        self.put((seq, data))
+
+    def write_batch(self, batch: list) -> None:
+        self.sock.sendall(b"".join(data for _, data in batch))
+        self.position = max(self.position, *(seq for seq, _ in batch))
+
+
+class BroadcastView(BaseView):
+    def __init__(self, backlog_size: int = const.DAEMON_BACKLOG):
+        self.backlog = collections.deque(maxlen=backlog_size)
+        self.attachments = set()
+        self.seq = 0
+        self.client = None
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self._state_lock = threading.Lock()
+        self._state = None
+        self._members = {}
+
+    def publish(self, event: dict, is_stored: bool = True) -> None:
+        with self._lock:
+            seq = 0
+            if is_stored:
+                self.seq += 1
+                seq = self.seq
+            data = encode_event(dict(event, seq=seq))
+            if is_stored:
+                self.backlog.append((seq, data))
+            for attachment in self.attachments:
+                attachment.send(seq, data)
+
+    def subscribe(self, attachment: Attachment, position: int) -> None:
+        self.publish_state()
+        with self._lock:
+            snapshot = [self._state, *self._members.values()]
+            for event in filter(None, snapshot):
+                attachment.send(0, encode_event(dict(event, seq=0)))
+            for seq, data in self.backlog:
+                if seq > position:
+                    attachment.send(seq, data)
+            attachment.position = max(attachment.position, position)
+            self.attachments.add(attachment)
+
+    def unsubscribe(self, attachment: Attachment) -> None:
+        with self._lock:
+            self.attachments.discard(attachment)
+
+    @contextlib.contextmanager
+    def reply_to(self, attachment: Attachment):
+        self._local.issuer = attachment
+        try:
+            yield
+        finally:
+            self._local.issuer = None
+
+    def publish_state(self) -> None:
+        if self.client is None:
+            return
+        with self._state_lock:
+            for event in self._collect_state():
+                self.publish(event, False)
+
+    def _collect_state(self) -> list:
+        client = self.client
+        sessions = {}
+        versions = {}
+        for hostname, session in list(client.sessions.items()):
+            sessions[hostname] = {
+                "nickname": session.nickname,
+                "joined": sorted(list(session.joined_channels)),
+                "capabilities": sorted(list(session.capabilities.enabled)),
+            }
+            for channel, version in list(session.members.versions.items()):
+                versions[hostname, channel] = session, version
+        state = {
+            "kind": "state",
+            "hostname": client.hostname,
+            "channel": client.current_channel,
+            "sessions": sessions,
+        }
+        events = []
+        if state != self._state:
+            self._state = state
+            events.append(state)
+        for key, (session, version) in versions.items():
+            event = self._members.get(key)
+            if event is None or event["version"] != version:
+                hostname, channel = key
+                event = {
+                    "kind": "members",
+                    "hostname": hostname,
+                    "channel": channel,
+                    "version": version,
+                    "members": session.members.get_members(channel),
+                }
+                self._members[key] = event
+                events.append(event)
+        for key in self._members.keys() - versions.keys():
+            del self._members[key]
+        return events
+
+    def display_chat_text(self, text: str):
+        if not text:
+            return
+        issuer = getattr(self._local, "issuer", None)
+        if issuer is None:
+            self.publish({"kind": "text", "text": text})
+            self.publish_state()
+        else:
+            issuer.send(
+                0, encode_event({"kind": "text", "text": text, "seq": 0})
+            )
+
+    def display_server_message(self, message):
+        if not message:
+            return
+        session = message.client
+        target = message.target
+        self.publish(
+            {
+                "kind": "message",
+                "hostname": session.hostname,
+                "target": target,
+                "joined": target in session.joined_channels,
+                "text": str(message),
+            }
+        )
+        self.publish_state()
+
+    def start_channel_list(self, hostname: str):
+        self.publish({"kind": "list", "hostname": hostname}, False)
+
+    def display_channel(
+        self, hostname: str, channel: str, users: int, topic: str
+    ):
+        if channel:
+            event = {
+                "kind": "channel",
+                "hostname": hostname,
+                "channel": channel,
+                "users": users,
+                "topic": topic,
+            }
+            self.publish(event, False)
+
+    def display_lag(self, lag: float):
+        self.publish({"kind": "lag", "lag": lag}, False)
+
+
+class AttachHandler(socketserver.StreamRequestHandler):
+    def handle(self):
+        daemon = self.server.daemon
+        attachment = None
+        try:
+            for line in self.rfile:
+                request = json.loads(line)
+                if "attach" in request and attachment is None:
+                    attachment = daemon.attach(
+                        self.request, request["attach"], request.get("seq")
+                    )
+                elif "input" in request:
+                    if request["input"].strip() in DETACH_COMMANDS:
+                        break
+                    daemon.process_user_input(
+                        request["input"],
+                        attachment,
+                        request.get("hostname"),
+                        request.get("channel"),
+                    )
+                elif "detach" in request:
+                    break
+        except (OSError, ValueError) as e:
+            logger.warning(f"Dropped frontend connection: {e}")
+        finally:
+            if attachment:
+                daemon.detach(attachment)
+
+
+class Daemon:
+    def __init__(self, client, path: str = const.DAEMON_SOCKET):
+        self.client = client
+        self.view = client.view
+        self.view.client = client
+        self.path = path
+        self.positions = {}
+        self._input_lock = threading.Lock()
+        self._remove_stale_socket()
+        self.server = socketserver.ThreadingUnixStreamServer(
+            path, AttachHandler
+        )
+        self.server.daemon_threads = True
+        self.server.daemon = self
+        os.chmod(path, 0o600)
+        self._thread = threading.Thread(
+            target=self.server.serve_forever, name="daemon", daemon=True
+        )
+
+    def _remove_stale_socket(self) -> None:
+        if not os.path.exists(self.path):
+            return
+        with socket.socket(socket.AF_UNIX) as probe:
+            try:
+                probe.connect(self.path)
+            except OSError:
+                os.unlink(self.path)
+                return
+        raise errors.DaemonRunningError(self.path)
+
+    def start(self) -> None:
+        self._thread.start()
+        logger.info(f"Daemon is listening on {self.path}")
+
+    def attach(self, sock: socket.socket, frontend: str, seq: int = None):
+        attachment = Attachment(sock, frontend)
+        attachment.start()
+        if seq is None:
+            seq = self.positions.get(frontend, 0)
+        status = {"kind": "text", "seq": 0}
+        status["text"] = describe_sessions(self.client)
+        attachment.send(0, encode_event(status))
+        self.view.subscribe(attachment, seq)
+        logger.info(f"Frontend {frontend} attached after #{seq}")
+        return attachment
+
+    def detach(self, attachment: Attachment) -> None:
+        self.view.unsubscribe(attachment)
+        attachment.close()
+        self.positions[attachment.frontend] = attachment.position
+        logger.info(f"Frontend {attachment.frontend} detached")
+
+    def process_user_input(
+        self,
+        text: str,
+        attachment: Attachment = None,
+        hostname: str = None,
+        channel: str = None,
+    ) -> None:
+        client = self.client
+        if text.strip() == SHUTDOWN_COMMAND:
+            text = "/exit"
+        with self._input_lock, self.view.reply_to(attachment):
+            if not client.is_working:
+                return
+            if hostname in client.sessions:
+                client.switch_session(hostname)
+                if channel in client.joined_channels:
+                    client.current_channel = channel
+            client.process_user_input(text)
+        self.view.publish_state()
+
+    def close(self) -> None:
+        self.server.shutdown()
+        self.server.server_close()
+        if os.path.exists(self.path):
+            os.unlink(self.path)
+
+
+class RemoteCapabilities:
+    def __init__(self):
+        self.enabled = set()
+
+
+class RemoteMembers:
+    def __init__(self):
+        self.versions = {}
+        self._members = {}
+
+    def update(self, channel: str, version: int, members: list) -> None:
+        self._members[channel] = members
+        self.versions[channel] = version
+
+    def get_members(self, channel: str) -> list:
+        return self._members.get(channel.lower(), [])
+
+
+class RemoteSession:
+    def __init__(self, hostname: str, joined_channels: set = ()):
+        self.hostname = hostname
+        self.nickname = None
+        self.joined_channels = set(joined_channels)
+        self.capabilities = RemoteCapabilities()
+        self.members = RemoteMembers()
+
+
+class RemoteMessage:
+    def __init__(self, event: dict):
+        target = event["target"]
+        joined = {target} if event["joined"] else set()
+        self.client = RemoteSession(event["hostname"], joined)
+        self.target = target
+        self.text = event["text"]
+
+    def __str__(self):
+        return self.text
+
+
+class RemoteClient:
+    def __init__(
+        self,
+        view: BaseView,
+        path: str = const.DAEMON_SOCKET,
+        frontend: str = const.DAEMON_FRONTEND,
+    ):
+        self.view = view
+        self.path = path
+        self.frontend = frontend
+        self.last_seq = 0
+        self.sessions = {}
+        self.hostname = None
+        self.current_channel = None
+        self.search_index = None
+        self.is_working = True
+        self._daemon_focus = None
+        self.sock = socket.socket(socket.AF_UNIX)
+        try:
+            self.sock.connect(path)
+        except OSError:
+            self.sock.close()
+            raise errors.DaemonNotFoundError(path)
+        self._file = self.sock.makefile("rb")
+
+    @property
+    def active(self) -> RemoteSession:
+        return self.sessions.get(self.hostname) or RemoteSession(None)
+
+    @property
+    def nickname(self) -> str:
+        return self.active.nickname
+
+    @property
+    def joined_channels(self) -> set:
+        return self.active.joined_channels
+
+    @property
+    def capabilities(self) -> RemoteCapabilities:
+        return self.active.capabilities
+
+    def switch_session(self, hostname: str) -> None:
+        self.hostname = hostname
+
+    def request(self, request: dict) -> None:
+        self.sock.sendall(encode_event(request))
+
+    def attach(self, seq: int = None) -> None:
+        self.request({"attach": self.frontend, "seq": seq})
+
+    def process_user_input(self, text: str) -> None:
+        self.request(
+            {
+                "input": text,
+                "hostname": self.hostname,
+                "channel": self.current_channel,
+            }
+        )
+
+    def detach(self) -> None:
+        try:
+            self.request({"detach": True})
+        except OSError:
+            pass
+
+    def exit_client(self) -> None:
+        self.is_working = False
+        self.detach()
+
+    def wait_for_response(self) -> None:
+        self.receive()
+
+    def receive(self) -> None:
+        try:
+            for line in self._file:
+                self.dispatch(json.loads(line))
+        except OSError:
+            pass
+        finally:
+            self.close()
+
+    def dispatch(self, event: dict) -> None:
+        kind = event["kind"]
+        self.last_seq = max(self.last_seq, event["seq"])
+        if kind == "text":
+            self.view.display_chat_text(event["text"])
+        elif kind == "message":
+            self.view.display_server_message(RemoteMessage(event))
+        elif kind == "list":
+            self.view.start_channel_list(event["hostname"])
+        elif kind == "channel":
+            self.view.display_channel(
+                event["hostname"],
+                event["channel"],
+                event["users"],
+                event["topic"],
+            )
+        elif kind == "lag":
+            self.view.display_lag(event["lag"])
+        elif kind == "state":
+            self.update_state(event)
+        elif kind == "members":
+            session = self.sessions.get(event["hostname"])
+            if session:
+                session.members.update(
+                    event["channel"], event["version"], event["members"]
+                )
+
+    def update_state(self, event: dict) -> None:
+        sessions = {}
+        for hostname, state in event["sessions"].items():
+            session = self.sessions.get(hostname) or RemoteSession(hostname)
+            session.nickname = state["nickname"]
+            session.joined_channels = set(state["joined"])
+            session.capabilities.enabled = set(state["capabilities"])
+            sessions[hostname] = session
+        self.sessions = sessions
+        focus = event["hostname"], event["channel"]
+        if focus != self._daemon_focus:
+            self._daemon_focus = focus
+            self.hostname, self.current_channel = focus
+        self.view.display_sessions()
+
+    def close(self) -> None:
+        self._file.close()
+        self.sock.close()
@@ -19,3 +19,19 @@ class ConfigNotFoundError(ApiError):
 
     def __str__(self):
         return f"Не удалось найти файл config.ini в директории - {self.arg}"
+
+
+class DaemonRunningError(ApiError):
+    def __init__(self, path: str):
+        self.arg = path
+
+    def __str__(self):
+        return f"Демон уже слушает сокет - {self.arg}"
+
+
+class DaemonNotFoundError(ApiError):
+    def __init__(self, path: str):
+        self.arg = path
+
+    def __str__(self):
+        return f"Не удалось подключиться к демону через сокет - {self.arg}"
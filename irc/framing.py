@@ -0,0 +1,60 @@
+import codecs
+import logging
+
+from irc import const
+
+logger = logging.getLogger(__name__)
+
+
+class LineFramer:
+    def __init__(self, encoding: str):
+        self._buffer = bytearray()
+        self._scanned = 0
+        self._is_discarding = False
+        self._encoding = None
+        self._decoder = None
+        self.encoding = encoding
+
+    @property
+    def encoding(self) -> str:
+        return self._encoding
+
+    @encoding.setter
+    def encoding(self, encoding: str):
+        if encoding != self._encoding:
+            self._encoding = encoding
+            decoder_type = codecs.getincrementaldecoder(encoding)
+            self._decoder = decoder_type(errors="replace")
+
+    def feed(self, data: bytes) -> list:
+        buffer = self._buffer
+        buffer += data
+        decode = self._decoder.decode
+        lines = []
+        start = 0
+        end = buffer.find(b"\n", self._scanned)
+        while end != -1:
+            line_end = end
+            if line_end > start and buffer[line_end - 1] == 13:
+                line_end -= 1
+            if self._is_discarding:
+                self._is_discarding = False
+            elif line_end > start:
+                lines.append(decode(buffer[start:line_end], True))
+            start = end + 1
+            end = buffer.find(b"\n", start)
+
+        if start:
+            del buffer[:start]
+        if len(buffer) > const.MAX_LINE_LENGTH:
+            logger.debug(f"Dropped {len(buffer)} bytes without line ending")
+            buffer.clear()
+            self._is_discarding = True
+        self._scanned = len(buffer)
+        return lines
+
+    def reset(self) -> None:
+        self._buffer.clear()
+        self._scanned = 0
+        self._is_discarding = False
+        self._decoder.reset()
@@ -1,32 +1,56 @@
 from PyQt5.QtWidgets import QApplication
 from PyQt5.QtCore import QThreadPool
+import logging
 import sys
 
+from irc import const, errors
 from irc.config import ClientConfig
 from irc.gui.window import ClientWindow
 from irc.gui.view import GuiView
 from irc.client import Client
 from irc.gui.task_runners import BackgroundTask
 
+logger = logging.getLogger(__name__)
 
-def start_client():
+
+def main(args=None) -> None:
+    config = ClientConfig.get_parser()
+    app = QApplication([])
+    main_window = ClientWindow(
+        config["Settings"].getint("scrollback", const.SCROLLBACK)
+    )
+    client = Client(
+        config["Settings"]["nickname"],
+        config["Settings"]["codepage"],
+        dict(config["Servers"]),
+        GuiView(main_window),
+        **ClientConfig.get_settings(config),
+    )
     main_window.client = client
     main_window.setup_ui()
     main_window.show()
     response_thread = BackgroundTask(client.wait_for_response)
     QThreadPool.globalInstance().start(response_thread)
+    sys.exit(app.exec_())
 
 
-if __name__ == "__main__":
+def attach(args) -> None:
+    from irc.daemon import RemoteClient
+
     app = QApplication([])
     main_window = ClientWindow()
-    config = ClientConfig.get_parser()
-    client = Client(
-        config["Settings"]["nickname"],
-        config["Settings"]["codepage"],
-        dict(config["Servers"]),
-        GuiView(main_window),
-    )
-    start_client()
-    ClientConfig.refresh_file(client)
+    try:
+        client = RemoteClient(GuiView(main_window), args.socket, args.name)
+    except errors.ApiError as e:
+        logger.error(f"Client exception caught - {str(e)}")
+        return
+    main_window.client = client
+    main_window.setup_ui()
+    main_window.show()
+    QThreadPool.globalInstance().start(BackgroundTask(client.receive))
+    client.attach()
     sys.exit(app.exec_())
+
+
+if __name__ == "__main__":
+    main()
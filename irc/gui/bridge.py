@@ -0,0 +1,73 @@
+import collections
+import itertools
+import logging
+import threading
+
+from PyQt5 import QtCore
+from irc import const
+
+logger = logging.getLogger(__name__)
+
+
+class MessageBridge(QtCore.QObject):
+    delivered = QtCore.pyqtSignal(list)
+    _wakeup = QtCore.pyqtSignal()
+
+    def __init__(
+        self,
+        parent: QtCore.QObject = None,
+        max_pending: int = const.GUI_MAX_PENDING,
+        batch_size: int = const.GUI_BATCH_SIZE,
+        interval: int = const.GUI_FRAME_INTERVAL,
+    ):
+        super().__init__(parent)
+        self.max_pending = max_pending
+        self.batch_size = batch_size
+        self.dropped = 0
+        self._pending = collections.deque(maxlen=max_pending)
+        self._dropped_by_tab = collections.Counter()
+        self._lock = threading.Lock()
+        self._scheduled = False
+        self._timer = QtCore.QTimer(self)
+        self._timer.setSingleShot(True)
+        self._timer.setInterval(interval)
+        self._timer.timeout.connect(self._flush)
+        self._wakeup.connect(self._timer.start)
+
+    def put(self, item) -> None:
+        self.put_many([item])
+
+    def put_many(self, items: list) -> None:
+        with self._lock:
+            overflow = len(self._pending) + len(items) - self.max_pending
+            if overflow > 0:
+                self.dropped += overflow
+                lost = itertools.islice(
+                    itertools.chain(self._pending, items), overflow
+                )
+                self._dropped_by_tab.update(key for key, _ in lost)
+                logger.debug(f"GUI is falling behind, dropped {overflow}")
+            self._pending.extend(items)
+            if self._scheduled:
+                return
+            self._scheduled = True
+        self._wakeup.emit()
+
+    def _flush(self) -> None:
+        with self._lock:
+            count = min(len(self._pending), self.batch_size)
+            batch = [self._pending.popleft() for _ in range(count)]
+            has_more = bool(self._pending)
+            self._scheduled = has_more
+            dropped = self._dropped_by_tab
+            self._dropped_by_tab = collections.Counter()
+        if dropped:
+            markers = [
+                (key, const.GUI_DROPPED_TEXT.format(lines))
+                for key, lines in dropped.items()
+            ]
+            batch = markers + batch
+        if batch:
+            self.delivered.emit(batch)
+        if has_more:
+            self._timer.start()
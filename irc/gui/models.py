@@ -0,0 +1,140 @@
+import datetime
+
+from PyQt5 import QtCore
+
+SORT_ROLE = QtCore.Qt.UserRole
+
+
+class ChannelListModel(QtCore.QAbstractTableModel):
+    HEADERS = ("Канал", "Пользователи", "Тема")
+
+    def __init__(self, parent: QtCore.QObject = None):
+        super().__init__(parent)
+        self.hostname = None
+        self._rows = []
+        self._search_keys = []
+        self._index = {}
+
+    def rowCount(self, parent=QtCore.QModelIndex()) -> int:
+        return 0 if parent.isValid() else len(self._rows)
+
+    def columnCount(self, parent=QtCore.QModelIndex()) -> int:
+        return 0 if parent.isValid() else len(self.HEADERS)
+
+    def data(self, index: QtCore.QModelIndex, role=QtCore.Qt.DisplayRole):
+        if not index.isValid():
+            return None
+        value = self._rows[index.row()][index.column()]
+        if role == SORT_ROLE:
+            return value
+        if role == QtCore.Qt.DisplayRole:
+            return str(value)
+        if role == QtCore.Qt.ToolTipRole and index.column() == 2:
+            return value
+        return None
+
+    def headerData(
+        self, section: int, orientation, role=QtCore.Qt.DisplayRole
+    ):
+        if orientation != QtCore.Qt.Horizontal:
+            return None
+        if role == QtCore.Qt.DisplayRole:
+            return self.HEADERS[section]
+        return None
+
+    def matches(self, row: int, pattern: str) -> bool:
+        return pattern in self._search_keys[row]
+
+    def add_channels(self, rows: list):
+        new_rows = []
+        for row in rows:
+            position = self._index.get(row[0])
+            if position is None:
+                self._index[row[0]] = len(self._rows) + len(new_rows)
+                new_rows.append(row)
+            else:
+                self._rows[position] = row
+                self._search_keys[position] = self.get_search_key(row)
+                self.dataChanged.emit(
+                    self.index(position, 0), self.index(position, 2)
+                )
+
+        if new_rows:
+            first = len(self._rows)
+            self.beginInsertRows(
+                QtCore.QModelIndex(), first, first + len(new_rows) - 1
+            )
+            self._rows.extend(new_rows)
+            self._search_keys.extend(map(self.get_search_key, new_rows))
+            self.endInsertRows()
+
+    @staticmethod
+    def get_search_key(row: tuple) -> str:
+        return f"{row[0]} {row[2]}".lower()
+
+    def clear(self, hostname: str = None):
+        self.beginResetModel()
+        self.hostname = hostname
+        self._rows = []
+        self._search_keys = []
+        self._index = {}
+        self.endResetModel()
+
+
+class SearchResultsModel(QtCore.QAbstractTableModel):
+    HEADERS = ("Время", "Сеть", "Канал", "Ник", "Сообщение")
+
+    def __init__(self, parent: QtCore.QObject = None):
+        super().__init__(parent)
+        self._rows = []
+
+    def rowCount(self, parent=QtCore.QModelIndex()) -> int:
+        return 0 if parent.isValid() else len(self._rows)
+
+    def columnCount(self, parent=QtCore.QModelIndex()) -> int:
+        return 0 if parent.isValid() else len(self.HEADERS)
+
+    def data(self, index: QtCore.QModelIndex, role=QtCore.Qt.DisplayRole):
+        if not index.isValid():
+            return None
+        value = self._rows[index.row()][index.column()]
+        if role == QtCore.Qt.DisplayRole and index.column() == 0:
+            moment = datetime.datetime.fromtimestamp(value)
+            return f"{moment:%Y-%m-%d %H:%M}"
+        if role == QtCore.Qt.DisplayRole:
+            return value
+        if role == QtCore.Qt.ToolTipRole and index.column() == 4:
+            return value
+        return None
+
+    def headerData(
+        self, section: int, orientation, role=QtCore.Qt.DisplayRole
+    ):
+        if orientation != QtCore.Qt.Horizontal:
+            return None
+        if role == QtCore.Qt.DisplayRole:
+            return self.HEADERS[section]
+        return None
+
+    def set_results(self, rows: list):
+        self.beginResetModel()
+        self._rows = rows
+        self.endResetModel()
+
+
+class ChannelFilterModel(QtCore.QSortFilterProxyModel):
+    def __init__(self, source: ChannelListModel, parent=None):
+        super().__init__(parent)
+        self.setSourceModel(source)
+        self.setSortRole(SORT_ROLE)
+        self.setDynamicSortFilter(True)
+        self._pattern = ""
+
+    def set_pattern(self, pattern: str):
+        self._pattern = pattern.lower()
+        self.invalidateFilter()
+
+    def filterAcceptsRow(self, row: int, parent: QtCore.QModelIndex) -> bool:
+        if not self._pattern:
+            return True
+        return self.sourceModel().matches(row, self._pattern)
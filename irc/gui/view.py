@@ -1,20 +1,53 @@
-from irc.gui.window import ClientWindow
+import typing
+from irc.gui.window import ClientWindow, CURRENT_TAB
 from irc.view import BaseView
-from irc.models.messages import ServerMessage
+from irc.models.line import is_channel
+
+if typing.TYPE_CHECKING:
+    from irc.models.messages import ServerMessage
 
 
 class GuiView(BaseView):
     def __init__(self, window: ClientWindow):
         self.window = window
 
+    @property
+    def dropped_lines(self) -> int:
+        return self.window.bridge.dropped
+
     def display_chat_text(self, text: str):
         if text:
-            self.window.print_signal.emit(text)
+            self.window.bridge.put((CURRENT_TAB, text))
 
-    def display_server_message(self, message: ServerMessage):
+    def display_server_message(self, message: "ServerMessage"):
         if message:
-            self.window.print_signal.emit(str(message))
+            self.window.bridge.put((self.get_tab_key(message), str(message)))
+
+    def display_batch(self, messages: list):
+        items = [(self.get_tab_key(x), str(x)) for x in messages]
+        self.window.bridge.put_many(items)
+
+    @staticmethod
+    def get_tab_key(message: "ServerMessage") -> tuple:
+        session = message.client
+        target = message.target
+        if not target:
+            return None
+        if is_channel(target) and target not in session.joined_channels:
+            return None
+        return session.hostname, target
 
-    def display_channel(self, channel: str):
+    def start_channel_list(self, hostname: str):
+        self.window.queue_channel(hostname, None)
+
+    def display_channel(
+        self, hostname: str, channel: str, users: int, topic: str
+    ):
         if channel:
-            self.window.print_channel_signal.emit(channel)
+            self.window.queue_channel(hostname, (channel, users, topic))
+
+    def display_lag(self, lag: float):
+        self.window.lag_signal.emit(lag)
+
+    def display_sessions(self):
+        self.window.sync_tabs_signal.emit()
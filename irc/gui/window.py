@@ -1,26 +1,51 @@
+import collections
+import itertools
 import os
+import threading
 
 from PyQt5 import QtWidgets, QtGui, QtCore
+from irc import const
 from irc.client import Client
-from irc.config import ClientConfig
+from irc.gui.bridge import MessageBridge
+from irc.gui.models import (
+    ChannelListModel,
+    ChannelFilterModel,
+    SearchResultsModel,
+)
 from irc.gui.task_runners import BackgroundTask
+from irc.models.line import is_channel
+from irc.search import SearchQuery
 
 RESOURCE_PATH = "resources"
+SERVER_TAB = None
+CURRENT_TAB = ()
 
 
 class ClientWindow(QtWidgets.QMainWindow):
-    print_signal = QtCore.pyqtSignal(str)
-    print_channel_signal = QtCore.pyqtSignal(str)
+    print_channels_signal = QtCore.pyqtSignal()
+    lag_signal = QtCore.pyqtSignal(float)
+    sync_tabs_signal = QtCore.pyqtSignal()
 
-    def __init__(self):
+    def __init__(self, scrollback: int = const.SCROLLBACK):
         super().__init__()
+        self.scrollback = scrollback
         self.central_widget = QtWidgets.QWidget(self)
         self.send_button = QtWidgets.QPushButton(self.central_widget)
         self.input_line = QtWidgets.QLineEdit(self.central_widget)
         self.tabs_panel = QtWidgets.QTabWidget(self.central_widget)
+        self.lag_label = QtWidgets.QLabel(self)
+        self.channel_model = ChannelListModel(self)
+        self.tabs = {}
+        self.bridge = MessageBridge(self)
+        self.members_timer = QtCore.QTimer(self)
+        self._pending_channels = []
+        self._channels_lock = threading.Lock()
         self._client = None
-        self.print_signal.connect(self.print_chat_text)
-        self.print_channel_signal.connect(self.print_channel)
+        self.bridge.delivered.connect(self.print_messages)
+        self.print_channels_signal.connect(self.print_channels)
+        self.lag_signal.connect(self.show_lag)
+        self.sync_tabs_signal.connect(self.sync_tabs)
+        self.members_timer.timeout.connect(self.refresh_members)
 
     def setup_ui(self):
         self.setObjectName("main_window")
@@ -46,8 +71,23 @@ class ClientWindow(QtWidgets.QMainWindow):
         grid_layout.addWidget(self.input_line, 1, 1, 1, 1)
         grid_layout.addWidget(self.tabs_panel, 0, 0, 1, 2)
 
-        self.add_new_tab("Client")
+        self.statusBar().addPermanentWidget(self.lag_label)
+
+        if self.client.search_index:
+            search_dock = QtWidgets.QDockWidget("Поиск по истории", self)
+            search_dock.setObjectName("search_dock")
+            search_dock.setWidget(SearchPanel(self.client.search_index))
+            search_dock.hide()
+            self.addDockWidget(QtCore.Qt.BottomDockWidgetArea, search_dock)
+            toggle_search = search_dock.toggleViewAction()
+            toggle_search.setShortcut("Ctrl+F")
+            self.addAction(toggle_search)
+
+        channel_browser = ChannelBrowser(self.channel_model)
+        self.add_new_tab(SERVER_TAB, "Client", channel_browser)
         self.tabs_panel.setCurrentIndex(0)
+        self.tabs_panel.currentChanged.connect(self.select_tab)
+        self.members_timer.start(const.GUI_MEMBERS_INTERVAL)
         QtCore.QMetaObject.connectSlotsByName(self)
 
     @property
@@ -60,93 +100,332 @@ class ClientWindow(QtWidgets.QMainWindow):
             self._client = client
 
     @property
-    def current_chat(self):
-        return self.tabs_panel.currentWidget().findChild(
-            QtWidgets.QWidget, "chat_content"
-        )
+    def current_tab(self):
+        return self.tabs_panel.currentWidget()
 
     def send_user_input(self):
         text = self.input_line.text()
         if text.strip():
-            input_text = f"<{self.client.nickname}>: {text}"
-            self.current_chat.layout().insertWidget(
-                0, QtWidgets.QLabel(input_text)
-            )
+            if "echo-message" not in self.client.capabilities.enabled:
+                self.current_tab.append_lines(
+                    [f"<{self.client.nickname}>: {text}"], True
+                )
             self.input_line.clear()
-            thread = BackgroundTask(self.client.process_user_input, text)
+            thread = BackgroundTask(self.process_user_input, text)
             QtCore.QThreadPool.globalInstance().start(thread)
 
-    def print_chat_text(self, text: str):
-        self.current_chat.layout().insertWidget(0, QtWidgets.QLabel(text))
+    def process_user_input(self, text: str):
+        self.client.process_user_input(text)
+        self.sync_tabs_signal.emit()
 
-    def print_channel(self, channel: str):
-        table = self.tabs_panel.currentWidget().findChild(
-            QtWidgets.QWidget, "user_content"
-        )
-        table.layout().addWidget(QtWidgets.QLabel(channel))
+    def print_messages(self, batch: list):
+        lines_by_tab = {}
+        for key, text in batch:
+            if key == CURRENT_TAB:
+                tab = self.current_tab
+            else:
+                tab = self.tabs.get(key) or self.add_new_tab(key, key[1])
+            lines_by_tab.setdefault(tab, []).append(text)
+
+        current_tab = self.current_tab
+        nickname = (self.client.nickname or "").lower()
+        for tab, lines in lines_by_tab.items():
+            is_visible = tab is current_tab
+            tab.append_lines(lines, is_visible)
+            if not is_visible:
+                if nickname:
+                    tab.highlights += sum(nickname in x.lower() for x in lines)
+                self.update_tab_title(tab)
+
+    def update_tab_title(self, tab: "ClientTab"):
+        index = self.tabs_panel.indexOf(tab)
+        title = tab.title
+        if tab.unread:
+            title += f" ({tab.unread})"
+        self.tabs_panel.setTabText(index, title)
+        color = QtCore.Qt.red if tab.highlights else QtGui.QColor()
+        self.tabs_panel.tabBar().setTabTextColor(index, color)
+
+    def select_tab(self, index: int):
+        tab = self.tabs_panel.widget(index)
+        if tab is None:
+            return
+        tab.render()
+        self.update_tab_title(tab)
+        if tab.key is SERVER_TAB:
+            return
+        self.refresh_members()
+        hostname, channel = tab.key
+        if hostname in self.client.sessions:
+            self.client.switch_session(hostname)
+            if channel in self.client.joined_channels:
+                self.client.current_channel = channel
+
+    def sync_tabs(self):
+        joined = set()
+        for hostname, session in list(self.client.sessions.items()):
+            for channel in list(session.joined_channels):
+                joined.add((hostname, channel))
+                if (hostname, channel) not in self.tabs:
+                    self.add_new_tab((hostname, channel), channel)
+
+        for key, tab in list(self.tabs.items()):
+            if key is not SERVER_TAB and key not in joined:
+                if is_channel(key[1]) or key[0] not in self.client.sessions:
+                    self.remove_tab(key)
+
+        current_key = SERVER_TAB
+        if self.client.current_channel:
+            current_key = (self.client.hostname, self.client.current_channel)
+        if current_key in self.tabs:
+            self.tabs_panel.setCurrentWidget(self.tabs[current_key])
+
+    def refresh_members(self):
+        tab = self.current_tab
+        if not isinstance(tab.user_content, UserList):
+            return
+        hostname, channel = tab.key
+        session = self.client.sessions.get(hostname)
+        if session is None:
+            return
+        version = session.members.versions.get(channel.lower())
+        if version != tab.user_content.version:
+            members = session.members.get_members(channel)
+            tab.user_content.set_members(members, version)
+
+    def queue_channel(self, hostname: str, channel: tuple):
+        with self._channels_lock:
+            self._pending_channels.append((hostname, channel))
+            is_first = len(self._pending_channels) == 1
+        if is_first:
+            self.print_channels_signal.emit()
 
-    def add_new_tab(self, name: str):
-        tab_to_add = ClientTab()
+    def print_channels(self):
+        with self._channels_lock:
+            pending = self._pending_channels
+            self._pending_channels = []
+        model = self.channel_model
+        channels = []
+        for hostname, channel in pending:
+            if channel is None:
+                model.add_channels(channels)
+                channels = []
+                model.clear(hostname)
+            elif hostname == model.hostname:
+                channels.append(channel)
+        model.add_channels(channels)
+
+    def show_lag(self, lag: float):
+        self.lag_label.setText(f"Задержка: {lag * 1000:.0f} мс")
+
+    def add_new_tab(
+        self, key: tuple, name: str, side_widget: QtWidgets.QWidget = None
+    ) -> "ClientTab":
+        if side_widget is None and key is not SERVER_TAB and is_channel(name):
+            side_widget = UserList()
+        tab_to_add = ClientTab(key, name, self.scrollback, side_widget)
+        if key is not SERVER_TAB:
+            tab_to_add.setToolTip(key[0])
+        self.tabs[key] = tab_to_add
         self.tabs_panel.addTab(tab_to_add, name)
+        return tab_to_add
+
+    def remove_tab(self, key: tuple):
+        tab = self.tabs.pop(key)
+        self.tabs_panel.removeTab(self.tabs_panel.indexOf(tab))
+        tab.deleteLater()
 
     def closeEvent(self, event: QtGui.QCloseEvent) -> None:
         self.client.exit_client()
         QtCore.QThreadPool.globalInstance().clear()
-        ClientConfig.refresh_file(self.client)
         event.accept()
 
 
+class ChatLog(QtWidgets.QPlainTextEdit):
+    def __init__(self, scrollback: int, parent: QtWidgets.QWidget = None):
+        super().__init__(parent)
+        self.setObjectName("chat_content")
+        self.setReadOnly(True)
+        self.setUndoRedoEnabled(False)
+        self.setMaximumBlockCount(scrollback)
+        self.setVerticalScrollBarPolicy(QtCore.Qt.ScrollBarAlwaysOn)
+
+    def append_line(self, text: str):
+        self.append_lines([text])
+
+    def append_lines(self, lines: list):
+        scroll_bar = self.verticalScrollBar()
+        at_bottom = scroll_bar.value() == scroll_bar.maximum()
+        self.appendPlainText("\n".join(lines))
+        if at_bottom and not scroll_bar.isSliderDown():
+            scroll_bar.setValue(scroll_bar.maximum())
+
+
+class ChannelBrowser(QtWidgets.QWidget):
+    def __init__(self, model: ChannelListModel, parent=None):
+        super().__init__(parent)
+        self.filter_model = ChannelFilterModel(model, self)
+        self.filter_line = QtWidgets.QLineEdit(self)
+        self.filter_line.setPlaceholderText("Фильтр каналов")
+        self.table = QtWidgets.QTableView(self)
+        self.filter_timer = QtCore.QTimer(self)
+        self.set_up_table()
+
+    def set_up_table(self):
+        layout = QtWidgets.QVBoxLayout(self)
+        layout.setContentsMargins(0, 0, 0, 0)
+        layout.addWidget(self.filter_line)
+        layout.addWidget(self.table)
+
+        self.table.setModel(self.filter_model)
+        self.table.setSortingEnabled(True)
+        self.table.sortByColumn(1, QtCore.Qt.DescendingOrder)
+        self.table.setSelectionBehavior(QtWidgets.QTableView.SelectRows)
+        self.table.setEditTriggers(QtWidgets.QTableView.NoEditTriggers)
+        self.table.setWordWrap(False)
+        self.table.verticalHeader().hide()
+        self.table.verticalHeader().setDefaultSectionSize(20)
+        self.table.horizontalHeader().setStretchLastSection(True)
+
+        self.filter_timer.setSingleShot(True)
+        self.filter_timer.setInterval(150)
+        self.filter_timer.timeout.connect(self.apply_filter)
+        self.filter_line.textChanged.connect(self.filter_timer.start)
+
+    def apply_filter(self):
+        self.filter_model.set_pattern(self.filter_line.text())
+
+
+class UserList(QtWidgets.QListView):
+    def __init__(self, parent: QtWidgets.QWidget = None):
+        super().__init__(parent)
+        self.version = None
+        self.members_model = QtCore.QStringListModel(self)
+        self.setModel(self.members_model)
+        self.setUniformItemSizes(True)
+        self.setEditTriggers(QtWidgets.QListView.NoEditTriggers)
+
+    def set_members(self, members: list, version: int):
+        self.version = version
+        self.members_model.setStringList(members)
+
+
+class SearchPanel(QtWidgets.QWidget):
+    results_signal = QtCore.pyqtSignal(list)
+
+    def __init__(self, search_index, parent=None):
+        super().__init__(parent)
+        self.search_index = search_index
+        self.model = SearchResultsModel(self)
+        self.query_line = QtWidgets.QLineEdit(self)
+        self.query_line.setPlaceholderText(
+            "#канал from:ник since:30d net:сервер текст"
+        )
+        self.status_label = QtWidgets.QLabel(self)
+        self.table = QtWidgets.QTableView(self)
+        self.set_up_panel()
+
+    def set_up_panel(self):
+        layout = QtWidgets.QVBoxLayout(self)
+        layout.setContentsMargins(0, 0, 0, 0)
+        query_layout = QtWidgets.QHBoxLayout()
+        query_layout.addWidget(self.query_line)
+        query_layout.addWidget(self.status_label)
+        layout.addLayout(query_layout)
+        layout.addWidget(self.table)
+
+        self.table.setModel(self.model)
+        self.table.setSelectionBehavior(QtWidgets.QTableView.SelectRows)
+        self.table.setEditTriggers(QtWidgets.QTableView.NoEditTriggers)
+        self.table.setWordWrap(False)
+        self.table.verticalHeader().hide()
+        self.table.verticalHeader().setDefaultSectionSize(20)
+        self.table.horizontalHeader().setStretchLastSection(True)
+
+        self.query_line.returnPressed.connect(self.start_search)
+        self.results_signal.connect(self.show_results)
+
+    def start_search(self):
+        try:
+            query = SearchQuery.from_args(self.query_line.text().split())
+        except ValueError:
+            self.status_label.setText("Неверный формат даты")
+            return
+        if query.text.strip():
+            self.status_label.setText("Поиск...")
+            thread = BackgroundTask(self.run_search, query)
+            QtCore.QThreadPool.globalInstance().start(thread)
+
+    def run_search(self, query: SearchQuery):
+        self.results_signal.emit(self.search_index.search(query))
+
+    def show_results(self, rows: list):
+        self.model.set_results(rows)
+        self.status_label.setText(f"Найдено: {len(rows)}")
+
+
 class ClientTab(QtWidgets.QWidget):
-    def __init__(self):
+    def __init__(
+        self,
+        key: tuple,
+        title: str,
+        scrollback: int,
+        side_widget: QtWidgets.QWidget = None,
+    ):
         super().__init__()
+        self.key = key
+        self.title = title
+        self.lines = collections.deque(maxlen=scrollback)
+        self.total_lines = 0
+        self.rendered_lines = 0
+        self.unread = 0
+        self.highlights = 0
         vertical_layout = QtWidgets.QVBoxLayout()
         self.setLayout(vertical_layout)
         self.content_layout = QtWidgets.QHBoxLayout()
         vertical_layout.addLayout(self.content_layout)
-        self.user_area = QtWidgets.QScrollArea(self)
-        self.chat_area = QtWidgets.QScrollArea(self)
-        self.chat_area.setWidgetResizable(True)
-        self.user_area.setWidgetResizable(True)
-        self.user_content = QtWidgets.QWidget()
-        self.chat_content = QtWidgets.QWidget()
-        self.user_area.setWidget(self.user_content)
-        self.chat_area.setWidget(self.chat_content)
+        self.user_content = side_widget
+        self.chat_log = ChatLog(scrollback, self)
         self.set_up_areas()
 
     def set_up_areas(self):
-        self.content_layout.addWidget(self.user_area)
-        self.content_layout.addWidget(self.chat_area)
+        if self.user_content is not None:
+            self.user_content.setParent(self)
+            self.user_content.setObjectName("user_content")
+            size_policy = QtWidgets.QSizePolicy(
+                QtWidgets.QSizePolicy.Preferred,
+                QtWidgets.QSizePolicy.Preferred,
+            )
+            size_policy.setHorizontalStretch(1)
+            self.user_content.setSizePolicy(size_policy)
+            self.content_layout.addWidget(self.user_content)
+        self.content_layout.addWidget(self.chat_log)
         self.content_layout.setSpacing(10)
 
-        self.user_area.setVerticalScrollBarPolicy(QtCore.Qt.ScrollBarAlwaysOn)
-
-        users_layout = QtWidgets.QBoxLayout(QtWidgets.QBoxLayout.TopToBottom)
-        users_layout.setAlignment(QtCore.Qt.AlignTop | QtCore.Qt.AlignLeft)
-        self.user_content.setLayout(users_layout)
-        self.user_content.setObjectName("user_content")
-
-        size_policy = QtWidgets.QSizePolicy(
-            QtWidgets.QSizePolicy.Preferred, QtWidgets.QSizePolicy.Preferred
-        )
-        size_policy.setHorizontalStretch(1)
-
-        self.user_area.setSizePolicy(size_policy)
-
-        self.chat_area.setVerticalScrollBarPolicy(QtCore.Qt.ScrollBarAlwaysOn)
-        self.chat_area.verticalScrollBar().rangeChanged.connect(self.move_bar)
-
-        chat_layout = QtWidgets.QBoxLayout(QtWidgets.QBoxLayout.BottomToTop)
-        chat_layout.setAlignment(QtCore.Qt.AlignBottom | QtCore.Qt.AlignLeft)
-        self.chat_content.setLayout(chat_layout)
-        self.chat_content.setObjectName("chat_content")
-
         size_policy = QtWidgets.QSizePolicy(
             QtWidgets.QSizePolicy.Preferred, QtWidgets.QSizePolicy.Preferred
         )
         size_policy.setHorizontalStretch(4)
-        self.chat_area.setSizePolicy(size_policy)
+        self.chat_log.setSizePolicy(size_policy)
+
+    def append_lines(self, lines: list, is_visible: bool):
+        self.lines.extend(lines)
+        self.total_lines += len(lines)
+        if is_visible:
+            self.render()
+        else:
+            self.unread += len(lines)
 
-    def move_bar(self, min_n: int, max_n: int):
-        scroll_bar = self.sender()
-        if not scroll_bar.isSliderDown():
-            scroll_bar.setValue(max_n)
+    def render(self):
+        missing = self.total_lines - self.rendered_lines
+        if missing > len(self.lines):
+            self.chat_log.clear()
+            self.chat_log.append_lines(list(self.lines))
+        elif missing:
+            start = len(self.lines) - missing
+            self.chat_log.append_lines(
+                list(itertools.islice(self.lines, start, None))
+            )
+        self.rendered_lines = self.total_lines
+        self.unread = 0
+        self.highlights = 0
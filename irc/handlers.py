@@ -1,74 +1,119 @@
+import importlib
 import logging
 import shlex
-import irc.models.commands as com
-from irc.models import messages
+import typing
+from irc.models.line import parse_line
+
+if typing.TYPE_CHECKING:
+    from irc.models.commands import ClientCommand
+    from irc.models.messages import ServerMessage
 
 logger = logging.getLogger(__name__)
 
 
+class LazyModels(dict):
+    def __init__(self, module: str):
+        super().__init__()
+        self.module = module
+
+    def __missing__(self, name: str) -> type:
+        module = importlib.import_module(self.module)
+        model = self[name] = getattr(module, name)
+        return model
+
+
 class CommandHandler:
     def __init__(self, client):
         self._client = client
+        self.models = LazyModels("irc.models.commands")
         self.commands = {
-            "/chcp": com.CodePageCommand,
-            "/nick": com.NickCommand,
-            "/help": com.HelpCommand,
-            "/fav": com.ShowFavCommand,
-            "/server": com.ConnectCommand,
-            "/exit": com.ExitCommand,
-            "/pm": com.WhisperCommand,
-            "/add": com.AddFavCommand,
-            "/join": com.JoinCommand,
-            "/list": com.ListCommand,
-            "/names": com.NamesCommand,
-            "/leave": com.PartCommand,
-            "/quit": com.QuitCommand,
-            "/switch": com.SwitchCommand,
+            "/chcp": "CodePageCommand",
+            "/nick": "NickCommand",
+            "/help": "HelpCommand",
+            "/fav": "ShowFavCommand",
+            "/server": "ConnectCommand",
+            "/exit": "ExitCommand",
+            "/pm": "WhisperCommand",
+            "/add": "AddFavCommand",
+            "/join": "JoinCommand",
+            "/list": "ListCommand",
+            "/names": "NamesCommand",
+            "/leave": "PartCommand",
+            "/quit": "QuitCommand",
+            "/switch": "SwitchCommand",
+            "/lag": "LagCommand",
+            "/network": "NetworkCommand",
+            "/search": "SearchCommand",
+            "/stats": "StatsCommand",
         }
 
-    def get_command(self, input_text: str) -> com.ClientCommand:
+    def get_command(self, input_text: str) -> "ClientCommand":
         if input_text.startswith("/"):
             command_parts = shlex.split(input_text)
             command_name, command_args = command_parts[0], command_parts[1:]
             if command_name in self.commands:
-                return self.commands[command_name](self._client, *command_args)
+                command_type = self.models[self.commands[command_name]]
+                return command_type(self._client, *command_args)
 
         elif self._client.current_channel and input_text.rstrip(" "):
-            return com.WhisperCommand(
+            return self.models["WhisperCommand"](
                 self._client,
                 self._client.current_channel,
                 *input_text.split(" "),
             )
 
         logger.debug(f"Cannot parse command: {input_text}")
-        return com.UnknownCommand(self._client)
+        return self.models["UnknownCommand"](self._client)
 
 
 class MessageHandler:
     def __init__(self, client):
         self.client = client
+        self.models = LazyModels("irc.models.messages")
         self.messages = {
-            "JOIN": messages.JoinMessage,
-            "PART": messages.PartMessage,
-            "NICK": messages.NickMessage,
-            "MODE": messages.ModeMessage,
-            "PRIVMSG": messages.PrivateMessage,
-            "NOTICE": messages.NoticeMessage,
+            "JOIN": "JoinMessage",
+            "PART": "PartMessage",
+            "NICK": "NickMessage",
+            "MODE": "ModeMessage",
+            "PRIVMSG": "PrivateMessage",
+            "NOTICE": "NoticeMessage",
+            "KICK": "KickMessage",
+            "QUIT": "QuitMessage",
+            "BATCH": "BatchMessage",
         }
 
     def get_messages(self, decoded_data: str) -> list:
         result = []
         for line in decoded_data.split("\r\n"):
-            parts = line.split(" ")
-            if len(parts) < 2:
-                logger.debug(f"Received too short message: {line}")
-                continue
-            command_name = parts[1].upper()
-            if command_name in self.messages:
-                result.append(self.messages[command_name](self.client, line))
-            elif command_name.isdigit():
-                result.append(messages.ServiceMessage(self.client, line))
-            else:
-                logger.debug(f"Received unresolved message: {line}")
-                continue
+            message = self.get_message(line)
+            if message:
+                result.append(message)
         return result
+
+    def get_message(self, line: str) -> "ServerMessage":
+        parsed_line = parse_line(line)
+        if not parsed_line:
+            logger.debug(f"Received too short message: {line}")
+            return None
+        command_name = parsed_line.command
+        self.client.metrics.commands[command_name] += 1
+        if command_name == "PING":
+            if parsed_line.params:
+                self.client.keepalive.reply(parsed_line.params[-1])
+            return None
+        if command_name == "PONG":
+            if parsed_line.params:
+                self.client.keepalive.on_pong(parsed_line.params[-1])
+            return None
+        if command_name == "CAP":
+            self.client.capabilities.on_cap(parsed_line)
+            return None
+        if command_name in self.messages:
+            message_type = self.models[self.messages[command_name]]
+            return message_type(self.client, line, parsed_line)
+        elif command_name.isdigit():
+            message_type = self.models["ServiceMessage"]
+            return message_type(self.client, line, parsed_line)
+
+        logger.debug(f"Received unresolved message: {line}")
+        return None
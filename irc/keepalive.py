@@ -0,0 +1,67 @@
+import time
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+class KeepAlive:
+    def __init__(self, client, interval: float, timeout: float):
+        self._client = client
+        self.interval = interval
+        self.timeout = timeout
+        self.lag = None
+        self._token = None
+        self._sent_at = None
+        self._next_ping = None
+
+    @property
+    def current_lag(self) -> float:
+        if self._token is not None:
+            waited = time.monotonic() - self._sent_at
+            if self.lag is None or waited > self.lag:
+                return waited
+        return self.lag
+
+    def reset(self) -> None:
+        self.lag = None
+        self._token = None
+        self._sent_at = None
+        self._next_ping = time.monotonic() + self.interval
+
+    def reply(self, token: str) -> None:
+        self._client.send(f"PONG :{token}\r\n".encode(self._client.code_page))
+
+    def on_pong(self, token: str) -> None:
+        if token != self._token:
+            return
+        self.lag = time.monotonic() - self._sent_at
+        self._token = None
+        self._client.metrics.lag.observe(self.lag)
+        self._client.view.display_lag(self.lag)
+
+    def check(self) -> float:
+        if not self.interval:
+            return None
+
+        now = time.monotonic()
+        if self._token is not None and now - self._sent_at >= self.timeout:
+            logger.info(f"No PONG received in {self.timeout} seconds")
+            self._token = None
+            self._client.on_connection_dead()
+            return None
+
+        if now >= self._next_ping:
+            self._send_ping(now)
+
+        next_check = self._next_ping
+        if self._token is not None:
+            next_check = min(next_check, self._sent_at + self.timeout)
+        return max(next_check - now, 0.01)
+
+    def _send_ping(self, now: float) -> None:
+        self._next_ping = now + self.interval
+        if self._token is not None:
+            return
+        self._token = f"lag{int(now * 1000)}"
+        self._sent_at = now
+        self._client.send(f"PING :{self._token}\r\n".encode("ascii"))
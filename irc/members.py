@@ -0,0 +1,132 @@
+import sys
+
+PREFIXES = "~&@%+"
+
+
+def split_prefix(name: str) -> tuple:
+    modes = ""
+    while name and name[0] in PREFIXES:
+        modes += name[0]
+        name = name[1:]
+    return modes, name
+
+
+def rank(modes: str) -> int:
+    return PREFIXES.index(modes[0]) if modes else len(PREFIXES)
+
+
+class MemberStore:
+    def __init__(self):
+        self.channels = {}
+        self.nicks = {}
+        self.user_channels = {}
+        self.versions = {}
+        self._names = {}
+
+    def get_members(self, channel: str) -> list:
+        members = list(self.channels.get(channel.lower(), {}).items())
+        nicks = self.nicks
+        members.sort(key=lambda x: (rank(x[1]), x[0]))
+        return [modes[:1] + nicks.get(key, key) for key, modes in members]
+
+    def count(self, channel: str) -> int:
+        return len(self.channels.get(channel.lower(), ()))
+
+    def add_names(self, channel: str, names: list) -> None:
+        channel = channel.lower()
+        if channel not in self.channels:
+            return
+        members = self._names.setdefault(channel, {})
+        for name in names:
+            modes, nick = split_prefix(name)
+            if nick:
+                members[self.intern(nick)] = modes
+
+    def end_names(self, channel: str) -> None:
+        channel = channel.lower()
+        members = self._names.pop(channel, {})
+        old_members = self.channels.get(channel)
+        if old_members is None:
+            return
+        for key in old_members.keys() - members.keys():
+            self._forget(key, channel)
+        for key in members.keys() - old_members.keys():
+            self.user_channels.setdefault(key, set()).add(channel)
+        self.channels[channel] = members
+        self._touch(channel)
+
+    def join(self, channel: str, nick: str, is_self: bool = False) -> None:
+        channel = channel.lower()
+        if is_self:
+            self.drop_channel(channel)
+            self.channels[channel] = {}
+        members = self.channels.get(channel)
+        if members is None:
+            return
+        key = self.intern(nick)
+        members[key] = ""
+        self.user_channels.setdefault(key, set()).add(channel)
+        self._touch(channel)
+
+    def part(self, channel: str, nick: str, is_self: bool = False) -> None:
+        channel = channel.lower()
+        if is_self:
+            self.drop_channel(channel)
+            return
+        members = self.channels.get(channel)
+        key = nick.lower()
+        if members is not None and members.pop(key, None) is not None:
+            self._forget(key, channel)
+            self._touch(channel)
+
+    def quit(self, nick: str) -> None:
+        key = nick.lower()
+        for channel in self.user_channels.pop(key, ()):
+            self.channels[channel].pop(key, None)
+            self._touch(channel)
+        self.nicks.pop(key, None)
+
+    def rename(self, old_nick: str, new_nick: str) -> None:
+        old_key = old_nick.lower()
+        channels = self.user_channels.pop(old_key, None)
+        if channels is None:
+            return
+        self.nicks.pop(old_key, None)
+        new_key = self.intern(new_nick)
+        for channel in channels:
+            members = self.channels[channel]
+            members[new_key] = members.pop(old_key)
+            self._touch(channel)
+        self.user_channels[new_key] = channels
+
+    def drop_channel(self, channel: str) -> None:
+        channel = channel.lower()
+        for key in self.channels.pop(channel, ()):
+            self._forget(key, channel)
+        self._names.pop(channel, None)
+        self._touch(channel)
+
+    def clear(self) -> None:
+        for channel in self.channels:
+            self._touch(channel)
+        self.channels = {}
+        self.nicks = {}
+        self.user_channels = {}
+        self._names = {}
+
+    def intern(self, nick: str) -> str:
+        key = sys.intern(nick.lower())
+        self.nicks[key] = sys.intern(nick)
+        return key
+
+    def _forget(self, key: str, channel: str) -> None:
+        channels = self.user_channels.get(key)
+        if channels is None:
+            return
+        channels.discard(channel)
+        if not channels:
+            del self.user_channels[key]
+            self.nicks.pop(key, None)
+
+    def _touch(self, channel: str) -> None:
+        self.versions[channel] = self.versions.get(channel, 0) + 1
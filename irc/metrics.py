@@ -0,0 +1,183 @@
+import bisect
+import collections
+import logging
+import threading
+import time
+
+from irc import const
+
+logger = logging.getLogger(__name__)
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+
+class Histogram:
+    def __init__(self, buckets: tuple):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float) -> None:
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+    def quantile(self, q: float) -> float:
+        rank = q * self.count
+        seen = 0
+        for bound, count in zip(self.buckets, self.counts):
+            seen += count
+            if seen >= rank:
+                return bound
+        return float("inf")
+
+
+class ConnectionMetrics:
+    def __init__(self):
+        self.started = time.monotonic()
+        self.sample_rate = const.METRICS_SAMPLE_RATE
+        self.bytes_in = 0
+        self.bytes_out = 0
+        self.lines_in = 0
+        self.lines_out = 0
+        self.reconnects = 0
+        self.commands = collections.Counter()
+        self.parse_latency = Histogram(const.METRICS_LATENCY_BUCKETS)
+        self.render_latency = Histogram(const.METRICS_LATENCY_BUCKETS)
+        self.lag = Histogram(const.METRICS_LAG_BUCKETS)
+
+    @property
+    def uptime(self) -> float:
+        return time.monotonic() - self.started
+
+
+def format_stats(session) -> str:
+    metrics = session.metrics
+    uptime = max(metrics.uptime, 1e-9)
+    total = sum(metrics.commands.values())
+    top = ", ".join(
+        f"{command} {count}"
+        for command, count in metrics.commands.most_common(5)
+    )
+    queue = session.send_queue.stats()
+    lag = session.keepalive.current_lag
+    lag_text = "—" if lag is None else f"{lag * 1000:.0f} мс"
+
+    def latency(histogram: Histogram) -> str:
+        p50 = histogram.quantile(0.5) * 1e6
+        p99 = histogram.quantile(0.99) * 1e6
+        return f"p50 ≤ {p50:.0f} мкс, p99 ≤ {p99:.0f} мкс"
+
+    lines = [
+        f"Статистика {session.hostname} за {uptime:.0f} с:",
+        f"Принято: {metrics.lines_in} строк, {metrics.bytes_in} байт",
+        f"Отправлено: {metrics.lines_out} строк, {metrics.bytes_out} байт",
+        f"Сообщений в секунду: {total / uptime:.1f} ({top})",
+        f"Разбор: {latency(metrics.parse_latency)}",
+        f"Вывод: {latency(metrics.render_latency)}",
+        f"Очередь отправки: {queue['depth']}, "
+        f"отброшено: {queue['dropped_lines']}",
+        f"Переподключений: {metrics.reconnects}, задержка: {lag_text}",
+    ]
+    dropped = session.view.dropped_lines
+    if dropped:
+        lines.append(f"Не выведено окном: {dropped} строк")
+    return "\n".join(lines)
+
+
+def format_prometheus(sessions: dict) -> str:
+    families = collections.defaultdict(list)
+    for network, session in list(sessions.items()):
+        metrics = session.metrics
+        queue = session.send_queue.stats()
+        labels = f'network="{network}"'
+        samples = {
+            ("irc_received_bytes_total", "counter"): metrics.bytes_in,
+            ("irc_sent_bytes_total", "counter"): metrics.bytes_out,
+            ("irc_received_lines_total", "counter"): metrics.lines_in,
+            ("irc_sent_lines_total", "counter"): metrics.lines_out,
+            ("irc_reconnects_total", "counter"): metrics.reconnects,
+            ("irc_send_queue_depth", "gauge"): queue["depth"],
+            ("irc_send_queue_dropped_total", "counter"): queue[
+                "dropped_lines"
+            ],
+            ("irc_connected", "gauge"): int(session.is_connected),
+        }
+        for (name, kind), value in samples.items():
+            families[name, kind].append(f"{name}{{{labels}}} {value}")
+
+        lag = session.keepalive.current_lag
+        if lag is not None:
+            families["irc_lag_seconds", "gauge"].append(
+                f"irc_lag_seconds{{{labels}}} {lag:.6f}"
+            )
+        for command, count in list(metrics.commands.items()):
+            families["irc_messages_total", "counter"].append(
+                f'irc_messages_total{{{labels},command="{command}"}} {count}'
+            )
+        histograms = {
+            "irc_parse_seconds": metrics.parse_latency,
+            "irc_render_seconds": metrics.render_latency,
+            "irc_lag_observed_seconds": metrics.lag,
+        }
+        for name, histogram in histograms.items():
+            families[name, "histogram"].extend(
+                format_histogram(name, labels, histogram)
+            )
+
+    lines = []
+    for (name, kind), samples in families.items():
+        lines.append(f"# TYPE {name} {kind}")
+        lines.extend(samples)
+    return "\n".join(lines) + "\n"
+
+
+def format_histogram(name: str, labels: str, histogram: Histogram) -> list:
+    counts = list(histogram.counts)
+    lines = []
+    cumulative = 0
+    for bound, count in zip(histogram.buckets + ("+Inf",), counts):
+        cumulative += count
+        lines.append(f'{name}_bucket{{{labels},le="{bound}"}} {cumulative}')
+    lines.append(f"{name}_sum{{{labels}}} {histogram.sum:.6f}")
+    lines.append(f"{name}_count{{{labels}}} {cumulative}")
+    return lines
+
+
+class MetricsServer:
+    def __init__(self, client, host: str, port: int):
+        import http.server
+
+        class Handler(http.server.BaseHTTPRequestHandler):
+            def do_GET(self):
+                if self.path != "/metrics":
+                    self.send_error(404)
+                    return
+                body = format_prometheus(client.sessions).encode("utf-8")
+                self.send_response(200)
+                self.send_header("Content-Type", CONTENT_TYPE)
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                logger.debug(format % args)
+
+        self._server = http.server.ThreadingHTTPServer((host, port), Handler)
+        self._server.daemon_threads = True
+        self._thread = threading.Thread(
+            target=self._server.serve_forever, name="metrics", daemon=True
+        )
+
+    @property
+    def port(self) -> int:
+        return self._server.server_address[1]
+
+    def start(self) -> None:
+        self._thread.start()
+        logger.info(f"Serving metrics on port {self.port}")
+
+    def close(self) -> None:
+        self._server.shutdown()
+        self._server.server_close()
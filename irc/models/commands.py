@@ -4,12 +4,14 @@ import abc
 import logging
 
 from irc import const
-
+from irc.metrics import format_stats
+from irc.servers import format_server, parse_port, split_server
 
 logger = logging.getLogger(__name__)
 
 ERR_ARGS_AMOUNT = "Неверное кол-во аргументов для команды\nИспользуйте: "
 ERR_NOT_CONNECTED = "Сначала подключитесь к серверу"
+ERR_DATE_FORMAT = "Неверный формат даты! Используйте ГГГГ-ММ-ДД или 30d"
 
 
 class ClientCommand(abc.ABC):
@@ -65,6 +67,7 @@ class ListCommand(ClientCommand):
     usage = "/list"
 
     def execute(self) -> str:
+        self._client.view.start_channel_list(self._client.hostname)
         return "LIST"
 
 
@@ -128,6 +131,8 @@ class NickCommand(ClientCommand):
     def execute(self, new_nickname: str) -> str:
         self._client.prev_nick = self._client.nickname
         self._client.nickname = new_nickname
+        if not self._client.is_registered:
+            self._client.preferred_nick = new_nickname
         return f"NICK {new_nickname}"
 
     def validate_args(self) -> bool:
@@ -145,18 +150,15 @@ class QuitCommand(ClientCommand):
     usage = "/quit"
 
     def execute(self) -> None:
-        self._client.hostname = None
-        self._client.is_connected = False
-        self._client.joined_channels = set()
-        self._client.current_channel = None
-        self._client.sock.shutdown(socket.SHUT_WR)
+        self._client.disconnect()
         self.output = "Отключение от сервера..."
 
     def validate_args(self) -> bool:
         if not super().validate_args():
             return False
 
-        if not self._client.is_connected:
+        active = self._client.active
+        if not active.is_connected and not active.is_reconnecting:
             self.output = ERR_NOT_CONNECTED
             return False
         return True
@@ -176,7 +178,7 @@ class SwitchCommand(ClientCommand):
             return False
         if len(self._args) == 0:
             self.output = f"Активный канал: {self._client.current_channel}\n"
-            channel_list = ' '.join(self._client.joined_channels)
+            channel_list = " ".join(self._client.joined_channels)
             self.output += f"Присоединённые каналы: {channel_list}"
             return False
         if not self._client.is_connected:
@@ -194,6 +196,101 @@ class SwitchCommand(ClientCommand):
         return True
 
 
+class LagCommand(ClientCommand):
+    usage = "/lag"
+
+    def validate_args(self) -> bool:
+        if not super().validate_args():
+            return False
+
+        if not self._client.is_connected:
+            self.output = ERR_NOT_CONNECTED
+            return False
+        return True
+
+    def execute(self) -> None:
+        lag = self._client.keepalive.current_lag
+        if lag is None:
+            self.output = "Задержка до сервера ещё не измерена"
+        else:
+            self.output = f"Задержка до сервера: {lag * 1000:.0f} мс"
+
+
+class StatsCommand(ClientCommand):
+    usage = "/stats"
+
+    def validate_args(self) -> bool:
+        if not super().validate_args():
+            return False
+
+        if not self._client.is_connected:
+            self.output = ERR_NOT_CONNECTED
+            return False
+        return True
+
+    def execute(self) -> None:
+        self.output = format_stats(self._client.active)
+
+
+class NetworkCommand(ClientCommand):
+    usage = "/network [HOSTNAME]"
+
+    def validate_args(self) -> bool:
+        if len(self._args) > 1:
+            self.output = ERR_ARGS_AMOUNT + self.usage
+            return False
+        if len(self._args) == 0:
+            self.output = f"Активная сеть: {self._client.hostname}\n"
+            networks = " ".join(self._client.sessions)
+            self.output += f"Подключённые сети: {networks}"
+            return False
+
+        hostname = self._args[0].lower()
+        if hostname not in self._client.sessions:
+            self.output = f"Вы не подключены к серверу {hostname}!"
+            return False
+        return True
+
+    def execute(self, hostname: str) -> None:
+        hostname = hostname.lower()
+        self._client.switch_session(hostname)
+        self.output = f"Переключение активной сети на {hostname}..."
+
+
+class SearchCommand(ClientCommand):
+    usage = (
+        "/search [#CHANNEL] [net:HOST] [from:NICK] [since:DATE] [until:DATE] "
+        "TEXT"
+    )
+
+    def validate_args(self) -> bool:
+        if not self._client.search_index:
+            self.output = "Поиск по истории отключён (search_db в config.ini)"
+            return False
+
+        from irc.search import SearchQuery
+
+        try:
+            self.query = SearchQuery.from_args(self._args)
+        except ValueError:
+            self.output = ERR_DATE_FORMAT
+            return False
+        if not self.query.text.strip():
+            self.output = ERR_ARGS_AMOUNT + self.usage
+            return False
+        return True
+
+    def execute(self, *args) -> None:
+        from irc.search import format_result
+
+        results = self._client.search_index.search(self.query)
+        if not results:
+            self.output = "Ничего не найдено"
+        else:
+            lines = map(format_result, reversed(results))
+            self.output = "\n".join(lines)
+
+
 class HelpCommand(ClientCommand):
     usage = "/help"
 
@@ -202,38 +299,52 @@ class HelpCommand(ClientCommand):
 
 
 class ConnectCommand(ClientCommand):
-    usage = "/server HOSTNAME [PORT]"
+    usage = "/server HOSTNAME [[+]PORT] [--tls]"
 
     def validate_args(self) -> bool:
-        if len(self._args) != 1 and len(self._args) != 2:
+        args = [arg for arg in self._args if arg != "--tls"]
+        if len(args) != 1 and len(args) != 2:
             self.output = ERR_ARGS_AMOUNT + self.usage
             return False
 
-        if self._client.is_connected:
+        if args[0].lower() in self._client.sessions:
             self.output = "Вы уже подключены к серверу!"
             return False
+
+        if len(args) == 2 and not args[1].lstrip("+").isdigit():
+            self.output = ERR_ARGS_AMOUNT + self.usage
+            return False
         return True
 
-    def execute(self, hostname: str, port=6667) -> str:
-        self._client.sock = socket.socket()
-        self._client.sock.settimeout(10)
+    def execute(self, hostname: str, *args) -> str:
+        favourite = self._client.find_favourite(hostname)
+        _, port, is_tls = split_server(favourite or hostname)
+        ports = [arg for arg in args if arg != "--tls"]
+        if ports:
+            port, is_tls = parse_port(ports[0])
+        if "--tls" in args and not is_tls:
+            is_tls = True
+            port = port if ports else const.TLS_PORT
         try:
             logger.info(f"Trying to connect to {hostname}")
-            self._client.sock.connect((hostname, port))
+            self._client.connect(hostname, port, is_tls)
         except socket.gaierror as e:
             logger.info(f"Failed to connect by reason - {str(e)}")
             self.output = f"Не удалось подключиться по адресу: {hostname}"
             return ""
-        except OSError:
+        except OSError as e:
+            logger.info(f"Failed to connect by reason - {str(e)}")
             self.output = f"Не удалось подключиться по адресу: {hostname}"
+            if getattr(e, "verify_message", None):
+                self.output = (
+                    f"Не удалось проверить сертификат сервера {hostname}: "
+                    f"{e.verify_message}"
+                )
             return ""
 
         logger.info("Successfully connected to server.")
-        self._client.sock.settimeout(None)
-        self._client.hostname = hostname.lower()
-        self._client.is_connected = True
-        self.set_joined_channels(self._client.favourites.get(hostname))
-        return f"NICK {self._client.nickname}\r\nUSER 1 1 1 1"
+        self.set_joined_channels(self._client.favourites.get(favourite))
+        return self._client.active.get_registration()
 
     def set_joined_channels(self, channels_to_join: str):
         if channels_to_join:
@@ -270,14 +381,16 @@ class AddFavCommand(ClientCommand):
             self.output = ERR_NOT_CONNECTED
             return False
 
-        if self._client.hostname in self._client.favourites:
+        if self._client.find_favourite(self._client.hostname):
             self.output = "Сервер уже в списке избранных"
             return False
 
         return True
 
     def execute(self) -> None:
-        self._client.favourites[self._client.hostname] = ""
+        session = self._client.active
+        entry = format_server(session.hostname, session.port, session.is_tls)
+        self._client.favourites[entry] = ""
         self.output = f"Сервер {self._client.hostname} добавлен в избранное"
 
 
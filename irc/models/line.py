@@ -0,0 +1,102 @@
+import datetime
+
+from irc import const
+
+TAG_ESCAPES = {":": ";", "s": " ", "\\": "\\", "r": "\r", "n": "\n"}
+
+
+class IrcLine:
+    __slots__ = ("tags", "source", "nick", "user", "host", "command", "params")
+
+    def __init__(
+        self,
+        tags: dict,
+        source: str,
+        command: str,
+        params: list,
+    ):
+        self.tags = tags
+        self.source = source
+        self.nick = self.user = self.host = None
+        if source:
+            nick, _, self.host = source.partition("@")
+            self.nick, _, self.user = nick.partition("!")
+            self.user = self.user or None
+            self.host = self.host or None
+        self.command = command
+        self.params = params
+
+    def __repr__(self):
+        return (
+            f"IrcLine({self.tags!r}, {self.source!r}, "
+            f"{self.command!r}, {self.params!r})"
+        )
+
+
+def is_channel(name: str) -> bool:
+    return bool(name) and name[0] in const.CHANNEL_PREFIXES
+
+
+def parse_server_time(value: str) -> float:
+    for pattern in ("%Y-%m-%dT%H:%M:%S.%fZ", "%Y-%m-%dT%H:%M:%SZ"):
+        try:
+            moment = datetime.datetime.strptime(value, pattern)
+        except ValueError:
+            continue
+        return moment.replace(tzinfo=datetime.timezone.utc).timestamp()
+    return None
+
+
+def unescape_tag_value(value: str) -> str:
+    if "\\" not in value:
+        return value
+    result = []
+    chars = iter(value)
+    for char in chars:
+        if char == "\\":
+            escaped = next(chars, "")
+            result.append(TAG_ESCAPES.get(escaped, escaped))
+        else:
+            result.append(char)
+    return "".join(result)
+
+
+def parse_tags(raw_tags: str) -> dict:
+    tags = {}
+    for tag in raw_tags.split(";"):
+        if tag:
+            key, _, value = tag.partition("=")
+            tags[key] = unescape_tag_value(value)
+    return tags
+
+
+def parse_line(line: str) -> IrcLine:
+    tags = source = None
+    start = 0
+    if line.startswith("@"):
+        start = line.find(" ")
+        if start == -1:
+            return None
+        tags = parse_tags(line[1:start])
+        start += 1
+        while line.startswith(" ", start):
+            start += 1
+
+    if line.startswith(":", start):
+        end = line.find(" ", start)
+        if end == -1:
+            return None
+        source = line[start + 1 : end]
+        start = end + 1
+
+    trailing_start = line.find(" :", start)
+    if trailing_start == -1:
+        params = line[start:].split()
+    else:
+        params = line[start:trailing_start].split()
+    if not params:
+        return None
+    command = params.pop(0).upper()
+    if trailing_start != -1:
+        params.append(line[trailing_start + 2 :])
+    return IrcLine(tags, source, command, params)
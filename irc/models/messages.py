@@ -1,59 +1,149 @@
 import abc
-import re
+
+from irc.models.line import IrcLine, is_channel, parse_line
 
 
 class ServerMessage(abc.ABC):
-    expr = re.compile("")
+    min_params = 1
 
-    def __init__(self, client, raw_message: str):
+    def __init__(self, client, raw_message: str, line: IrcLine = None):
         self.client = client
         self.raw_message = raw_message
+        self.line = line or parse_line(raw_message)
+        self._text = None
+
+    @property
+    def is_valid(self) -> bool:
+        line = self.line
+        if not line or not line.source:
+            return False
+        return len(line.params) >= self.min_params
+
+    @property
+    def target(self) -> str:
+        if self.is_valid and is_channel(self.line.params[0]):
+            return self.line.params[0].lower()
+        return None
+
+    @property
+    def text(self) -> str:
+        return None
 
     @abc.abstractmethod
-    def get_parsed_message(self, **kwargs) -> str:
+    def get_parsed_message(self, line: IrcLine) -> str:
+        pass
+
+    def apply(self) -> None:
         pass
 
     def __str__(self):
-        match = self.expr.search(self.raw_message)
-        if match:
-            return self.get_parsed_message(**match.groupdict())
-        return self.raw_message
+        if self._text is None:
+            if self.is_valid:
+                self._text = self.get_parsed_message(self.line)
+            else:
+                self._text = self.raw_message
+        return self._text
 
 
 class JoinMessage(ServerMessage):
-    expr = re.compile(r":(?P<nick>[^\s!]+)!?\S+ JOIN :?(?P<channel>\S+)")
+    def apply(self) -> None:
+        if self.is_valid:
+            nick = self.line.nick
+            is_self = nick == self.client.nickname
+            self.client.members.join(self.line.params[0], nick, is_self)
+            if is_self:
+                self.client.fetch_history(self.line.params[0])
 
-    def get_parsed_message(self, nick, channel) -> str:
-        return f"{nick} присоединился к {channel}"
+    def get_parsed_message(self, line: IrcLine) -> str:
+        return f"{line.nick} присоединился к {line.params[0]}"
 
 
 class PartMessage(ServerMessage):
-    expr = re.compile(r":(?P<nick>[^\s!]+)!?\S+ PART :?(?P<channel>\S+)")
+    def apply(self) -> None:
+        if self.is_valid:
+            nick = self.line.nick
+            is_self = nick == self.client.nickname
+            self.client.members.part(self.line.params[0], nick, is_self)
+
+    def get_parsed_message(self, line: IrcLine) -> str:
+        return f"{line.nick} покинул {line.params[0]}"
+
+
+class KickMessage(ServerMessage):
+    min_params = 2
+
+    def apply(self) -> None:
+        if not self.is_valid:
+            return
+        channel, nick = self.line.params[0].lower(), self.line.params[1]
+        is_self = nick == self.client.nickname
+        self.client.members.part(channel, nick, is_self)
+        if is_self:
+            self.client.joined_channels.discard(channel)
+            if self.client.current_channel == channel:
+                self.client.current_channel = None
+            self.client.save_state()
+
+    def get_parsed_message(self, line: IrcLine) -> str:
+        channel, nick = line.params[0], line.params[1]
+        reason = line.params[2] if len(line.params) > 2 else ""
+        return f"{line.nick} выгнал {nick} из {channel}: {reason}"
+
 
-    def get_parsed_message(self, nick, channel) -> str:
-        return f"{nick} покинул {channel}"
+class QuitMessage(ServerMessage):
+    min_params = 0
+
+    @property
+    def target(self) -> str:
+        return None
+
+    def apply(self) -> None:
+        if self.is_valid:
+            self.client.members.quit(self.line.nick)
+
+    def get_parsed_message(self, line: IrcLine) -> str:
+        reason = line.params[-1] if line.params else ""
+        return f"{line.nick} вышел из сети ({reason})"
 
 
 class NoticeMessage(ServerMessage):
-    expr = re.compile(r":(?P<sender>[^\s!]+)(!.*)? NOTICE .+ :(?P<text>.+)")
+    min_params = 2
 
-    def get_parsed_message(self, sender, text) -> str:
-        return f"[{sender}] >> {text}"
+    @property
+    def text(self) -> str:
+        return self.line.params[-1] if self.is_valid else None
+
+    def get_parsed_message(self, line: IrcLine) -> str:
+        return f"[{line.nick}] >> {line.params[-1]}"
 
 
 class PrivateMessage(ServerMessage):
-    expr = re.compile(
-        r":(?P<sender>[^\s!]+)(!.*)? PRIVMSG (?P<target>.+) :(?P<text>.+)"
-    )
+    min_params = 2
+
+    @property
+    def text(self) -> str:
+        return self.line.params[-1] if self.is_valid else None
 
-    def get_parsed_message(self, sender, target, text) -> str:
-        return f"[{target}] <{sender}>: {text}"
+    @property
+    def target(self) -> str:
+        if not self.is_valid:
+            return None
+        recipient, nickname = self.line.params[0], self.client.nickname
+        if self.line.nick == nickname and not is_channel(recipient):
+            return recipient
+        if recipient == nickname:
+            return self.line.nick
+        return super().target
+
+    def get_parsed_message(self, line: IrcLine) -> str:
+        return f"[{line.params[0]}] <{line.nick}>: {line.params[-1]}"
 
 
 class ModeMessage(ServerMessage):
-    expr = re.compile(r":(?P<nick>\S+) MODE (?P<target>\S+) :?(?P<mode>\S+)")
+    min_params = 2
 
-    def get_parsed_message(self, nick, target, mode) -> str:
+    def get_parsed_message(self, line: IrcLine) -> str:
+        nick, target, mode = line.source, line.params[0], line.params[1]
         if target == nick:
             return f"{nick} сменил свой флаг на {mode}"
 
@@ -61,43 +151,79 @@ class ModeMessage(ServerMessage):
 
 
 class ServiceMessage(ServerMessage):
-    expr = re.compile(
-        r":(?P<sender>[^\s!]+)(!.*)? (?P<code>\d{3}) \S+ :?(?P<text>.+)"
-    )
+    min_params = 2
     CHAN_ERRORS = {442, 470, 471, 473, 474, 475, 477, 478}
     NICK_ERROR = 433
 
-    def get_parsed_message(self, sender: str, text: str, code: str) -> str:
-        response_code = int(code)
+    @property
+    def target(self) -> str:
+        if not self.is_valid or self.line.command == "322":
+            return None
+        for param in self.line.params[1:-1]:
+            if is_channel(param):
+                return param.lower()
+        return None
+
+    def apply(self) -> None:
+        if not self.is_valid:
+            return
+        response_code = int(self.line.command)
         if response_code in self.CHAN_ERRORS:
             curr_channel = self.client.current_channel
             if curr_channel in self.client.joined_channels:
                 self.client.joined_channels.remove(curr_channel)
             self.client.current_channel = None
 
-        if response_code == self.NICK_ERROR:
+        if response_code == 1:
+            self.client.on_registered(self.line.params[0])
+        if response_code == self.NICK_ERROR and self.client.is_registered:
             self.client.nickname = self.client.prev_nick
-        if response_code == 322:
-            self.client.view.display_channel(self.get_channel())
-        if response_code == 376:
-            channel_list = self.client.favourites.get(self.client.hostname)
-            self.join_from_cache(channel_list)
-        return f"[{sender}] >> {text}"
-
-    def get_channel(self) -> str:
-        pattern = r":([^\s!]+)(!.*)? 322 \S+ (?P<chan>#\S+) :?(.+)"
-        match = re.search(pattern, self.raw_message)
-        if match:
-            return match.groupdict()["chan"]
-
-    def join_from_cache(self, channels: str):
-        if channels:
-            message = f"JOIN {channels}\r\n".encode(self.client.code_page)
-            self.client.sock.sendall(message)
+            self.client.save_state()
+        elif response_code == self.NICK_ERROR:
+            self.client.nickname += "_"
+            message = f"NICK {self.client.nickname}\r\n"
+            self.client.send(message.encode(self.client.code_page))
+        if response_code == 353 and len(self.line.params) > 3:
+            names = self.line.params[-1].split()
+            self.client.members.add_names(self.line.params[-2], names)
+        if response_code == 366:
+            self.client.members.end_names(self.line.params[1])
+        if response_code == 321:
+            self.client.view.start_channel_list(self.client.hostname)
+        if response_code == 322 and self.get_channel():
+            channel = self.get_channel()
+            self.client.view.display_channel(self.client.hostname, *channel)
+
+    def get_parsed_message(self, line: IrcLine) -> str:
+        return f"[{line.nick}] >> {' '.join(line.params[1:])}"
+
+    def get_channel(self) -> tuple:
+        params = self.line.params
+        if len(params) > 2 and params[1].startswith("#"):
+            users = int(params[2]) if params[2].isdigit() else 0
+            topic = params[3] if len(params) > 3 else ""
+            return params[1], users, topic
+
+
+class BatchMessage(ServerMessage):
+    def get_parsed_message(self, line: IrcLine) -> str:
+        return " ".join(line.params)
 
 
 class NickMessage(ServerMessage):
-    expr = re.compile(r":(?P<nick>[^\s!]+)!?\S+ NICK.* :?(?P<new_nick>\S+)")
-
-    def get_parsed_message(self, nick, new_nick) -> str:
-        return f"{nick} сменил ник на {new_nick}"
+    @property
+    def target(self) -> str:
+        return None
+
+    def apply(self) -> None:
+        if not self.is_valid:
+            return
+        nick, new_nick = self.line.nick, self.line.params[-1]
+        self.client.members.rename(nick, new_nick)
+        client = self.client
+        if nick == client.prev_nick and new_nick == client.nickname:
+            client.preferred_nick = new_nick
+            client.save_state()
+
+    def get_parsed_message(self, line: IrcLine) -> str:
+        return f"{line.nick} сменил ник на {line.params[-1]}"
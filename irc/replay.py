@@ -0,0 +1,88 @@
+import argparse
+import logging
+import sys
+import time
+
+from irc import capture
+from irc.cli.view import CliView
+from irc.client import Client
+from irc.session import Session
+from irc.view import NullView
+
+logger = logging.getLogger(__name__)
+
+
+class ReplaySession(Session):
+    def send(self, data: bytes) -> None:
+        pass
+
+
+class Replayer:
+    def __init__(self, client: Client, speed: float = 1.0):
+        self.client = client
+        self.speed = speed
+        self.sessions = {}
+        self.lines = 0
+        self.received_bytes = 0
+
+    def open_session(self, stream_id: int, payload: bytes) -> None:
+        hostname, _, encoding = payload.decode().partition(" ")
+        session = ReplaySession(self.client, self.client.nickname)
+        session.hostname = hostname
+        session.is_connected = True
+        session.framer.encoding = encoding or self.client.code_page
+        self.sessions[stream_id] = session
+        self.client.sessions[hostname] = session
+        self.client.active = session
+
+    def replay(self, path: str) -> float:
+        started = time.monotonic()
+        first_timestamp = None
+        for kind, timestamp, stream_id, data in capture.read_capture(path):
+            if first_timestamp is None:
+                first_timestamp = timestamp
+            if self.speed:
+                due = (timestamp - first_timestamp) / self.speed
+                delay = due - (time.monotonic() - started)
+                if delay > 0:
+                    time.sleep(delay)
+
+            if kind == capture.OPEN:
+                self.open_session(stream_id, data)
+            elif kind == capture.RECEIVED and stream_id in self.sessions:
+                session = self.sessions[stream_id]
+                self.received_bytes += len(data)
+                self.lines += data.count(b"\n")
+                session.handle_data(data)
+        return time.monotonic() - started
+
+
+VIEWS = {"cli": CliView, "null": NullView}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Replay a traffic capture")
+    parser.add_argument("path")
+    parser.add_argument(
+        "--speed",
+        type=float,
+        default=1.0,
+        help="playback speed multiplier, 0 replays as fast as possible",
+    )
+    parser.add_argument("--view", choices=list(VIEWS), default="cli")
+    parser.add_argument("--nickname", default="replay")
+    args = parser.parse_args()
+
+    client = Client(args.nickname, "utf-8", {}, VIEWS[args.view]())
+    replayer = Replayer(client, args.speed)
+    elapsed = replayer.replay(args.path)
+    rate = replayer.lines / elapsed if elapsed else 0
+    print(
+        f"Replayed {replayer.lines} lines ({replayer.received_bytes} bytes) "
+        f"in {elapsed:.3f} s, {rate:.0f} lines/s",
+        file=sys.stderr,
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,141 @@
+import errno
+import itertools
+import logging
+import selectors
+import socket
+import threading
+import time
+
+from irc import const
+
+logger = logging.getLogger(__name__)
+
+IN_PROGRESS = {0, errno.EINPROGRESS, errno.EWOULDBLOCK, errno.EAGAIN}
+
+
+def order_addresses(addresses: list) -> list:
+    by_family = {}
+    for address in addresses:
+        by_family.setdefault(address[0], []).append(address)
+    ordered = []
+    for group in itertools.zip_longest(*by_family.values()):
+        ordered.extend(address for address in group if address)
+    return ordered
+
+
+def format_address(sockaddr: tuple) -> str:
+    host, port = sockaddr[:2]
+    return f"[{host}]:{port}" if ":" in host else f"{host}:{port}"
+
+
+class Resolver:
+    def __init__(
+        self,
+        ttl: float = const.DNS_CACHE_TTL,
+        timeout: float = const.DNS_TIMEOUT,
+    ):
+        self.ttl = ttl
+        self.timeout = timeout
+        self._cache = {}
+        self._lock = threading.Lock()
+
+    def resolve(self, hostname: str, port: int) -> list:
+        addresses = self._lookup(hostname, port)
+        if addresses is None:
+            addresses = self._getaddrinfo(hostname, port)
+            addresses = self._store(hostname, port, addresses)
+        return addresses
+
+    def _getaddrinfo(self, hostname: str, port: int) -> list:
+        result = {}
+
+        def lookup():
+            try:
+                result["addresses"] = socket.getaddrinfo(
+                    hostname, port, type=socket.SOCK_STREAM
+                )
+            except OSError as e:
+                result["error"] = e
+
+        worker = threading.Thread(target=lookup, name="resolver", daemon=True)
+        worker.start()
+        worker.join(self.timeout)
+        if worker.is_alive():
+            raise socket.timeout(f"Resolving {hostname} timed out")
+        if "error" in result:
+            raise result["error"]
+        return result["addresses"]
+
+    async def resolve_async(self, hostname: str, port: int, loop) -> list:
+        addresses = self._lookup(hostname, port)
+        if addresses is None:
+            addresses = await loop.getaddrinfo(
+                hostname, port, type=socket.SOCK_STREAM
+            )
+            addresses = self._store(hostname, port, addresses)
+        return addresses
+
+    def forget(self, hostname: str, port: int) -> None:
+        with self._lock:
+            self._cache.pop((hostname.lower(), port), None)
+
+    def _lookup(self, hostname: str, port: int) -> list:
+        with self._lock:
+            entry = self._cache.get((hostname.lower(), port))
+        if entry and entry[0] > time.monotonic():
+            return entry[1]
+        return None
+
+    def _store(self, hostname: str, port: int, addresses: list) -> list:
+        addresses = order_addresses(addresses)
+        with self._lock:
+            expires = time.monotonic() + self.ttl
+            self._cache[(hostname.lower(), port)] = expires, addresses
+        return addresses
+
+
+def connect_staggered(
+    addresses: list,
+    on_attempt: callable,
+    delay: float = const.HAPPY_EYEBALLS_DELAY,
+    timeout: float = const.CONNECT_TIMEOUT,
+) -> socket.socket:
+    deadline = time.monotonic() + timeout
+    candidates = iter(addresses)
+    errors = []
+    with selectors.DefaultSelector() as selector:
+        try:
+            while True:
+                address = next(candidates, None)
+                if address is not None:
+                    family, type_, proto, _, sockaddr = address
+                    on_attempt(sockaddr)
+                    sock = socket.socket(family, type_, proto)
+                    sock.setblocking(False)
+                    error = sock.connect_ex(sockaddr)
+                    if error not in IN_PROGRESS:
+                        sock.close()
+                        errors.append(OSError(error, errno.errorcode[error]))
+                        continue
+                    selector.register(sock, selectors.EVENT_WRITE)
+                elif not selector.get_map():
+                    break
+
+                wait = deadline - time.monotonic()
+                if wait <= 0:
+                    raise socket.timeout("Connection timed out")
+                if address is not None:
+                    wait = min(wait, delay)
+                for key, _ in selector.select(wait):
+                    sock = key.fileobj
+                    selector.unregister(sock)
+                    error = sock.getsockopt(socket.SOL_SOCKET, socket.SO_ERROR)
+                    if not error:
+                        sock.setblocking(True)
+                        return sock
+                    sock.close()
+                    errors.append(OSError(error, errno.errorcode[error]))
+        finally:
+            for key in list(selector.get_map().values()):
+                key.fileobj.close()
+    raise errors[-1] if errors else OSError("No addresses to connect to")
@@ -0,0 +1,167 @@
+import datetime
+import os
+import sqlite3
+import threading
+import time
+
+from irc import const
+from irc.writer import BackgroundWriter
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS messages (
+    id INTEGER PRIMARY KEY,
+    time REAL NOT NULL,
+    network TEXT NOT NULL,
+    channel TEXT NOT NULL,
+    nick TEXT,
+    text TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS messages_channel
+    ON messages (network, channel, time);
+CREATE VIRTUAL TABLE IF NOT EXISTS messages_fts USING fts5(
+    text, content='messages', content_rowid='id'
+);
+"""
+
+
+class SearchQuery:
+    def __init__(
+        self,
+        text: str,
+        network: str = None,
+        channel: str = None,
+        nick: str = None,
+        since: float = None,
+        until: float = None,
+        limit: int = const.SEARCH_LIMIT,
+    ):
+        self.text = text
+        self.network = network
+        self.channel = channel
+        self.nick = nick
+        self.since = since
+        self.until = until
+        self.limit = limit
+
+    @classmethod
+    def from_args(cls, args: tuple) -> "SearchQuery":
+        words = []
+        query = cls("")
+        for arg in args:
+            key, _, value = arg.partition(":")
+            if arg[:1] in const.CHANNEL_PREFIXES:
+                query.channel = arg.lower()
+            elif key == "net" and value:
+                query.network = value.lower()
+            elif key == "from" and value:
+                query.nick = value
+            elif key == "since" and value:
+                query.since = parse_time(value)
+            elif key == "until" and value:
+                query.until = parse_time(value)
+            else:
+                words.append(arg)
+        query.text = " ".join(words)
+        return query
+
+    def to_match(self) -> str:
+        terms = self.text.split()
+        return " ".join('"' + term.replace('"', '""') + '"' for term in terms)
+
+
+def parse_time(value: str) -> float:
+    if value[:-1].isdigit() and value[-1] in "dh":
+        hours = int(value[:-1]) * (24 if value[-1] == "d" else 1)
+        return time.time() - hours * 3600
+    return datetime.datetime.strptime(value, "%Y-%m-%d").timestamp()
+
+
+class SearchIndex(BackgroundWriter):
+    name = "search-index"
+
+    def __init__(
+        self,
+        path: str,
+        queue_size: int = const.LOG_QUEUE_SIZE,
+        commit_interval: float = const.LOG_FSYNC_INTERVAL,
+    ):
+        super().__init__(queue_size, commit_interval)
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self.path = path
+        self._db = self.connect()
+        self._db.executescript(SCHEMA)
+        self._reader = self.connect()
+        self._reader_lock = threading.Lock()
+        self.start()
+
+    def connect(self) -> sqlite3.Connection:
+        connection = sqlite3.connect(self.path, check_same_thread=False)
+        connection.execute("PRAGMA journal_mode=WAL")
+        connection.execute("PRAGMA synchronous=NORMAL")
+        return connection
+
+    def add(
+        self,
+        network: str,
+        channel: str,
+        nick: str,
+        text: str,
+        timestamp: float = None,
+    ) -> None:
+        self.put((timestamp or time.time(), network, channel, nick, text))
+
+    def write_batch(self, batch: list) -> None:
+        with self._db:
+            first_id = self._db.execute(
+                "SELECT coalesce(max(id), 0) FROM messages"
+            ).fetchone()[0]
+            self._db.executemany(
+                "INSERT INTO messages (time, network, channel, nick, text) "
+                "VALUES (?, ?, ?, ?, ?)",
+                batch,
+            )
+            self._db.execute(
+                "INSERT INTO messages_fts (rowid, text) "
+                "SELECT id, text FROM messages WHERE id > ?",
+                (first_id,),
+            )
+
+    def finish(self) -> None:
+        self._db.close()
+
+    def search(self, query: SearchQuery) -> list:
+        conditions = ["messages_fts MATCH ?"]
+        params = [query.to_match()]
+        filters = (
+            ("m.network = ?", query.network),
+            ("m.channel = ?", query.channel),
+            ("m.nick = ? COLLATE NOCASE", query.nick),
+            ("m.time >= ?", query.since),
+            ("m.time < ?", query.until),
+        )
+        for condition, value in filters:
+            if value is not None:
+                conditions.append(condition)
+                params.append(value)
+        params.append(query.limit)
+        sql = (
+            "SELECT m.time, m.network, m.channel, m.nick, m.text "
+            "FROM messages_fts JOIN messages m ON m.id = messages_fts.rowid "
+            f"WHERE {' AND '.join(conditions)} "
+            "ORDER BY messages_fts.rowid DESC LIMIT ?"
+        )
+        with self._reader_lock:
+            return self._reader.execute(sql, params).fetchall()
+
+    def close(self) -> None:
+        super().close()
+        with self._reader_lock:
+            self._reader.close()
+
+
+def format_result(row: tuple) -> str:
+    timestamp, network, channel, nick, text = row
+    moment = datetime.datetime.fromtimestamp(timestamp)
+    return f"[{moment:%Y-%m-%d %H:%M}] {network} {channel} <{nick}>: {text}"
@@ -0,0 +1,140 @@
+import collections
+import logging
+import threading
+import time
+
+from irc import const
+
+logger = logging.getLogger(__name__)
+
+PRIORITY_HIGH = 0
+PRIORITY_NORMAL = 1
+PRIORITY_BULK = 2
+
+UNMETERED = {b"CAP"}
+
+PRIORITIES = {
+    b"PONG": PRIORITY_HIGH,
+    b"PING": PRIORITY_HIGH,
+    b"QUIT": PRIORITY_HIGH,
+    b"CAP": PRIORITY_HIGH,
+    b"PRIVMSG": PRIORITY_BULK,
+    b"NOTICE": PRIORITY_BULK,
+}
+
+
+class TokenBucket:
+    def __init__(self, burst: float, rate: float):
+        self.capacity = burst
+        self.rate = rate
+        self.tokens = burst
+        self._updated = time.monotonic()
+
+    def refill(self, now: float) -> None:
+        if self.rate:
+            elapsed = now - self._updated
+            self.tokens = min(self.capacity, self.tokens + elapsed * self.rate)
+        self._updated = now
+
+    def take(self) -> bool:
+        if not self.rate:
+            return True
+        if self.tokens < 1:
+            return False
+        self.tokens -= 1
+        return True
+
+    def charge(self) -> None:
+        if self.rate:
+            self.tokens -= 1
+
+    def delay(self) -> float:
+        if not self.rate or self.tokens >= 1:
+            return 0
+        return (1 - self.tokens) / self.rate
+
+
+class SendQueue:
+    def __init__(self, burst: float, rate: float, max_size: int):
+        self.max_size = max_size
+        self._bucket = TokenBucket(burst, rate)
+        self._lanes = (
+            collections.deque(),
+            collections.deque(),
+            collections.deque(),
+        )
+        self._lock = threading.Lock()
+        self.depth = 0
+        self.sent_lines = 0
+        self.sent_batches = 0
+        self.dropped_lines = 0
+        self.delayed_lines = 0
+        self.max_wait = 0.0
+
+    @staticmethod
+    def get_command(line: bytes) -> bytes:
+        if line.startswith(b"@"):
+            line = line.partition(b" ")[2]
+        return line.split(b" ", 1)[0].upper()
+
+    def put(self, data: bytes) -> None:
+        now = time.monotonic()
+        with self._lock:
+            for line in data.split(b"\r\n"):
+                if not line:
+                    continue
+                command = self.get_command(line)
+                priority = PRIORITIES.get(command, PRIORITY_NORMAL)
+                if self.depth >= self.max_size and priority != PRIORITY_HIGH:
+                    self.dropped_lines += 1
+                    logger.debug(f"Send queue is full, dropped: {line}")
+                    continue
+                is_metered = command not in UNMETERED
+                self._lanes[priority].append((line + b"\r\n", now, is_metered))
+                self.depth += 1
+
+    def pop_batch(self) -> tuple:
+        now = time.monotonic()
+        batch = []
+        size = 0
+        with self._lock:
+            self._bucket.refill(now)
+            for priority, lane in enumerate(self._lanes):
+                while lane and size < const.BUFFER_SIZE:
+                    is_metered = lane[0][2]
+                    if is_metered and priority == PRIORITY_HIGH:
+                        self._bucket.charge()
+                    elif is_metered and not self._bucket.take():
+                        break
+                    line, queued_at, _ = lane.popleft()
+                    self._account_wait(now - queued_at)
+                    batch.append(line)
+                    size += len(line)
+            self.depth -= len(batch)
+            delay = self._bucket.delay() if self.depth else None
+        if batch:
+            self.sent_lines += len(batch)
+            self.sent_batches += 1
+        return b"".join(batch), delay
+
+    def clear(self) -> None:
+        with self._lock:
+            for lane in self._lanes:
+                lane.clear()
+            self.depth = 0
+            self._bucket.tokens = self._bucket.capacity
+
+    def stats(self) -> dict:
+        return {
+            "depth": self.depth,
+            "sent_lines": self.sent_lines,
+            "sent_batches": self.sent_batches,
+            "dropped_lines": self.dropped_lines,
+            "delayed_lines": self.delayed_lines,
+            "max_wait": self.max_wait,
+        }
+
+    def _account_wait(self, wait: float) -> None:
+        if wait > const.SEND_DELAY_THRESHOLD:
+            self.delayed_lines += 1
+            self.max_wait = max(self.max_wait, wait)
@@ -0,0 +1,21 @@
+from irc import const
+
+
+def parse_port(value: str) -> tuple:
+    is_tls = value.startswith("+")
+    return int(value.lstrip("+")), is_tls
+
+
+def split_server(entry: str) -> tuple:
+    hostname, _, port = entry.partition(" ")
+    if not port.strip():
+        return hostname.lower(), const.DEFAULT_PORT, False
+    return (hostname.lower(),) + parse_port(port.strip())
+
+
+def format_server(hostname: str, port: int, is_tls: bool) -> str:
+    if is_tls:
+        return f"{hostname} +{port}"
+    if port != const.DEFAULT_PORT:
+        return f"{hostname} {port}"
+    return hostname
@@ -0,0 +1,350 @@
+import socket
+import logging
+import threading
+import time
+
+from irc import capture, const
+from irc.backoff import Backoff
+from irc.batches import BatchCollector
+from irc.capabilities import CapNegotiator
+from irc.framing import LineFramer
+from irc.handlers import MessageHandler
+from irc.keepalive import KeepAlive
+from irc.members import MemberStore
+from irc.metrics import ConnectionMetrics
+from irc.models.line import parse_server_time
+from irc.resolver import connect_staggered, format_address
+from irc.sendqueue import SendQueue
+
+logger = logging.getLogger(__name__)
+
+
+class Session:
+    def __init__(self, client, nickname: str):
+        self._client = client
+        self.sock = socket.socket()
+        self.connection = None
+        self.nickname = nickname
+        self.prev_nick = nickname
+        self.preferred_nick = nickname
+        self.hostname = None
+        self.port = None
+        self.is_tls = False
+        self.joined_channels = set()
+        self.current_channel = None
+        self.members = MemberStore()
+        self.capabilities = CapNegotiator(self)
+        self.batches = BatchCollector()
+        self.is_connected = False
+        self.is_registered = False
+        self.is_reconnecting = False
+        self.message_handler = MessageHandler(self)
+        self.framer = LineFramer(client.code_page)
+        self.keepalive = KeepAlive(
+            self, client.ping_interval, client.ping_timeout
+        )
+        self.send_queue = SendQueue(
+            client.flood_burst, client.flood_rate, client.send_queue_size
+        )
+        self._send_lock = threading.Lock()
+        self.capture_id = None
+        self.metrics = ConnectionMetrics()
+        self.backoff = Backoff(
+            client.reconnect_delay, client.reconnect_max_delay
+        )
+        self._reconnect_timer = None
+
+    @property
+    def view(self):
+        return self._client.view
+
+    @property
+    def favourites(self) -> dict:
+        return self._client.favourites
+
+    @property
+    def code_page(self) -> str:
+        return self._client.code_page
+
+    @property
+    def resolver(self):
+        return self._client.resolver
+
+    def connect(self, hostname: str, port: int, is_tls: bool = False) -> None:
+        self.is_registered = False
+        self.framer.reset()
+        self.members.clear()
+        self.capabilities.reset()
+        self.batches.reset()
+        self.keepalive.reset()
+        self.send_queue.clear()
+        context = self._client.tls.get(hostname.lower()) if is_tls else None
+        if self._client.engine:
+            from irc.connection import AsyncConnection
+
+            self.connection = AsyncConnection(self, self._client.engine)
+            self.connection.open(hostname, port, context)
+        else:
+            addresses = self.resolver.resolve(hostname, port)
+            self.sock = connect_staggered(addresses, self.on_connect_attempt)
+            if context:
+                self.sock = self.start_tls(self.sock, context, hostname)
+        self.hostname = hostname.lower()
+        self.port = port
+        self.is_tls = is_tls
+        self.is_connected = True
+        if self._client.capture:
+            self.capture_id = self._client.capture.open_stream(
+                self.hostname, self.code_page
+            )
+
+    def on_connect_attempt(self, sockaddr: tuple) -> None:
+        logger.info(f"Connecting to {format_address(sockaddr)}")
+        self.view.display_chat_text(
+            f"Подключение к {format_address(sockaddr)}..."
+        )
+
+    def start_tls(self, sock, context, hostname: str) -> socket.socket:
+        started = time.monotonic()
+        sock.settimeout(const.CONNECT_TIMEOUT)
+        sock = context.wrap_socket(sock, server_hostname=hostname)
+        sock.settimeout(None)
+        self.on_tls_handshake(sock, time.monotonic() - started)
+        return sock
+
+    def on_tls_handshake(self, ssl_object, elapsed: float) -> None:
+        reused = ssl_object.session_reused
+        logger.info(
+            f"TLS handshake took {elapsed * 1000:.0f} ms "
+            f"({ssl_object.version()}, resumed: {reused})"
+        )
+        text = f"{ssl_object.version()} установлен за {elapsed * 1000:.0f} мс"
+        if reused:
+            text += ", сессия возобновлена"
+        self.view.display_chat_text(text)
+
+    def save_tls_session(self) -> None:
+        if not self.is_tls:
+            return
+        ssl_object = self.sock
+        if self.connection:
+            ssl_object = self.connection.ssl_object
+        if ssl_object:
+            self._client.tls.remember(self.hostname, ssl_object)
+
+    def send(self, data: bytes) -> None:
+        self.send_queue.put(data)
+        if self.connection:
+            self.connection.wake_writer()
+        else:
+            self.flush()
+
+    def flush(self) -> None:
+        with self._send_lock:
+            data, delay = self.send_queue.pop_batch()
+            while data:
+                self.sock.sendall(data)
+                self.record(capture.SENT, data)
+                if delay is None:
+                    break
+                data, delay = self.send_queue.pop_batch()
+
+    def get_registration(self) -> str:
+        cap_request = self.capabilities.start()
+        return f"{cap_request}\r\nNICK {self.nickname}\r\nUSER 1 1 1 1"
+
+    def on_registered(self, nickname: str) -> None:
+        self.is_registered = True
+        self.is_reconnecting = False
+        self.backoff.reset()
+        self.nickname = self.prev_nick = nickname
+        self.save_state()
+        joins = []
+        for channel in sorted(self.joined_channels):
+            if joins and len(joins[-1]) + len(channel) < const.MAX_JOIN_LENGTH:
+                joins[-1] += f",{channel}"
+            else:
+                joins.append(f"JOIN {channel}")
+        if joins:
+            data = "".join(f"{join}\r\n" for join in joins)
+            self.send(data.encode(self.code_page))
+
+    def save_state(self) -> None:
+        self._client.save_state()
+
+    def schedule_reconnect(self) -> None:
+        self.is_reconnecting = True
+        self.metrics.reconnects += 1
+        delay = self.backoff.next_delay()
+        logger.info(f"Reconnecting to {self.hostname} in {delay:.1f} seconds")
+        self.view.display_chat_text(
+            f"Соединение с сервером {self.hostname} разорвано, "
+            f"переподключение через {delay:.0f} с..."
+        )
+        self._reconnect_timer = threading.Timer(delay, self.reconnect)
+        self._reconnect_timer.daemon = True
+        self._reconnect_timer.start()
+
+    def cancel_reconnect(self) -> None:
+        self.is_reconnecting = False
+        if self._reconnect_timer:
+            self._reconnect_timer.cancel()
+            self._reconnect_timer = None
+
+    def reconnect(self) -> None:
+        self._reconnect_timer = None
+        if not self.is_reconnecting:
+            return
+        try:
+            self.connect(self.hostname, self.port, self.is_tls)
+        except OSError as e:
+            logger.info(f"Failed to reconnect by reason - {str(e)}")
+            self.schedule_reconnect()
+            return
+        if not self.is_reconnecting:
+            self.disconnect()
+            return
+        registration = f"{self.get_registration()}\r\n"
+        self.send(registration.encode(self.code_page))
+
+    def disconnect(self) -> None:
+        self.cancel_reconnect()
+        if not self.is_connected:
+            return
+        self.save_tls_session()
+        if self.is_registered:
+            self.send_queue.put(b"QUIT\r\n")
+        self.is_connected = False
+        if self.connection:
+            self.connection.close()
+            self.connection = None
+        else:
+            try:
+                self.flush()
+            except OSError as e:
+                logger.info(f"Failed to flush before closing - {str(e)}")
+            self.sock.shutdown(socket.SHUT_WR)
+            self.sock.close()
+
+    def receive(self) -> None:
+        try:
+            raw_data = self.sock.recv(const.BUFFER_SIZE)
+            while self.is_tls and raw_data and self.sock.pending():
+                raw_data += self.sock.recv(self.sock.pending())
+        except OSError as e:
+            logger.info(f"Connection lost by reason - {str(e)}")
+            raw_data = b""
+        if raw_data:
+            self.handle_data(raw_data)
+        else:
+            self.on_connection_lost()
+
+    def record(self, kind: int, data: bytes) -> None:
+        if kind == capture.RECEIVED:
+            self.metrics.bytes_in += len(data)
+        else:
+            self.metrics.bytes_out += len(data)
+            self.metrics.lines_out += data.count(b"\n")
+        if self.capture_id:
+            self._client.capture.write(kind, self.capture_id, data)
+
+    def handle_data(self, raw_data: bytes) -> None:
+        self.record(capture.RECEIVED, raw_data)
+        self.framer.encoding = self.code_page
+        metrics = self.metrics
+        for line in self.framer.feed(raw_data):
+            metrics.lines_in += 1
+            if metrics.lines_in % metrics.sample_rate:
+                msg = self.message_handler.get_message(line)
+            else:
+                started = time.perf_counter()
+                msg = self.message_handler.get_message(line)
+                metrics.parse_latency.observe(time.perf_counter() - started)
+            if msg:
+                self.dispatch(self.batches.feed(msg))
+
+    def dispatch(self, messages: list) -> None:
+        if not messages:
+            return
+        for msg in messages:
+            msg.apply()
+        metrics = self.metrics
+        is_sampled = not metrics.lines_in % metrics.sample_rate
+        started = time.perf_counter() if is_sampled else None
+        if len(messages) == 1:
+            self.view.display_server_message(messages[0])
+        else:
+            self.view.display_batch(messages)
+        if is_sampled:
+            elapsed = time.perf_counter() - started
+            metrics.render_latency.observe(elapsed / len(messages))
+        for msg in messages:
+            self.archive(msg)
+
+    def archive(self, msg) -> None:
+        client = self._client
+        tags = msg.line.tags or {}
+        server_time = tags.get("time")
+        timestamp = parse_server_time(server_time) if server_time else None
+        if timestamp and msg.target:
+            marks = client.history_marks.setdefault(self.hostname, {})
+            mark = marks.get(msg.target.lower())
+            last = parse_server_time(mark) if mark else None
+            if last and timestamp <= last:
+                if "batch" in tags:
+                    return
+            else:
+                marks[msg.target.lower()] = server_time
+        if client.chat_log:
+            client.chat_log.write(self.hostname, msg.target, msg, timestamp)
+        if client.search_index and msg.text:
+            channel = msg.target or msg.line.nick
+            client.search_index.add(
+                self.hostname, channel, msg.line.nick, msg.text, timestamp
+            )
+
+    def fetch_history(self, channel: str) -> None:
+        if "draft/chathistory" not in self.capabilities.enabled:
+            return
+        marks = self._client.history_marks.get(self.hostname, {})
+        mark = marks.get(channel.lower())
+        if mark:
+            command = f"CHATHISTORY AFTER {channel} timestamp={mark}"
+        else:
+            command = f"CHATHISTORY LATEST {channel} *"
+        command += f" {const.CHATHISTORY_LIMIT}\r\n"
+        self.send(command.encode(self.code_page))
+
+    def on_connection_lost(self) -> None:
+        if not self.is_connected:
+            return
+        logger.info(f"Connection to {self.hostname} was closed by server")
+        self.save_tls_session()
+        self.close_connection()
+        self.connection = None
+        can_reconnect = self.is_registered or self.is_reconnecting
+        if can_reconnect and self._client.reconnect_delay:
+            self.is_connected = False
+            self.schedule_reconnect()
+            return
+        self._client.remove_session(self)
+        self.view.display_chat_text(
+            f"Соединение с сервером {self.hostname} разорвано"
+        )
+        self.is_connected = False
+        self.hostname = None
+        self.port = None
+        self.joined_channels = set()
+        self.current_channel = None
+        self.members.clear()
+
+    def close_connection(self) -> None:
+        if self.connection:
+            self.connection.close()
+        else:
+            self.sock.close()
+
+    def on_connection_dead(self) -> None:
+        logger.info(f"Server {self.hostname} stopped responding")
+        self.close_connection()
+        self.on_connection_lost()
@@ -0,0 +1,62 @@
+import io
+import logging
+import os
+import shutil
+import tempfile
+
+from configparser import ConfigParser
+from irc import const
+from irc.writer import BackgroundWriter
+
+logger = logging.getLogger(__name__)
+
+
+def write_atomic(path: str, text: str) -> None:
+    directory = os.path.dirname(os.path.abspath(path))
+    fd, temp_path = tempfile.mkstemp(prefix=".", suffix=".tmp", dir=directory)
+    try:
+        with os.fdopen(fd, "w", encoding="utf-8") as file:
+            file.write(text)
+            file.flush()
+            os.fsync(file.fileno())
+        if os.path.exists(path):
+            shutil.copymode(path, temp_path)
+        os.replace(temp_path, path)
+    except BaseException:
+        os.unlink(temp_path)
+        raise
+
+
+class StateStore(BackgroundWriter):
+    name = "state"
+
+    def __init__(self, path: str, interval: float = const.STATE_INTERVAL):
+        super().__init__(const.STATE_QUEUE_SIZE, interval)
+        self.path = path
+        self.saved_count = 0
+        self._config = ConfigParser(allow_no_value=True)
+        self._config.read(path, encoding="utf-8")
+        for section in ("Settings", "Servers"):
+            if not self._config.has_section(section):
+                self._config.add_section(section)
+        self._pending = None
+        self.start()
+
+    def save(self, state: dict) -> None:
+        self.put(state)
+
+    def write_batch(self, batch: list) -> None:
+        self._pending = batch[-1]
+
+    def sync(self) -> None:
+        if self._pending is None:
+            return
+        state, self._pending = self._pending, None
+        self._config["Settings"]["nickname"] = state["nickname"]
+        self._config["Settings"]["codepage"] = state["codepage"]
+        self._config["Servers"].update(state["servers"])
+        buffer = io.StringIO()
+        self._config.write(buffer)
+        write_atomic(self.path, buffer.getvalue())
+        self.saved_count += 1
+        logger.debug(f"Saved client state to {self.path}")
@@ -0,0 +1,335 @@
+import argparse
+import asyncio
+import hashlib
+import itertools
+import logging
+import ssl
+import time
+
+from irc import const
+from irc.framing import LineFramer
+from irc.models.line import IrcLine, parse_line
+from irc.sendqueue import TokenBucket
+
+logger = logging.getLogger(__name__)
+
+REGISTRATION = ("NICK", "USER", "CAP")
+SERVER_CAPS = (
+    "message-tags server-time batch echo-message multi-prefix "
+    "draft/chathistory"
+)
+
+
+def format_time(timestamp: float) -> str:
+    moment = time.strftime("%Y-%m-%dT%H:%M:%S", time.gmtime(timestamp))
+    return f"{moment}.{int(timestamp * 1000) % 1000:03d}Z"
+
+
+class FakeConnection:
+    def __init__(self, server, reader, writer):
+        self.server = server
+        self.reader = reader
+        self.writer = writer
+        self.nickname = None
+        self.username = None
+        self.is_registered = False
+        self.is_negotiating = False
+        self.caps = set()
+        self.received_lines = []
+        self.certfp = None
+        ssl_object = writer.get_extra_info("ssl_object")
+        certificate = ssl_object and ssl_object.getpeercert(binary_form=True)
+        if certificate:
+            self.certfp = hashlib.sha256(certificate).hexdigest()
+        self.flood_bucket = TokenBucket(server.flood_burst, server.flood_rate)
+
+    @property
+    def source(self) -> str:
+        return f"{self.nickname}!{self.username}@127.0.0.1"
+
+    def send(self, *lines: str) -> None:
+        if not self.writer.is_closing():
+            data = "".join(f"{line}\r\n" for line in lines)
+            self.writer.write(data.encode("utf-8"))
+
+    def reply(self, code: str, *params: str) -> None:
+        prefix = f":{self.server.hostname} {code} {self.nickname or '*'}"
+        self.send(" ".join((prefix,) + params))
+
+    async def run(self) -> None:
+        framer = LineFramer("utf-8")
+        try:
+            while not self.writer.is_closing():
+                data = await self.reader.read(const.BUFFER_SIZE)
+                if not data:
+                    break
+                for line in framer.feed(data):
+                    self.handle(line)
+        except OSError:
+            pass
+        finally:
+            self.close()
+
+    def handle(self, raw_line: str) -> None:
+        self.received_lines.append(raw_line)
+        self.flood_bucket.refill(time.monotonic())
+        if not self.flood_bucket.take():
+            self.send("ERROR :Closing Link: 127.0.0.1 (Excess Flood)")
+            self.close()
+            return
+
+        line = parse_line(raw_line)
+        if line is None:
+            return
+        handler = getattr(self, f"on_{line.command.lower()}", None)
+        if handler is None:
+            self.reply("421", line.command, ":Unknown command")
+        elif not self.is_registered and line.command not in REGISTRATION:
+            self.reply("451", ":You have not registered")
+        else:
+            handler(line)
+
+    def close(self) -> None:
+        for members in self.server.channels.values():
+            members.discard(self)
+        self.server.connections.discard(self)
+        if not self.writer.is_closing():
+            self.writer.close()
+
+    def on_nick(self, line: IrcLine) -> None:
+        if not line.params:
+            self.reply("431", ":No nickname given")
+            return
+        if self.is_registered:
+            self.send(f":{self.source} NICK :{line.params[0]}")
+        self.nickname = line.params[0]
+        self.register()
+
+    def on_user(self, line: IrcLine) -> None:
+        self.username = line.params[0] if line.params else "user"
+        self.register()
+
+    def on_cap(self, line: IrcLine) -> None:
+        subcommand = line.params[0].upper() if line.params else ""
+        hostname, nickname = self.server.hostname, self.nickname or "*"
+        if subcommand == "LS":
+            self.is_negotiating = True
+            self.send(f":{hostname} CAP {nickname} LS :{SERVER_CAPS}")
+        elif subcommand == "REQ":
+            caps = line.params[-1].split()
+            reply = "ACK" if set(caps) <= set(SERVER_CAPS.split()) else "NAK"
+            if reply == "ACK":
+                self.caps.update(caps)
+            self.send(f":{hostname} CAP {nickname} {reply} :{line.params[-1]}")
+        elif subcommand == "END":
+            self.is_negotiating = False
+            self.register()
+
+    def register(self) -> None:
+        if self.is_registered or self.is_negotiating:
+            return
+        if not (self.nickname and self.username):
+            return
+        self.is_registered = True
+        self.reply("001", f":Welcome to the fake network {self.source}")
+        self.reply("375", f":- {self.server.hostname} Message of the day -")
+        self.reply("376", ":End of /MOTD command")
+
+    def on_ping(self, line: IrcLine) -> None:
+        token = line.params[-1] if line.params else ""
+        hostname = self.server.hostname
+        self.send(f":{hostname} PONG {hostname} :{token}")
+
+    def on_pong(self, line: IrcLine) -> None:
+        pass
+
+    def on_join(self, line: IrcLine) -> None:
+        for channel in line.params[0].lower().split(","):
+            members = self.server.channels.setdefault(channel, set())
+            members.add(self)
+            for member in members:
+                member.send(f":{self.source} JOIN :{channel}")
+            self.send_names(channel)
+
+    def on_part(self, line: IrcLine) -> None:
+        for channel in line.params[0].lower().split(","):
+            members = self.server.channels.get(channel, set())
+            if self not in members:
+                self.reply("442", channel, ":You're not on that channel")
+                continue
+            for member in members:
+                member.send(f":{self.source} PART {channel}")
+            members.discard(self)
+
+    def on_names(self, line: IrcLine) -> None:
+        self.send_names(line.params[0].lower() if line.params else "*")
+
+    def send_names(self, channel: str) -> None:
+        members = self.server.channels.get(channel, set())
+        names = " ".join(member.nickname for member in members)
+        self.reply("353", "=", channel, f":{names}")
+        self.reply("366", channel, ":End of /NAMES list.")
+
+    def on_list(self, line: IrcLine) -> None:
+        self.reply("321", "Channel", ":Users  Name")
+        for i in range(self.server.list_size):
+            self.reply("322", f"#channel{i}", str(i % 100), f":Topic {i}")
+        self.reply("323", ":End of /LIST")
+
+    def on_privmsg(self, line: IrcLine) -> None:
+        target, text = line.params[0].lower(), line.params[-1]
+        sent_at = format_time(time.time())
+        message = f":{self.source} PRIVMSG {target} :{text}"
+        self.server.history.setdefault(target, []).append((sent_at, message))
+        for member in self.server.channels.get(target, set()):
+            if member is not self or "echo-message" in self.caps:
+                member.send_tagged(message, time=sent_at)
+
+    def send_tagged(self, message: str, **tags: str) -> None:
+        if "server-time" not in self.caps:
+            tags.pop("time", None)
+        if "batch" not in self.caps:
+            tags.pop("batch", None)
+        if tags:
+            raw_tags = ";".join(f"{k}={v}" for k, v in tags.items())
+            message = f"@{raw_tags} {message}"
+        self.send(message)
+
+    def on_chathistory(self, line: IrcLine) -> None:
+        if len(line.params) < 4:
+            self.reply("461", "CHATHISTORY", ":Not enough parameters")
+            return
+        subcommand, target, mark = line.params[:3]
+        limit = int(line.params[3])
+        history = self.server.history.get(target.lower(), [])
+        if subcommand.upper() == "AFTER":
+            after = mark.partition("=")[2]
+            history = [x for x in history if x[0] > after][:limit]
+        else:
+            history = history[-limit:]
+
+        reference = str(next(self.server.batch_ids))
+        hostname = self.server.hostname
+        self.send(f":{hostname} BATCH +{reference} chathistory {target}")
+        for sent_at, message in history:
+            self.send_tagged(message, batch=reference, time=sent_at)
+        self.send(f":{hostname} BATCH -{reference}")
+
+    def on_mode(self, line: IrcLine) -> None:
+        pass
+
+    def on_quit(self, line: IrcLine) -> None:
+        self.send("ERROR :Closing Link: 127.0.0.1 (Client Quit)")
+        self.close()
+
+
+class FakeIrcServer:
+    def __init__(
+        self,
+        hostname: str = "irc.fake.local",
+        flood_burst: float = 10,
+        flood_rate: float = 1,
+        list_size: int = 100,
+    ):
+        self.hostname = hostname
+        self.flood_burst = flood_burst
+        self.flood_rate = flood_rate
+        self.list_size = list_size
+        self.connections = set()
+        self.channels = {}
+        self.history = {}
+        self.batch_ids = itertools.count(1)
+        self._server = None
+
+    @property
+    def port(self) -> int:
+        return self._server.sockets[0].getsockname()[1]
+
+    async def start(
+        self,
+        host: str = "127.0.0.1",
+        port: int = 0,
+        context: ssl.SSLContext = None,
+    ) -> None:
+        self._server = await asyncio.start_server(
+            self._accept, host, port, ssl=context
+        )
+        logger.info(f"Fake IRC server listening on {host}:{self.port}")
+
+    async def stop(self) -> None:
+        await self.disconnect_all()
+        self._server.close()
+        await self._server.wait_closed()
+
+    async def disconnect_all(self) -> None:
+        for connection in list(self.connections):
+            connection.close()
+
+    async def _accept(self, reader, writer) -> None:
+        connection = FakeConnection(self, reader, writer)
+        self.connections.add(connection)
+        await connection.run()
+
+    async def wait_for_members(self, channel: str, count: int) -> None:
+        while len(self.channels.get(channel, ())) < count:
+            await asyncio.sleep(0.01)
+
+    async def push_traffic(
+        self, channel: str, count: int, rate: float, tick: float = 0.005
+    ) -> float:
+        members = self.channels.get(channel, set())
+        started = time.monotonic()
+        sent = 0
+        while sent < count and members:
+            due = count
+            if rate:
+                due = int((time.monotonic() - started) * rate)
+            lines = []
+            for seq in range(sent, min(due, count)):
+                lines.append(
+                    f":bot{seq % 10}!bot@fake PRIVMSG {channel} "
+                    f":{seq} {time.monotonic():.6f} synthetic traffic"
+                )
+            sent += len(lines)
+            for member in list(members):
+                member.send(*lines)
+                await member.writer.drain()
+            if sent < count:
+                await asyncio.sleep(tick)
+        return time.monotonic() - started
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Local fake IRC server")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=6667)
+    parser.add_argument("--flood-burst", type=float, default=10)
+    parser.add_argument("--flood-rate", type=float, default=1)
+    parser.add_argument("--channel", default="#load")
+    parser.add_argument("--rate", type=float, default=0)
+    parser.add_argument("--count", type=int, default=0)
+    parser.add_argument("--certfile", help="PEM with certificate and key")
+    args = parser.parse_args()
+
+    context = None
+    if args.certfile:
+        context = ssl.SSLContext(ssl.PROTOCOL_TLS_SERVER)
+        context.load_cert_chain(args.certfile)
+
+    async def serve():
+        server = FakeIrcServer(
+            flood_burst=args.flood_burst, flood_rate=args.flood_rate
+        )
+        await server.start(args.host, args.port, context)
+        while args.count:
+            await server.wait_for_members(args.channel, 1)
+            await server.push_traffic(args.channel, args.count, args.rate)
+            await asyncio.sleep(1)
+        await asyncio.Event().wait()
+
+    logging.basicConfig(level=logging.INFO)
+    asyncio.run(serve())
+
+
+if __name__ == "__main__":
+    main()
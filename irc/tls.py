@@ -0,0 +1,62 @@
+import logging
+import ssl
+import threading
+
+logger = logging.getLogger(__name__)
+
+
+class ResumableContext(ssl.SSLContext):
+    session = None
+
+    def wrap_socket(self, sock, *args, session=None, **kwargs):
+        session = session or self.session
+        return super().wrap_socket(sock, *args, session=session, **kwargs)
+
+    def wrap_bio(self, incoming, outgoing, *args, session=None, **kwargs):
+        session = session or self.session
+        return super().wrap_bio(
+            incoming, outgoing, *args, session=session, **kwargs
+        )
+
+
+class TlsContexts:
+    def __init__(
+        self,
+        verify: bool = True,
+        ca_path: str = None,
+        cert_path: str = None,
+        key_path: str = None,
+    ):
+        self.verify = verify
+        self.ca_path = ca_path
+        self.cert_path = cert_path
+        self.key_path = key_path
+        self._contexts = {}
+        self._lock = threading.Lock()
+
+    def get(self, hostname: str) -> ResumableContext:
+        with self._lock:
+            context = self._contexts.get(hostname)
+            if context is None:
+                context = self._contexts[hostname] = self.create()
+        return context
+
+    def create(self) -> ResumableContext:
+        context = ResumableContext(ssl.PROTOCOL_TLS_CLIENT)
+        if self.verify:
+            if self.ca_path:
+                context.load_verify_locations(self.ca_path)
+            else:
+                context.load_default_certs()
+        else:
+            context.check_hostname = False
+            context.verify_mode = ssl.CERT_NONE
+        if self.cert_path:
+            context.load_cert_chain(self.cert_path, self.key_path)
+        return context
+
+    def remember(self, hostname: str, ssl_object) -> None:
+        session = ssl_object.session
+        if session is not None and session.has_ticket:
+            self.get(hostname).session = session
+            logger.debug(f"Stored TLS session for {hostname}")
@@ -1,16 +1,56 @@
 import abc
-from irc.models.messages import ServerMessage
+import typing
+
+if typing.TYPE_CHECKING:
+    from irc.models.messages import ServerMessage
 
 
 class BaseView(abc.ABC):
+    dropped_lines = 0
+
     @abc.abstractmethod
     def display_chat_text(self, text: str):  # TODO: Rename
         pass
 
     @abc.abstractmethod
-    def display_server_message(self, message: ServerMessage):
+    def display_server_message(self, message: "ServerMessage"):
+        pass
+
+    def display_batch(self, messages: list):
+        for message in messages:
+            self.display_server_message(message)
+
+    def start_channel_list(self, hostname: str):
+        pass
+
+    def display_sessions(self):
         pass
 
     @abc.abstractmethod
-    def display_channel(self, channel: str):
+    def display_channel(
+        self, hostname: str, channel: str, users: int, topic: str
+    ):
+        pass
+
+    @abc.abstractmethod
+    def display_lag(self, lag: float):
+        pass
+
+
+class NullView(BaseView):
+    def display_chat_text(self, text: str):
+        pass
+
+    def display_server_message(self, message: "ServerMessage"):
+        pass
+
+    def display_batch(self, messages: list):
+        pass
+
+    def display_channel(
+        self, hostname: str, channel: str, users: int, topic: str
+    ):
+        pass
+
+    def display_lag(self, lag: float):
         pass
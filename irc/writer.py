@@ -0,0 +1,78 @@
+import logging
+import queue
+import threading
+import time
+
+from irc import const
+
+logger = logging.getLogger(__name__)
+
+
+class BackgroundWriter:
+    name = "writer"
+
+    def __init__(self, queue_size: int, interval: float):
+        self.interval = interval
+        self.dropped_lines = 0
+        self.written_lines = 0
+        self._queue = queue.Queue(queue_size)
+        self._thread = threading.Thread(
+            target=self._run, name=self.name, daemon=True
+        )
+
+    def start(self) -> None:
+        self._thread.start()
+
+    def put(self, record: tuple) -> None:
+        try:
+            self._queue.put_nowait(record)
+        except queue.Full:
+            self.dropped_lines += 1
+
+    def close(self) -> None:
+        if self._thread.is_alive():
+            self._queue.put(None)
+            self._thread.join()
+
+    def write_batch(self, batch: list) -> None:
+        pass
+
+    def sync(self) -> None:
+        pass
+
+    def finish(self) -> None:
+        pass
+
+    def _run(self) -> None:
+        synced_at = time.monotonic()
+        is_closing = False
+        while not is_closing:
+            batch = self._get_batch()
+            if batch and batch[-1] is None:
+                batch.pop()
+                is_closing = True
+
+            try:
+                if batch:
+                    self.write_batch(batch)
+                    self.written_lines += len(batch)
+                now = time.monotonic()
+                if is_closing or now - synced_at >= self.interval:
+                    self.sync()
+                    synced_at = now
+            except Exception:
+                logger.exception(f"{self.name} failed to write a batch")
+
+        self.finish()
+
+    def _get_batch(self) -> list:
+        try:
+            batch = [self._queue.get(timeout=self.interval)]
+        except queue.Empty:
+            return []
+        while batch[-1] is not None and len(batch) < const.LOG_BATCH_SIZE:
+            try:
+                batch.append(self._queue.get_nowait())
+            except queue.Empty:
+                break
+        return batch
@@ -1,6 +1,8 @@
+import socket
 import pytest
 
 from irc.client import Client
+from irc.engine import AsyncEngine
 from irc.handlers import CommandHandler, MessageHandler
 from irc.cli.view import CliView
 
@@ -12,6 +14,7 @@ def tested_client() -> Client:
     client.hostname = "test_server"
     client.current_channel = "#test"
     client.joined_channels.add("#test")
+    client.sessions["test_server"] = client.active
     return client
 
 
@@ -30,3 +33,22 @@ def tested_handler(tested_client) -> CommandHandler:
 @pytest.fixture()
 def tested_parser(tested_client) -> MessageHandler:
     return MessageHandler(tested_client)
+
+
+@pytest.fixture()
+def async_client() -> Client:
+    engine = AsyncEngine()
+    engine.start()
+    client = Client("TestName", "cp866", {}, CliView(), engine)
+    yield client
+    client.exit_client()
+
+
+@pytest.fixture()
+def local_server() -> socket.socket:
+    server = socket.socket()
+    server.bind(("127.0.0.1", 0))
+    server.listen(1)
+    server.settimeout(5)
+    yield server
+    server.close()
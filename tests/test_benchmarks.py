@@ -0,0 +1,26 @@
+import pytest
+
+from benchmarks import traffic
+from benchmarks.__main__ import compare, get_benchmarks, measure
+
+
+@pytest.mark.parametrize("mix", list(traffic.MIXES))
+def test_traffic_generation(mix: str):
+    data, encoding, lines = traffic.generate(mix, 100)
+    assert lines == 100
+    assert data.count(b"\r\n") == 100
+    data.decode(encoding)
+
+
+def test_benchmark_smoke():
+    results = {
+        name: measure(factory, 1)
+        for name, factory in get_benchmarks(50).items()
+        if name in ("commands", "receive.cp1251")
+    }
+    assert results["receive.cp1251"]["lines"] == 50
+    baseline = {
+        name: dict(result, us_per_line=result["us_per_line"] / 2)
+        for name, result in results.items()
+    }
+    assert compare(results, baseline, 10) == list(results)
@@ -0,0 +1,39 @@
+import pytest
+
+from irc import const
+
+QtCore = pytest.importorskip("PyQt5.QtCore")
+
+from irc.gui.bridge import MessageBridge  # noqa: E402
+
+
+@pytest.fixture()
+def bridge() -> MessageBridge:
+    application = QtCore.QCoreApplication.instance()
+    if application is None:
+        application = QtCore.QCoreApplication([])
+    bridge = MessageBridge(max_pending=3, batch_size=10)
+    bridge.batches = []
+    bridge.delivered.connect(bridge.batches.append)
+    yield bridge
+
+
+def test_overflow_drops_oldest_lines_with_marker(bridge: MessageBridge):
+    bridge.put_many([("a", "1"), ("b", "2"), ("a", "3")])
+    bridge.put_many([("b", "4"), ("b", "5")])
+    bridge._flush()
+
+    assert bridge.dropped == 2
+    assert bridge.batches == [
+        [
+            ("a", const.GUI_DROPPED_TEXT.format(1)),
+            ("b", const.GUI_DROPPED_TEXT.format(1)),
+            ("a", "3"),
+            ("b", "4"),
+            ("b", "5"),
+        ]
+    ]
+
+    bridge.put(("a", "6"))
+    bridge._flush()
+    assert bridge.batches[-1] == [("a", "6")]
@@ -0,0 +1,106 @@
+import datetime
+import gzip
+import os
+import threading
+
+from unittest import mock
+
+from irc.chatlog import ChatLogger, LogFile, SERVER_LOG
+
+
+def test_lines_are_logged_per_channel(tmp_path):
+    logger = ChatLogger(str(tmp_path))
+    logger.write("irc.example.net", "#Chat", "first")
+    logger.write("irc.example.net", None, "welcome")
+    logger.write("irc.example.net", "#chat", "second")
+    logger.close()
+
+    day = datetime.date.today()
+    channel_log = tmp_path / "irc.example.net" / "#chat" / f"{day}.log"
+    server_log = tmp_path / "irc.example.net" / SERVER_LOG / f"{day}.log"
+    lines = channel_log.read_text(encoding="utf-8").splitlines()
+    assert [line.split("] ", 1)[1] for line in lines] == ["first", "second"]
+    assert server_log.read_text(encoding="utf-8").endswith("] welcome\n")
+    assert logger.written_lines == 3
+
+
+def test_least_recent_files_are_closed(tmp_path):
+    logger = ChatLogger(str(tmp_path), open_files=2)
+    for target in ("#a", "bob", "carol", "#a"):
+        logger.write("net", target, target)
+    logger.close()
+
+    day = datetime.date.today()
+    lines = (tmp_path / "net" / "#a" / f"{day}.log").read_text().splitlines()
+    assert [line.split("] ", 1)[1] for line in lines] == ["#a", "#a"]
+    assert list(logger._files) == [("net", "carol"), ("net", "#a")]
+
+
+def test_unsafe_names_are_sanitized(tmp_path):
+    logger = ChatLogger(str(tmp_path))
+    logger.write("..", "../../etc", "text")
+    logger.close()
+
+    for root, _, files in os.walk(tmp_path):
+        for name in files:
+            path = os.path.join(root, name)
+            assert os.path.commonpath([path, str(tmp_path)]) == str(tmp_path)
+
+
+def test_rotation_by_size(tmp_path):
+    log_file = LogFile(str(tmp_path), 10)
+    day = datetime.date(2024, 1, 1)
+    for text in ("0123456789", "abc", "def"):
+        log_file.write(day, text)
+    log_file.close()
+
+    assert sorted(os.listdir(tmp_path)) == [
+        "2024-01-01.1.log.gz",
+        "2024-01-01.log",
+    ]
+    with gzip.open(tmp_path / "2024-01-01.1.log.gz", "rt") as file:
+        assert file.read() == "0123456789\n"
+    assert (tmp_path / "2024-01-01.log").read_text() == "abc\ndef\n"
+
+
+def test_rotation_counts_encoded_bytes(tmp_path):
+    log_file = LogFile(str(tmp_path), 10)
+    day = datetime.date(2024, 1, 1)
+    for text in ("привет", "мир"):
+        log_file.write(day, text)
+    log_file.close()
+
+    assert sorted(os.listdir(tmp_path)) == [
+        "2024-01-01.1.log.gz",
+        "2024-01-01.log",
+    ]
+
+
+def test_daily_rotation_compresses_previous_day(tmp_path):
+    log_file = LogFile(str(tmp_path), 1024)
+    log_file.write(datetime.date(2024, 1, 1), "old")
+    log_file.write(datetime.date(2024, 1, 2), "new")
+    log_file.close()
+
+    assert sorted(os.listdir(tmp_path)) == [
+        "2024-01-01.log.gz",
+        "2024-01-02.log",
+    ]
+
+
+def test_full_queue_drops_lines(tmp_path):
+    logger = ChatLogger(str(tmp_path), queue_size=10)
+    release = threading.Event()
+    write_batch = logger.write_batch
+
+    def blocked_write(batch: list):
+        release.wait()
+        write_batch(batch)
+
+    with mock.patch.object(logger, "write_batch", blocked_write):
+        for _ in range(100):
+            logger.write("net", "#c", "text")
+        release.set()
+        logger.close()
+    assert logger.dropped_lines >= 80
+    assert logger.dropped_lines + logger.written_lines == 100
@@ -1,3 +1,6 @@
+import socket
+import threading
+import time
 import pytest
 from irc.client import Client
 import irc.models.commands as com
@@ -19,3 +22,76 @@ def test_incorrect_hostname(network_client: Client, hostname: str):
     assert not network_client.hostname
     assert command.output.startswith("Не удалось подключиться")
     com.ExitCommand(network_client)()
+
+
+def test_async_engine_interaction(async_client: Client, local_server):
+    port = local_server.getsockname()[1]
+    com.ConnectCommand(async_client, "127.0.0.1", str(port))()
+    assert async_client.is_connected
+    server_side, _ = local_server.accept()
+    with server_side:
+        async_client.process_user_input("/join #test")
+        server_side.settimeout(5)
+        assert server_side.recv(1024) == b"JOIN #test \r\n"
+        server_side.sendall(b":nick!user@host PART #test\r\n")
+        server_side.shutdown(socket.SHUT_WR)
+        for _ in range(50):
+            if not async_client.is_connected:
+                break
+            time.sleep(0.1)
+    assert not async_client.is_connected
+
+
+def test_dead_connection_detection(async_client: Client, local_server):
+    async_client.keepalive.interval = 0.1
+    async_client.keepalive.timeout = 0.2
+    port = local_server.getsockname()[1]
+    com.ConnectCommand(async_client, "127.0.0.1", str(port))()
+    server_side, _ = local_server.accept()
+    with server_side:
+        server_side.settimeout(5)
+        assert server_side.recv(1024).startswith(b"PING :lag")
+        for _ in range(50):
+            if not async_client.is_connected:
+                break
+            time.sleep(0.1)
+    assert not async_client.is_connected
+
+
+@pytest.mark.parametrize("use_engine", [True, False])
+def test_multiple_networks(use_engine: bool, async_client: Client):
+    client = async_client
+    if not use_engine:
+        client = Client("TestName", "cp866", {}, async_client.view)
+        threading.Thread(target=client.wait_for_response).start()
+    servers = [socket.create_server(("127.0.0.1", 0)) for _ in range(2)]
+    connections = []
+    try:
+        for hostname, server in zip(["127.0.0.1", "localhost"], servers):
+            port = str(server.getsockname()[1])
+            client.process_user_input(f"/server {hostname} {port}")
+            server.settimeout(5)
+            connections.append(server.accept()[0])
+            connections[-1].settimeout(5)
+            registration = connections[-1].recv(1024)
+            assert registration.startswith(b"CAP LS 302\r\nNICK TestName")
+        assert len(client.sessions) == 2
+
+        client.process_user_input("/join #second")
+        assert connections[1].recv(1024) == b"JOIN #second \r\n"
+        client.process_user_input("/network 127.0.0.1")
+        client.process_user_input("/join #first")
+        assert connections[0].recv(1024) == b"JOIN #first \r\n"
+        assert client.current_channel == "#first"
+
+        connections[1].sendall(b":irc 366 TestName #second :End\r\n")
+        connections[1].close()
+        for _ in range(50):
+            if len(client.sessions) == 1:
+                break
+            time.sleep(0.1)
+        assert list(client.sessions) == ["127.0.0.1"]
+    finally:
+        client.exit_client()
+        for sock in servers + connections:
+            sock.close()
@@ -17,7 +17,7 @@ from unittest import mock
     ],
 )
 def test_command_handler(
-        tested_handler, test_input: str, expected_command: type
+    tested_handler, test_input: str, expected_command: type
 ):
     actual_command = tested_handler.get_command(test_input)
     assert isinstance(actual_command, expected_command)
@@ -30,17 +30,17 @@ def test_command_handler(
         (com.JoinCommand, "JOIN &test pass\r\n", ("&test", "pass")),
         (com.PartCommand, "PART #test\r\n", ()),
         (com.NickCommand, "NICK new_nickname1\r\n", ("new_nickname1",)),
-        (com.ConnectCommand, "", ("irc.ircnet.su", "6667")),
+        (com.ConnectCommand, "", ("test_server", "6667")),
         (com.ListCommand, "LIST\r\n", ()),
         (
-                com.WhisperCommand,
-                "PRIVMSG #channel :test text\r\n",
-                ("#channel", "test", "text"),
+            com.WhisperCommand,
+            "PRIVMSG #channel :test text\r\n",
+            ("#channel", "test", "text"),
         ),
     ],
 )
 def test_command_execution(
-        tested_client, command_type, expected_result: str, args: tuple
+    tested_client, command_type, expected_result: str, args: tuple
 ):
     actual_command = command_type(tested_client, *args)
     assert actual_command() == expected_result
@@ -50,7 +50,7 @@ def test_command_execution(
     "command_type, expected_output, args",
     [
         (com.JoinCommand, "None", ("#casual",)),
-        (com.ConnectCommand, "Вы уже подключены", ("irc.ircnet.su", "6667")),
+        (com.ConnectCommand, "Вы уже подключены", ("test_server", "6667")),
         (com.NickCommand, "Недопустимый никнейм", ("!@^&$%",)),
         (com.AddFavCommand, "Сервер test_server добавлен", ()),
         (com.CodePageCommand, "Допустимые кодировки:", ("cp1255",)),
@@ -64,9 +64,32 @@ def test_command_execution(
     ],
 )
 def test_command_output(
-        tested_client, command_type, expected_output: str, args: tuple
+    tested_client, command_type, expected_output: str, args: tuple
 ):
-    with mock.patch.object(tested_client, "sock"):
+    with mock.patch.object(tested_client.active, "sock"):
         current_command = command_type(tested_client, *args)
         current_command()
         assert str(current_command.output).startswith(expected_output)
+
+
+@pytest.mark.parametrize(
+    "args, expected",
+    [
+        (("irc.net",), (6667, False)),
+        (("irc.net", "+7000"), (7000, True)),
+        (("irc.net", "--tls"), (6697, True)),
+        (("irc.tls.net",), (6698, True)),
+        (("irc.tls.net", "6667"), (6667, False)),
+    ],
+)
+def test_connect_port_syntax(tested_client, args: tuple, expected: tuple):
+    tested_client.favourites["irc.tls.net +6698"] = "#tls"
+    with mock.patch.object(tested_client, "connect") as connect:
+        com.ConnectCommand(tested_client, *args)()
+    assert connect.call_args.args == (args[0],) + expected
+
+
+def test_list_resets_channels_without_liststart(tested_client):
+    with mock.patch.object(tested_client.view, "start_channel_list") as start:
+        com.ListCommand(tested_client)()
+    start.assert_called_once_with("test_server")
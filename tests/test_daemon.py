@@ -0,0 +1,224 @@
+import threading
+import time
+import pytest
+
+from unittest import mock
+
+from irc import errors
+from irc.client import Client
+from irc.daemon import Attachment, BroadcastView, Daemon, RemoteClient
+from irc.engine import AsyncEngine
+from irc.testing.fake_server import FakeIrcServer
+from irc.view import NullView
+
+
+class RecordingView(NullView):
+    def __init__(self):
+        self.texts = []
+        self.tabs = []
+        self.state_updates = 0
+
+    def display_chat_text(self, text: str):
+        self.texts.append(text)
+
+    def display_server_message(self, message):
+        self.texts.append(str(message))
+        self.tabs.append((message.client.hostname, message.target))
+
+    def display_sessions(self):
+        self.state_updates += 1
+
+
+def wait_until(predicate: callable, timeout: float = 5) -> bool:
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if predicate():
+            return True
+        time.sleep(0.01)
+    return predicate()
+
+
+@pytest.fixture()
+def daemon(tmp_path) -> Daemon:
+    server_engine = AsyncEngine()
+    server_engine.start()
+    server = FakeIrcServer(flood_burst=10, flood_rate=5)
+    server_engine.run(server.start())
+    engine = AsyncEngine()
+    engine.start()
+    client = Client("TestName", "utf-8", {}, BroadcastView(), engine)
+    daemon = Daemon(client, str(tmp_path / "irc.sock"))
+    daemon.start()
+    daemon.fake_server = server
+    yield daemon
+    daemon.close()
+    client.exit_client()
+    server_engine.run(server.stop())
+    server_engine.stop()
+
+
+@pytest.fixture()
+def attach(daemon) -> callable:
+    frontends = []
+
+    def attach_frontend(name: str = "cli", seq: int = None) -> RemoteClient:
+        frontend = RemoteClient(RecordingView(), daemon.path, name)
+        frontend.receiver = threading.Thread(target=frontend.receive)
+        frontend.receiver.start()
+        frontend.attach(seq)
+        frontends.append(frontend)
+        return frontend
+
+    yield attach_frontend
+    for frontend in frontends:
+        frontend.detach()
+        frontend.receiver.join(5)
+
+
+def detach(frontend: RemoteClient) -> None:
+    frontend.detach()
+    frontend.receiver.join(5)
+    assert not frontend.receiver.is_alive()
+
+
+def test_frontends_share_session(daemon, attach):
+    first, second = attach("cli"), attach("script")
+    first.process_user_input(f"/server 127.0.0.1 {daemon.fake_server.port}")
+    assert wait_until(lambda: daemon.client.is_registered)
+    second.process_user_input("/join #room")
+    joined = "TestName присоединился к #room"
+    assert wait_until(lambda: joined in second.view.texts)
+    assert wait_until(lambda: joined in first.view.texts)
+    assert ("127.0.0.1", "#room") in first.view.tabs
+    assert daemon.client.is_connected
+
+
+def test_reattach_replays_missed_backlog(daemon, attach):
+    frontend = attach()
+    frontend.process_user_input(f"/server 127.0.0.1 {daemon.fake_server.port}")
+    frontend.process_user_input("/join #seen")
+    assert wait_until(
+        lambda: "TestName присоединился к #seen" in frontend.view.texts
+    )
+    detach(frontend)
+    assert not daemon.view.attachments
+
+    other = attach("script")
+    other.process_user_input("/join #missed")
+    assert wait_until(lambda: "#missed" in daemon.client.joined_channels)
+    assert "TestName присоединился к #seen" in other.view.texts
+
+    frontend = attach()
+    missed = "TestName присоединился к #missed"
+    assert wait_until(lambda: missed in frontend.view.texts)
+    status = frontend.view.texts[0]
+    assert "127.0.0.1" in status and "#seen" in status
+    assert not any("#seen" in text for text in frontend.view.texts[1:])
+
+    replayed = attach("new", seq=0)
+    assert wait_until(lambda: missed in replayed.view.texts)
+    assert "TestName присоединился к #seen" in replayed.view.texts
+
+
+def test_command_output_reaches_only_issuer(daemon, attach):
+    first, second = attach("cli"), attach("script")
+    first.process_user_input("/network")
+    assert wait_until(
+        lambda: any("Активная сеть" in text for text in first.view.texts)
+    )
+    second.process_user_input("/network unknown")
+    assert wait_until(lambda: "unknown" in second.view.texts[-1])
+    assert not any("Активная сеть" in text for text in second.view.texts)
+    assert not any("unknown" in text for text in first.view.texts)
+    assert not daemon.view.backlog
+
+
+@pytest.mark.parametrize("error, position", [(None, 3), (OSError, 0)])
+def test_position_advances_after_write(error, position: int):
+    attachment = Attachment(mock.Mock(), "cli")
+    attachment.sock.sendall.side_effect = error
+    attachment.start()
+    attachment.send(3, b"event")
+    attachment.close()
+    assert attachment.position == position
+
+
+def test_session_state_is_mirrored(daemon, attach):
+    frontend = attach()
+    frontend.process_user_input(f"/server 127.0.0.1 {daemon.fake_server.port}")
+    assert wait_until(lambda: daemon.client.is_registered)
+    frontend.process_user_input("/join #room")
+    assert wait_until(lambda: "#room" in frontend.joined_channels)
+    members = frontend.sessions["127.0.0.1"].members
+    assert wait_until(lambda: members.get_members("#room") == ["TestName"])
+    assert frontend.nickname == "TestName"
+    assert frontend.current_channel == "#room"
+    assert frontend.view.state_updates
+
+    late = attach("late")
+    assert wait_until(lambda: "127.0.0.1" in late.sessions)
+    assert late.sessions["127.0.0.1"].members.get_members("#room")
+
+
+def test_input_uses_frontend_channel(daemon, attach):
+    frontend = attach()
+    frontend.process_user_input(f"/server 127.0.0.1 {daemon.fake_server.port}")
+    assert wait_until(lambda: daemon.client.is_registered)
+    frontend.process_user_input("/join #first")
+    frontend.process_user_input("/join #second")
+    assert wait_until(lambda: frontend.current_channel == "#second")
+
+    frontend.current_channel = "#first"
+    frontend.process_user_input("hello")
+    history = daemon.fake_server.history
+    assert wait_until(lambda: "#first" in history)
+    assert history["#first"][-1][1].endswith("PRIVMSG #first :hello")
+
+
+def test_exit_detaches_and_shutdown_stops(daemon, attach):
+    frontend = attach()
+    frontend.process_user_input("/exit")
+    frontend.receiver.join(5)
+    assert not frontend.receiver.is_alive()
+    assert wait_until(lambda: not daemon.view.attachments)
+    assert daemon.client.is_working
+
+    attach("admin").process_user_input("/shutdown")
+    assert wait_until(lambda: not daemon.client.is_working)
+
+
+def test_gui_attaches_to_daemon(daemon, attach, monkeypatch):
+    monkeypatch.setenv("QT_QPA_PLATFORM", "offscreen")
+    QtWidgets = pytest.importorskip("PyQt5.QtWidgets")
+    from irc.gui.view import GuiView
+    from irc.gui.window import ClientWindow
+
+    app = QtWidgets.QApplication.instance() or QtWidgets.QApplication([])
+    window = ClientWindow()
+    frontend = RemoteClient(GuiView(window), daemon.path, "gui")
+    window.client = frontend
+    window.setup_ui()
+    receiver = threading.Thread(target=frontend.receive)
+    receiver.start()
+    frontend.attach()
+    port = daemon.fake_server.port
+    window.process_user_input(f"/server 127.0.0.1 {port}")
+    assert wait_until(lambda: daemon.client.is_registered)
+    window.process_user_input("/join #room")
+
+    def has_room_tab() -> bool:
+        app.processEvents()
+        return ("127.0.0.1", "#room") in window.tabs
+
+    assert wait_until(has_room_tab)
+    window.close()
+    receiver.join(5)
+    assert not receiver.is_alive()
+    assert daemon.client.is_working
+
+
+def test_second_daemon_refuses_live_socket(daemon):
+    client = Client("TestName", "utf-8", {}, BroadcastView())
+    with pytest.raises(errors.DaemonRunningError):
+        Daemon(client, daemon.path)
+    client.exit_client()
@@ -0,0 +1,312 @@
+import hashlib
+import os
+import ssl
+import threading
+import time
+import pytest
+
+from irc import capture
+from irc.cli.view import CliView
+from irc.client import Client
+from irc.engine import AsyncEngine
+from irc.replay import Replayer
+from irc.testing.fake_server import FakeIrcServer
+
+CERTS = os.path.join(os.path.dirname(__file__), "certs")
+SERVER_PEM = os.path.join(CERTS, "server.pem")
+CLIENT_PEM = os.path.join(CERTS, "client.pem")
+
+
+class RecordingView(CliView):
+    def __init__(self):
+        self.messages = []
+        self.batches = []
+        self.channels = []
+        self.texts = []
+
+    def display_server_message(self, message):
+        self.messages.append(str(message))
+
+    def display_batch(self, messages: list):
+        self.batches.append(len(messages))
+        self.messages.extend(map(str, messages))
+
+    def start_channel_list(self, hostname: str):
+        self.channels.clear()
+
+    def display_channel(
+        self, hostname: str, channel: str, users: int, topic: str
+    ):
+        self.channels.append(channel)
+
+    def display_chat_text(self, text: str):
+        if text:
+            self.texts.append(text)
+
+
+def wait_until(predicate: callable, timeout: float = 5) -> bool:
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if predicate():
+            return True
+        time.sleep(0.01)
+    return predicate()
+
+
+@pytest.fixture()
+def fake_server() -> FakeIrcServer:
+    engine = AsyncEngine()
+    engine.start()
+    server = FakeIrcServer(flood_burst=10, flood_rate=5, list_size=50)
+    engine.run(server.start())
+    server.engine = engine
+    yield server
+    engine.run(server.stop())
+    engine.stop()
+
+
+@pytest.fixture()
+def tls_server() -> FakeIrcServer:
+    context = ssl.SSLContext(ssl.PROTOCOL_TLS_SERVER)
+    context.load_cert_chain(SERVER_PEM)
+    context.verify_mode = ssl.CERT_OPTIONAL
+    context.load_verify_locations(CLIENT_PEM)
+    engine = AsyncEngine()
+    engine.start()
+    server = FakeIrcServer(flood_burst=10, flood_rate=5)
+    engine.run(server.start(context=context))
+    server.engine = engine
+    yield server
+    engine.run(server.stop())
+    engine.stop()
+
+
+@pytest.fixture()
+def client_factory() -> callable:
+    clients = []
+
+    def create_client(**settings) -> Client:
+        engine = AsyncEngine()
+        engine.start()
+        favourites = {"127.0.0.1": "#fav"}
+        view = RecordingView()
+        client = Client(
+            "TestName", "utf-8", favourites, view, engine, **settings
+        )
+        clients.append(client)
+        return client
+
+    yield create_client
+    for client in clients:
+        client.exit_client()
+
+
+@pytest.fixture()
+def e2e_client(client_factory) -> Client:
+    return client_factory(flood_burst=10)
+
+
+def connect(client: Client, server: FakeIrcServer) -> None:
+    client.process_user_input(f"/server 127.0.0.1 {server.port}")
+    assert wait_until(lambda: "#fav" in server.channels)
+
+
+def test_registration_and_autojoin(e2e_client: Client, fake_server):
+    connect(e2e_client, fake_server)
+    assert any("Welcome" in text for text in e2e_client.view.messages)
+    assert wait_until(
+        lambda: "TestName присоединился к #fav" in e2e_client.view.messages
+    )
+
+
+def test_join_names_and_list(e2e_client: Client, fake_server):
+    connect(e2e_client, fake_server)
+    e2e_client.process_user_input("/join #test")
+    assert wait_until(lambda: "#test" in fake_server.channels)
+    e2e_client.process_user_input("/names")
+    e2e_client.process_user_input("/list")
+    assert wait_until(lambda: len(e2e_client.view.channels) == 50)
+    assert any("TestName" in t for t in e2e_client.view.messages[-60:])
+
+
+def test_quit_reaches_server(e2e_client: Client, fake_server):
+    connect(e2e_client, fake_server)
+    connection = next(iter(fake_server.connections))
+    e2e_client.process_user_input("/quit")
+    assert wait_until(lambda: "QUIT" in connection.received_lines)
+    assert not e2e_client.is_connected
+
+
+def test_keepalive_lag(client_factory, fake_server):
+    client = client_factory(ping_interval=0.25, flood_burst=10)
+    connect(client, fake_server)
+    assert wait_until(lambda: client.keepalive.lag is not None)
+
+
+@pytest.mark.parametrize(
+    "flood_rate, expect_connected", [(0, False), (4, True)]
+)
+def test_excess_flood(
+    client_factory, fake_server, flood_rate, expect_connected
+):
+    client = client_factory(flood_rate=flood_rate, reconnect_delay=0)
+    connect(client, fake_server)
+    for i in range(20):
+        client.process_user_input(f"/pm #fav line {i}")
+    time.sleep(1)
+    assert client.is_connected == expect_connected
+
+
+def test_traffic_ingest(e2e_client: Client, fake_server):
+    connect(e2e_client, fake_server)
+    count = len(e2e_client.view.messages)
+    fake_server.engine.run(fake_server.push_traffic("#fav", 2000, 0))
+    assert wait_until(lambda: len(e2e_client.view.messages) >= count + 2000)
+
+
+def test_capture_and_replay(client_factory, fake_server, tmp_path):
+    path = str(tmp_path / "traffic.cap")
+    client = client_factory(capture_path=path)
+    connect(client, fake_server)
+    client.process_user_input("/list")
+    assert wait_until(lambda: len(client.view.channels) == 50)
+    client.exit_client()
+
+    records = list(capture.read_capture(path))
+    kinds = {kind for kind, _, _, _ in records}
+    assert kinds == {capture.OPEN, capture.RECEIVED, capture.SENT}
+    sent = b"".join(d for k, _, _, d in records if k == capture.SENT)
+    assert sent.startswith(b"CAP LS 302\r\nNICK TestName\r\nUSER")
+
+    replay_client = Client("TestName", "utf-8", {}, RecordingView())
+    replayer = Replayer(replay_client, speed=0)
+    replayer.replay(path)
+    assert replay_client.view.messages == client.view.messages
+    assert replay_client.view.channels == client.view.channels
+
+
+def test_capture_starts_over_each_run(tmp_path):
+    path = str(tmp_path / "traffic.cap")
+    for hostname in ("first", "second"):
+        writer = capture.CaptureWriter(path)
+        writer.open_stream(hostname, "utf-8")
+        writer.close()
+    records = list(capture.read_capture(path))
+    assert [(kind, data) for kind, _, _, data in records] == [
+        (capture.OPEN, b"second utf-8")
+    ]
+
+
+def test_history_gap_after_reconnect(client_factory, fake_server):
+    reader, writer = client_factory(), client_factory(flood_burst=10)
+    writer.nickname = "Writer"
+    connect(reader, fake_server)
+    connect(writer, fake_server)
+    members = fake_server.channels["#fav"]
+    assert wait_until(lambda: len(members) == 2)
+
+    writer.process_user_input("/pm #fav before")
+    marks = reader.history_marks
+    assert wait_until(lambda: "#fav" in marks.get("127.0.0.1", {}))
+    reader.process_user_input("/quit")
+    assert wait_until(lambda: len(members) == 1)
+    writer.process_user_input("/pm #fav gap 1")
+    writer.process_user_input("/pm #fav gap 2")
+    assert wait_until(lambda: len(fake_server.history["#fav"]) == 3)
+
+    connect(reader, fake_server)
+    assert wait_until(lambda: reader.view.batches == [2])
+    texts = [text for text in reader.view.messages if "<Writer>" in text]
+    assert texts == [
+        "[#fav] <Writer>: before",
+        "[#fav] <Writer>: gap 1",
+        "[#fav] <Writer>: gap 2",
+    ]
+
+
+def test_reconnect_restores_session(client_factory, fake_server):
+    client = client_factory(reconnect_delay=0.05)
+    connect(client, fake_server)
+    client.process_user_input("/nick Renamed")
+    client.process_user_input("/join #extra")
+    client.process_user_input("/switch #fav")
+    assert wait_until(lambda: "#extra" in fake_server.channels)
+
+    fake_server.engine.run(fake_server.disconnect_all())
+    assert wait_until(lambda: not client.is_connected)
+    assert wait_until(lambda: len(fake_server.channels["#extra"]) == 1)
+    connection = next(iter(fake_server.channels["#extra"]))
+    assert connection.received_lines[:3] == [
+        "CAP LS 302",
+        "NICK Renamed",
+        "USER 1 1 1 1",
+    ]
+    assert "JOIN #extra,#fav" in connection.received_lines
+    assert client.is_connected
+    assert client.nickname == "Renamed"
+    assert client.current_channel == "#fav"
+    assert list(client.sessions) == ["127.0.0.1"]
+
+
+def test_server_command_while_reconnect_is_pending(
+    client_factory, fake_server
+):
+    client = client_factory(reconnect_delay=30)
+    connect(client, fake_server)
+    pending = client.active
+    fake_server.engine.run(fake_server.disconnect_all())
+    assert wait_until(lambda: pending.is_reconnecting)
+
+    client.process_user_input(f"/server localhost {fake_server.port}")
+    assert wait_until(lambda: client.is_registered)
+    assert client.active is not pending
+    assert client.hostname == "localhost"
+    assert client.sessions["127.0.0.1"] is pending
+    assert pending.hostname == "127.0.0.1"
+    assert pending.is_reconnecting
+    assert len(fake_server.connections) == 1
+
+
+def test_tls_connection_with_certfp(client_factory, tls_server):
+    client = client_factory(tls_ca=SERVER_PEM, tls_cert=CLIENT_PEM)
+    client.process_user_input(f"/server 127.0.0.1 +{tls_server.port}")
+    assert wait_until(lambda: "#fav" in tls_server.channels)
+    connection = next(iter(tls_server.channels["#fav"]))
+    with open(CLIENT_PEM) as file:
+        pem = file.read().partition(ssl.PEM_FOOTER)[0] + ssl.PEM_FOOTER
+    certificate = ssl.PEM_cert_to_DER_cert(pem)
+    assert connection.certfp == hashlib.sha256(certificate).hexdigest()
+    assert any("установлен за" in text for text in client.view.texts)
+
+
+def test_tls_session_is_resumed_on_reconnect(client_factory, tls_server):
+    client = client_factory(tls_ca=SERVER_PEM, reconnect_delay=0.05)
+    client.process_user_input(f"/server 127.0.0.1 {tls_server.port} --tls")
+    assert wait_until(lambda: "#fav" in tls_server.channels)
+
+    tls_server.engine.run(tls_server.disconnect_all())
+    assert wait_until(lambda: not client.is_connected)
+    assert wait_until(lambda: len(tls_server.channels["#fav"]) == 1)
+    assert "возобновлена" in client.view.texts[-1]
+
+
+def test_threaded_tls_resumption_and_verification(tls_server):
+    view = RecordingView()
+    client = Client("TestName", "utf-8", {}, view, tls_ca=SERVER_PEM)
+    threading.Thread(target=client.wait_for_response).start()
+    try:
+        for _ in range(2):
+            client.process_user_input(f"/server 127.0.0.1 +{tls_server.port}")
+            assert wait_until(lambda: client.is_registered)
+            client.process_user_input("/quit")
+        handshakes = [text for text in view.texts if "установлен" in text]
+        assert "возобновлена" not in handshakes[0]
+        assert "возобновлена" in handshakes[1]
+
+        client.tls.verify = True
+        client.tls.ca_path = None
+        client.process_user_input(f"/server localhost +{tls_server.port}")
+        assert "сертификат" in view.texts[-1]
+        assert not client.is_connected
+    finally:
+        client.exit_client()
@@ -0,0 +1,53 @@
+import pytest
+
+from irc import const
+from irc.framing import LineFramer
+
+
+@pytest.mark.parametrize(
+    "chunks, expected_lines",
+    [
+        ([b"PING :a\r\n"], ["PING :a"]),
+        ([b"PING :a\nPING :b\r\n"], ["PING :a", "PING :b"]),
+        ([b"PING", b" :a\r", b"\n"], ["PING :a"]),
+        ([b"PING :a\r\n\r\n", b"PING :b"], ["PING :a"]),
+        ([b":n PRIVMSG #c :\xd0\xbf", b"\xd1\x80\r\n"], [":n PRIVMSG #c :пр"]),
+        ([b"bad \xff\r\n"], ["bad �"]),
+    ],
+)
+def test_line_framing(chunks: list, expected_lines: list):
+    framer = LineFramer("utf-8")
+    actual_lines = []
+    for chunk in chunks:
+        actual_lines.extend(framer.feed(chunk))
+    assert actual_lines == expected_lines
+
+
+def test_encoding_switch():
+    framer = LineFramer("utf-8")
+    framer.encoding = "cp1251"
+    assert framer.feed("текст\r\n".encode("cp1251")) == ["текст"]
+
+
+def test_line_without_ending_is_dropped():
+    framer = LineFramer("utf-8")
+    framer.feed(b"x" * (const.MAX_LINE_LENGTH + 1))
+    assert framer.feed(b"PING :a\r\n") == []
+    assert framer.feed(b"PING :b\r\n") == ["PING :b"]
+
+
+def test_overlong_line_tail_is_discarded():
+    framer = LineFramer("utf-8")
+    assert framer.feed(b":n PRIVMSG #c :" + b"x" * const.MAX_LINE_LENGTH) == []
+    assert framer.feed(b"x" * 100 + b"\r\nPING :a\r\n") == ["PING :a"]
+
+
+def test_large_burst():
+    framer = LineFramer("cp1251")
+    line = ":irc.server 322 nick #канал 10 :тема".encode("cp1251") + b"\r\n"
+    data = line * 50000
+    actual_lines = []
+    for i in range(0, len(data), const.BUFFER_SIZE):
+        actual_lines.extend(framer.feed(data[i : i + const.BUFFER_SIZE]))
+    assert len(actual_lines) == 50000
+    assert set(actual_lines) == {":irc.server 322 nick #канал 10 :тема"}
@@ -0,0 +1,116 @@
+import pytest
+
+from unittest import mock
+
+from irc.batches import BatchCollector
+
+
+def sent_lines(client) -> list:
+    lines = []
+    for call in client.active.sock.sendall.call_args_list:
+        lines.extend(call.args[0].decode().split("\r\n")[:-1])
+    return lines
+
+
+@pytest.fixture()
+def capable_client(tested_client):
+    with mock.patch.object(tested_client.active, "sock"):
+        tested_client.capabilities.start()
+        yield tested_client
+
+
+def test_cap_negotiation(capable_client):
+    capable_client.active.handle_data(
+        b":srv CAP * LS * :multi-prefix sasl batch\r\n"
+        b":srv CAP * LS :server-time draft/chathistory=100 away-notify\r\n"
+    )
+    assert sent_lines(capable_client) == [
+        "CAP REQ :batch draft/chathistory multi-prefix server-time"
+    ]
+    assert capable_client.capabilities.available["draft/chathistory"] == "100"
+
+    capable_client.active.handle_data(
+        b":srv CAP TestName ACK :batch draft/chathistory server-time\r\n"
+    )
+    assert sent_lines(capable_client)[-1] == "CAP END"
+    assert not capable_client.capabilities.is_negotiating
+    assert "batch" in capable_client.capabilities.enabled
+
+    capable_client.active.handle_data(b":srv CAP TestName DEL :batch\r\n")
+    assert "batch" not in capable_client.capabilities.enabled
+    assert len(sent_lines(capable_client)) == 2
+
+
+def test_cap_nak_ends_negotiation(capable_client):
+    capable_client.active.handle_data(
+        b":srv CAP * LS :batch\r\n:srv CAP * NAK :batch\r\n"
+    )
+    assert sent_lines(capable_client) == ["CAP REQ :batch", "CAP END"]
+    assert capable_client.capabilities.enabled == set()
+
+
+def test_batch_is_dispatched_once(tested_client):
+    view = mock.Mock()
+    tested_client.view = view
+    tested_client.active.handle_data(
+        b":srv BATCH +1 netsplit a.net b.net\r\n"
+        b"@batch=1 :alice!u@h QUIT :a.net b.net\r\n"
+        b"@batch=1 :bob!u@h QUIT :a.net b.net\r\n"
+        b":carol!u@h PRIVMSG #test :outside\r\n"
+    )
+    assert view.display_batch.call_count == 0
+    assert view.display_server_message.call_count == 1
+
+    tested_client.active.handle_data(b":srv BATCH -1\r\n")
+    messages = view.display_batch.call_args.args[0]
+    assert [message.line.nick for message in messages] == ["alice", "bob"]
+
+
+def test_nested_batches_and_size_limit(tested_parser):
+    collector = BatchCollector(max_size=3)
+
+    def feed(line: str) -> list:
+        return collector.feed(tested_parser.get_message(line))
+
+    assert feed(":srv BATCH +outer chathistory #test") == []
+    assert feed("@batch=outer :srv BATCH +inner netsplit a b") == []
+    assert feed("@batch=inner :a!u@h QUIT :a b") == []
+    assert feed(":srv BATCH -inner") == []
+    assert feed("@batch=outer :b!u@h PRIVMSG #test :1") == []
+    assert len(feed("@batch=outer :c!u@h PRIVMSG #test :2")) == 3
+    assert feed("@batch=outer :d!u@h PRIVMSG #test :3") == []
+    assert len(feed(":srv BATCH -outer")) == 1
+    assert feed(":srv BATCH -unknown") == []
+
+
+def test_history_gap_is_requested(capable_client):
+    capable_client.capabilities.enabled.add("draft/chathistory")
+    capable_client.active.handle_data(b":TestName!u@h JOIN #test\r\n")
+    assert sent_lines(capable_client) == ["CHATHISTORY LATEST #test * 100"]
+
+    capable_client.active.handle_data(
+        b"@time=2024-01-01T10:00:00.000Z :bob!u@h PRIVMSG #test :hi\r\n"
+        b":TestName!u@h JOIN #test\r\n"
+    )
+    assert sent_lines(capable_client)[-1] == (
+        "CHATHISTORY AFTER #test timestamp=2024-01-01T10:00:00.000Z 100"
+    )
+
+
+def test_replayed_history_is_archived_once(tested_client):
+    tested_client.chat_log = mock.Mock()
+    tested_client.active.handle_data(
+        b"@time=2024-01-01T10:00:00.000Z :bob!u@h PRIVMSG #test :live\r\n"
+        b":srv BATCH +h chathistory #test\r\n"
+        b"@batch=h;time=2024-01-01T09:00:00.000Z :bob!u@h PRIVMSG #test :a\r\n"
+        b"@batch=h;time=2024-01-01T10:00:00.000Z :bob!u@h PRIVMSG #test :live\r\n"
+        b"@batch=h;time=2024-01-01T11:00:00.000Z :bob!u@h PRIVMSG #test :b\r\n"
+        b":srv BATCH -h\r\n"
+    )
+    calls = tested_client.chat_log.write.call_args_list
+    assert [(call.args[2].text, call.args[3]) for call in calls] == [
+        ("live", 1704103200.0),
+        ("b", 1704106800.0),
+    ]
+    marks = tested_client.history_marks["test_server"]
+    assert marks["#test"] == "2024-01-01T11:00:00.000Z"
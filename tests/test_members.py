@@ -0,0 +1,91 @@
+import pytest
+
+from irc.members import MemberStore
+
+
+@pytest.fixture()
+def store() -> MemberStore:
+    store = MemberStore()
+    store.join("#a", "Me", True)
+    store.join("#b", "Me", True)
+    store.add_names("#a", ["@Me", "@Op", "+Voice", "Bob"])
+    store.end_names("#a")
+    store.add_names("#b", ["Me", "bob"])
+    store.end_names("#b")
+    return store
+
+
+def test_names_burst(store: MemberStore):
+    assert store.get_members("#A") == ["@Me", "@Op", "+Voice", "bob"]
+    assert store.user_channels["bob"] == {"#a", "#b"}
+
+
+def test_join_and_part(store: MemberStore):
+    store.join("#a", "Alice")
+    assert "Alice" in store.get_members("#a")
+    store.part("#a", "alice")
+    store.part("#a", "voice")
+    assert store.get_members("#a") == ["@Me", "@Op", "bob"]
+    assert "alice" not in store.nicks
+    assert "voice" not in store.user_channels
+
+
+def test_rename_and_quit(store: MemberStore):
+    store.rename("BOB", "Robert")
+    assert store.get_members("#b") == ["Me", "Robert"]
+    assert store.get_members("#a")[-1] == "Robert"
+    store.quit("robert")
+    assert store.count("#a") == 3
+    assert store.count("#b") == 1
+    assert "robert" not in store.nicks
+
+
+def test_self_part_drops_channel(store: MemberStore):
+    version = store.versions["#b"]
+    store.part("#b", "Me", True)
+    assert store.get_members("#b") == []
+    assert store.user_channels["bob"] == {"#a"}
+    assert store.versions["#b"] > version
+
+
+def test_names_for_unjoined_channel_are_ignored(store: MemberStore):
+    store.add_names("#other", ["x", "y"])
+    store.end_names("#other")
+    assert store.count("#other") == 0
+    assert "x" not in store.nicks
+
+
+def test_membership_from_messages(tested_client):
+    tested_client.active.handle_data(
+        b":TestName!u@h JOIN #test\r\n"
+        b":srv 353 TestName = #test :@TestName alice bob\r\n"
+        b":srv 366 TestName #test :End of /NAMES list.\r\n"
+        b":alice!u@h NICK :alicia\r\n"
+        b":bob!u@h QUIT :bye\r\n"
+        b":carol!u@h JOIN #test\r\n"
+        b":TestName!u@h KICK #test carol :spam\r\n"
+    )
+    assert tested_client.members.get_members("#test") == [
+        "@TestName",
+        "alicia",
+    ]
+    tested_client.active.handle_data(b":op!u@h KICK #test TestName :out\r\n")
+    assert "#test" not in tested_client.joined_channels
+    assert tested_client.current_channel is None
+
+
+def test_self_kick_with_mixed_case_channel(tested_client):
+    tested_client.process_user_input("/join #test")
+    tested_client.active.handle_data(b":op!u@h KICK #TeSt TestName :out\r\n")
+    assert "#test" not in tested_client.joined_channels
+    assert tested_client.current_channel is None
+
+
+def test_quit_without_reason(tested_client):
+    tested_client.active.handle_data(
+        b":TestName!u@h JOIN #test\r\n"
+        b":srv 353 TestName = #test :TestName alice\r\n"
+        b":srv 366 TestName #test :End of /NAMES list.\r\n"
+        b":alice!u@h QUIT\r\n"
+    )
+    assert tested_client.members.get_members("#test") == ["TestName"]
@@ -2,55 +2,69 @@ import pytest
 import irc.models.messages as msg
 import irc.models.commands as com
 
+from irc.models.line import parse_line
+
+from unittest import mock
+
 
 @pytest.mark.parametrize(
     "message_type, raw_message, expected_result",
     [
         (
-                msg.JoinMessage,
-                ":nick!user JOIN :#channel",
-                "nick присоединился к #channel",
+            msg.JoinMessage,
+            ":nick!user JOIN :#channel",
+            "nick присоединился к #channel",
         ),
         (
-                msg.ModeMessage,
-                ":bot!@service MODE #test -i",
-                "bot!@service установил для #test флаг -i",
+            msg.ModeMessage,
+            ":bot!@service MODE #test -i",
+            "bot!@service установил для #test флаг -i",
         ),
         (msg.ModeMessage, ":nick MODE nick -r", "nick сменил свой флаг на -r"),
         (
-                msg.NickMessage,
-                ":nick!0.0.0@user NICK new_nick1",
-                "nick сменил ник на new_nick1",
+            msg.NickMessage,
+            ":nick!0.0.0@user NICK new_nick1",
+            "nick сменил ник на new_nick1",
+        ),
+        (
+            msg.ServiceMessage,
+            ":irc.ircnet.su 322 target :text",
+            "[irc.ircnet.su] >> text",
+        ),
+        (
+            msg.PrivateMessage,
+            ":nick PRIVMSG target :test text",
+            "[target] <nick>: test text",
         ),
         (
-                msg.ServiceMessage,
-                ":irc.ircnet.su 322 target :text",
-                "[irc.ircnet.su] >> text",
+            msg.PartMessage,
+            ":WiZ!jto@ PART #playzone",
+            "WiZ покинул #playzone",
         ),
         (
-                msg.PrivateMessage,
-                ":nick PRIVMSG target :test text",
-                "[target] <nick>: test text",
+            msg.NoticeMessage,
+            ":sender NOTICE target :test text",
+            "[sender] >> test text",
         ),
         (
-                msg.PartMessage,
-                ":WiZ!jto@ PART #playzone",
-                "WiZ покинул #playzone",
+            msg.JoinMessage,
+            ":nick!user JOIN",
+            ":nick!user JOIN",
         ),
         (
-                msg.NoticeMessage,
-                ":sender NOTICE target :test text",
-                "[sender] >> test text",
+            msg.KickMessage,
+            ":op!u@h KICK #test victim :flood",
+            "op выгнал victim из #test: flood",
         ),
         (
-                msg.JoinMessage,
-                ":nick!user JOIN",
-                ":nick!user JOIN",
+            msg.QuitMessage,
+            ":nick!u@h QUIT :Ping timeout",
+            "nick вышел из сети (Ping timeout)",
         ),
     ],
 )
 def test_message_reg_exp(
-        tested_client, message_type, raw_message: str, expected_result: str
+    tested_client, message_type, raw_message: str, expected_result: str
 ):
     message = message_type(tested_client, raw_message)
     assert str(message) == expected_result
@@ -81,5 +95,121 @@ def test_message_handler(tested_parser, raw_data: str, expected_type):
 )
 def test_channel_errors(tested_client, error_response: str):
     com.JoinCommand(tested_client, "#incorrect")()
-    str(msg.ServiceMessage(tested_client, error_response))
+    msg.ServiceMessage(tested_client, error_response).apply()
     assert tested_client.current_channel is None
+
+
+def test_render_once(tested_client):
+    message = msg.ServiceMessage(
+        tested_client, ":irc.ircnet.su 433 TestName :Nickname is in use"
+    )
+    tested_client.nickname = "Changed"
+    with mock.patch.object(
+        message, "get_parsed_message", return_value="text"
+    ) as render:
+        assert str(message) == str(message) == "text"
+    render.assert_called_once()
+    assert tested_client.nickname == "Changed"
+
+
+def test_ping_reply(tested_client, tested_parser):
+    with mock.patch.object(tested_client.active, "sock") as sock:
+        assert tested_parser.get_message("PING :irc.ircnet.su") is None
+        sock.sendall.assert_called_once_with(b"PONG :irc.ircnet.su\r\n")
+
+
+def test_lag_measurement(tested_client, tested_parser):
+    tested_client.keepalive.reset()
+    with mock.patch.object(tested_client.active, "sock") as sock:
+        tested_client.keepalive._send_ping(0.0)
+        token = tested_client.keepalive._token
+        sock.sendall.assert_called_once_with(f"PING :{token}\r\n".encode())
+    pong = f":irc.ircnet.su PONG irc.ircnet.su :{token}"
+    assert tested_parser.get_message(pong) is None
+    assert tested_client.keepalive.lag is not None
+    assert tested_client.keepalive.current_lag == tested_client.keepalive.lag
+
+
+@pytest.mark.parametrize(
+    "raw_line, expected_fields",
+    [
+        ("PING :irc.ircnet.su", (None, None, "PING", ["irc.ircnet.su"])),
+        (
+            ":nick!user@host PRIVMSG #ch :hello :) world",
+            (None, "nick", "PRIVMSG", ["#ch", "hello :) world"]),
+        ),
+        (
+            ":irc.server 353 me = #ch :@op +v user",
+            (None, "irc.server", "353", ["me", "=", "#ch", "@op +v user"]),
+        ),
+        (
+            "@time=2021-01-01T00:00:00.000Z;msgid=a\\sb :n!u@h JOIN #ch",
+            (
+                {"time": "2021-01-01T00:00:00.000Z", "msgid": "a b"},
+                "n",
+                "JOIN",
+                ["#ch"],
+            ),
+        ),
+        (":nick  MODE  nick  +i", (None, "nick", "MODE", ["nick", "+i"])),
+        ("", None),
+        (":source.only", None),
+    ],
+)
+def test_line_parser(raw_line: str, expected_fields: tuple):
+    line = parse_line(raw_line)
+    if expected_fields is None:
+        assert line is None
+    else:
+        actual_fields = (line.tags, line.nick, line.command, line.params)
+        assert actual_fields == expected_fields
+
+
+def test_tagged_message_format(tested_client):
+    raw_message = "@time=2021-01-01T00:00:00Z :n!u@h PRIVMSG #ch :text"
+    message = msg.PrivateMessage(tested_client, raw_message)
+    assert str(message) == "[#ch] <n>: text"
+
+
+@pytest.mark.parametrize(
+    "raw_message, expected_channel",
+    [
+        (":irc 322 me #chan 42 :some topic", ("#chan", 42, "some topic")),
+        (":irc 322 me #chan 7", ("#chan", 7, "")),
+        (":irc 322 me :text", None),
+    ],
+)
+def test_list_reply(tested_client, raw_message: str, expected_channel):
+    with mock.patch.object(tested_client.view, "display_channel") as display:
+        msg.ServiceMessage(tested_client, raw_message).apply()
+    if expected_channel:
+        display.assert_called_once_with("test_server", *expected_channel)
+    else:
+        display.assert_not_called()
+
+
+def test_list_start_resets_channels(tested_client):
+    view = tested_client.view
+    with mock.patch.object(view, "start_channel_list") as start:
+        msg.ServiceMessage(tested_client, ":irc 321 me Channel :Name").apply()
+    start.assert_called_once_with("test_server")
+
+
+@pytest.mark.parametrize(
+    "message_type, raw_message, expected_target",
+    [
+        (msg.PrivateMessage, ":nick PRIVMSG #Test :text", "#test"),
+        (msg.PrivateMessage, ":nick PRIVMSG TestName :text", "nick"),
+        (msg.NoticeMessage, ":NickServ NOTICE TestName :text", None),
+        (msg.JoinMessage, ":nick!user JOIN :#channel", "#channel"),
+        (msg.ModeMessage, ":nick MODE nick -r", None),
+        (msg.NickMessage, ":nick!user@host NICK :new", None),
+        (msg.ServiceMessage, ":irc 353 TestName = #test :a b", "#test"),
+        (msg.ServiceMessage, ":irc 322 TestName #test 1 :topic", None),
+        (msg.ServiceMessage, ":irc 001 TestName :Welcome", None),
+    ],
+)
+def test_message_target(
+    tested_client, message_type, raw_message: str, expected_target
+):
+    assert message_type(tested_client, raw_message).target == expected_target
@@ -0,0 +1,71 @@
+import urllib.request
+
+from irc.cli.view import CliView
+from irc.client import Client
+from irc.metrics import Histogram, format_prometheus
+import irc.models.commands as com
+
+
+def test_histogram_quantiles():
+    histogram = Histogram((0.001, 0.01, 0.1))
+    for value in (0.0005, 0.0005, 0.005, 0.05):
+        histogram.observe(value)
+    assert histogram.counts == [2, 1, 1, 0]
+    assert histogram.quantile(0.5) == 0.001
+    assert histogram.quantile(0.99) == 0.1
+    histogram.observe(1)
+    assert histogram.quantile(1) == float("inf")
+
+
+def test_received_traffic_is_counted(tested_client):
+    data = (
+        b":bob!u@h PRIVMSG #test :hi\r\n"
+        b":bob!u@h PRIVMSG #test :again\r\n"
+        b":srv 372 TestName :- MOTD\r\n"
+    )
+    metrics = tested_client.metrics
+    metrics.sample_rate = 1
+    tested_client.active.handle_data(data)
+    assert metrics.lines_in == 3
+    assert metrics.bytes_in == len(data)
+    assert metrics.commands == {"PRIVMSG": 2, "372": 1}
+    assert metrics.parse_latency.count == 3
+    assert metrics.render_latency.count == 3
+
+    command = com.StatsCommand(tested_client)
+    command()
+    assert command.output.startswith("Статистика test_server")
+    assert "PRIVMSG 2, 372 1" in command.output
+
+
+def test_prometheus_format(tested_client):
+    tested_client.metrics.sample_rate = 1
+    tested_client.active.handle_data(b":bob!u@h PRIVMSG #test :hi\r\n")
+    text = format_prometheus(tested_client.sessions)
+    assert "# TYPE irc_received_lines_total counter" in text
+    assert 'irc_received_lines_total{network="test_server"} 1' in text
+    assert (
+        'irc_messages_total{network="test_server",command="PRIVMSG"} 1' in text
+    )
+    assert 'irc_parse_seconds_bucket{network="test_server",le="+Inf"} 1' in (
+        text
+    )
+    assert text.count("# TYPE irc_parse_seconds histogram") == 1
+
+
+def test_metrics_endpoint():
+    client = Client("TestName", "cp866", {}, CliView(), metrics_port=0)
+    try:
+        url = f"http://127.0.0.1:{client.metrics_server.port}/metrics"
+        with urllib.request.urlopen(url, timeout=5) as response:
+            assert response.status == 200
+            assert response.headers["Content-Type"].startswith("text/plain")
+    finally:
+        client.exit_client()
+
+
+def test_stats_report_lines_dropped_by_view(tested_client):
+    tested_client.view.dropped_lines = 7
+    command = com.StatsCommand(tested_client)
+    command()
+    assert command.output.endswith("Не выведено окном: 7 строк")
@@ -0,0 +1,37 @@
+from unittest import mock
+
+from irc import const
+from irc.backoff import Backoff
+
+
+def test_backoff_is_jittered_and_capped():
+    backoff = Backoff(1, 10)
+    delays = [backoff.next_delay() for _ in range(6)]
+    for delay, limit in zip(delays, [1, 2, 4, 8, 10, 10]):
+        assert limit / 2 <= delay <= limit
+    backoff.reset()
+    assert backoff.next_delay() <= 1
+
+
+def test_channels_are_restored_in_few_joins(tested_client):
+    channels = {f"#channel{i:03}" for i in range(100)}
+    tested_client.joined_channels.update(channels)
+    with mock.patch.object(tested_client.active, "sock") as sock:
+        tested_client.active.handle_data(b":srv 001 Restored :Welcome\r\n")
+    data = b"".join(call.args[0] for call in sock.sendall.call_args_list)
+    joins = data.decode().split("\r\n")[:-1]
+    assert len(joins) == 4
+    assert all(len(join) < const.MAX_JOIN_LENGTH + 20 for join in joins)
+    joined = {c for join in joins for c in join[5:].split(",")}
+    assert joined == channels | {"#test"}
+    assert tested_client.nickname == "Restored"
+    assert tested_client.is_registered
+
+
+def test_nick_in_use_during_registration(tested_client):
+    with mock.patch.object(tested_client.active, "sock") as sock:
+        tested_client.active.handle_data(
+            b":srv 433 * TestName :Nickname is already in use\r\n"
+        )
+    sock.sendall.assert_called_once_with(b"NICK TestName_\r\n")
+    assert tested_client.nickname == "TestName_"
@@ -0,0 +1,105 @@
+import asyncio
+import pytest
+import socket
+import time
+
+from unittest import mock
+
+from irc.connection import connect_staggered_async
+from irc.resolver import Resolver, connect_staggered, order_addresses
+
+
+@pytest.fixture()
+def stalled_port() -> int:
+    server = socket.socket()
+    server.bind(("127.0.0.1", 0))
+    server.listen(0)
+    port = server.getsockname()[1]
+    backlog = socket.create_connection(("127.0.0.1", port))
+    yield port
+    backlog.close()
+    server.close()
+
+
+def address(host: str, port: int, family=socket.AF_INET) -> tuple:
+    return family, socket.SOCK_STREAM, 6, "", (host, port)
+
+
+def test_families_are_interleaved():
+    v6 = [address(f"::{i}", 1, socket.AF_INET6) for i in range(3)]
+    v4 = [address(f"10.0.0.{i}", 1) for i in range(2)]
+    ordered = order_addresses(v6 + v4)
+    hosts = [a[4][0] for a in ordered]
+    assert hosts == ["::0", "10.0.0.0", "::1", "10.0.0.1", "::2"]
+
+
+def test_resolver_caches_until_ttl():
+    resolver = Resolver(ttl=60)
+    with mock.patch("socket.getaddrinfo") as getaddrinfo:
+        getaddrinfo.return_value = [address("127.0.0.1", 6667)]
+        resolver.resolve("IRC.example", 6667)
+        resolver.resolve("irc.example", 6667)
+        assert getaddrinfo.call_count == 1
+
+        resolver.ttl = 0
+        resolver.forget("irc.example", 6667)
+        resolver.resolve("irc.example", 6667)
+        resolver.resolve("irc.example", 6667)
+        assert getaddrinfo.call_count == 3
+
+
+def test_slow_lookup_does_not_block_caller():
+    resolver = Resolver(timeout=0.1)
+
+    def slow_getaddrinfo(*args, **kwargs):
+        time.sleep(2)
+        return [address("127.0.0.1", 6667)]
+
+    with mock.patch("socket.getaddrinfo", slow_getaddrinfo):
+        started = time.monotonic()
+        with pytest.raises(socket.timeout):
+            resolver.resolve("slow.example", 6667)
+        assert time.monotonic() - started < 1
+
+
+def test_stalled_address_is_raced(local_server, stalled_port):
+    port = local_server.getsockname()[1]
+    candidates = [
+        address("127.0.0.1", stalled_port),
+        address("127.0.0.1", port),
+    ]
+    attempts = []
+    started = time.monotonic()
+    sock = connect_staggered(candidates, attempts.append, delay=0.05)
+    elapsed = time.monotonic() - started
+    assert sock.getpeername()[1] == port
+    sock.close()
+    assert [a[1] for a in attempts] == [stalled_port, port]
+    assert elapsed < 1
+
+
+def test_refused_address_falls_through_immediately(local_server):
+    port = local_server.getsockname()[1]
+    closed = socket.socket()
+    closed.bind(("127.0.0.1", 0))
+    refused = closed.getsockname()[1]
+    closed.close()
+    candidates = [address("127.0.0.1", refused), address("127.0.0.1", port)]
+    sock = connect_staggered(candidates, lambda _: None, delay=5)
+    assert sock.getpeername()[1] == port
+    sock.close()
+
+
+def test_async_race_picks_reachable_address(local_server, stalled_port):
+    port = local_server.getsockname()[1]
+    candidates = [
+        address("127.0.0.1", stalled_port),
+        address("127.0.0.1", port),
+    ]
+    sock = asyncio.run(
+        asyncio.wait_for(
+            connect_staggered_async(candidates, lambda _: None, delay=0.05), 1
+        )
+    )
+    assert sock.getpeername()[1] == port
+    sock.close()
@@ -0,0 +1,100 @@
+import time
+import pytest
+
+from irc.client import Client
+from irc.cli.view import CliView
+from irc.search import SearchIndex, SearchQuery
+
+
+@pytest.fixture()
+def search_index(tmp_path) -> SearchIndex:
+    index = SearchIndex(str(tmp_path / "history.db"))
+    now = time.time()
+    index.write_batch(
+        [
+            (now - 40 * 86400, "net1", "#chat", "alice", "old release news"),
+            (now - 3600, "net1", "#chat", "bob", "new release today"),
+            (now - 60, "net1", "#dev", "alice", "release notes draft"),
+            (now, "net2", "#chat", "carol", "unrelated text"),
+        ]
+    )
+    yield index
+    index.close()
+
+
+@pytest.mark.parametrize(
+    "args, expected_nicks",
+    [
+        (("release",), ["alice", "bob", "alice"]),
+        (("#chat", "release"), ["bob", "alice"]),
+        (("from:ALICE", "release"), ["alice", "alice"]),
+        (("since:30d", "release"), ["alice", "bob"]),
+        (("net:net2", "text"), ["carol"]),
+        (("release", "notes"), ["alice"]),
+        (('"quoted',), []),
+    ],
+)
+def test_search_filters(search_index, args: tuple, expected_nicks: list):
+    results = search_index.search(SearchQuery.from_args(args))
+    assert [row[3] for row in results] == expected_nicks
+
+
+def test_query_parsing():
+    query = SearchQuery.from_args(
+        ("#Chat", "from:bob", "since:2024-01-01", "until:1h", "hello")
+    )
+    assert query.channel == "#chat"
+    assert query.nick == "bob"
+    assert query.since < query.until
+    assert query.text == "hello"
+    with pytest.raises(ValueError):
+        SearchQuery.from_args(("since:yesterday",))
+
+
+def test_messages_are_indexed(tmp_path, tested_client):
+    tested_client.search_index = SearchIndex(str(tmp_path / "history.db"))
+    tested_client.active.handle_data(
+        b":bob!b@h PRIVMSG #test :hello world\r\n" b":bob!b@h JOIN #test\r\n"
+    )
+    tested_client.search_index.close()
+
+    index = SearchIndex(str(tmp_path / "history.db"))
+    results = index.search(SearchQuery("hello"))
+    index.close()
+    assert [row[1:] for row in results] == [
+        ("test_server", "#test", "bob", "hello world")
+    ]
+
+
+def test_server_time_is_indexed(tmp_path, tested_client):
+    tested_client.search_index = SearchIndex(str(tmp_path / "history.db"))
+    tested_client.active.handle_data(
+        b"@time=2024-01-01T00:00:00.500Z :bob!b@h PRIVMSG #test :replayed\r\n"
+    )
+    tested_client.search_index.close()
+
+    index = SearchIndex(str(tmp_path / "history.db"))
+    results = index.search(SearchQuery("replayed"))
+    index.close()
+    assert [row[0] for row in results] == [1704067200.5]
+
+
+def test_search_command(tmp_path):
+    client = Client(
+        "TestName",
+        "utf-8",
+        {},
+        CliView(),
+        search_path=str(tmp_path / "history.db"),
+    )
+    client.search_index.write_batch(
+        [(time.time(), "net", "#chat", "bob", "hello there")]
+    )
+    command = client.command_handler.get_command("/search hello")
+    command()
+    assert "<bob>: hello there" in command.output
+
+    command = client.command_handler.get_command("/search #chat")
+    command()
+    assert command.output.startswith("Неверное кол-во аргументов")
+    client.exit_client()
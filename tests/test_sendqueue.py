@@ -0,0 +1,54 @@
+import pytest
+
+from unittest import mock
+from irc.sendqueue import SendQueue
+
+
+def test_coalescing():
+    queue = SendQueue(5, 0.5, 100)
+    queue.put(b"NICK nick\r\nUSER 1 1 1 1\r\n")
+    queue.put(b"JOIN #channel\r\n")
+    data, delay = queue.pop_batch()
+    assert data == b"NICK nick\r\nUSER 1 1 1 1\r\nJOIN #channel\r\n"
+    assert delay is None
+    assert queue.sent_batches == 1 and queue.sent_lines == 3
+
+
+def test_rate_limit_and_priority():
+    queue = SendQueue(2, 0.5, 100)
+    queue.put(b"PRIVMSG #a :1\r\nPRIVMSG #a :2\r\nPRIVMSG #a :3\r\n")
+    data, delay = queue.pop_batch()
+    assert data == b"PRIVMSG #a :1\r\nPRIVMSG #a :2\r\n"
+    assert delay == pytest.approx(2, abs=0.1)
+
+    queue.put(b"PONG :server\r\nQUIT\r\n")
+    data, delay = queue.pop_batch()
+    assert data == b"PONG :server\r\nQUIT\r\n"
+    assert queue.depth == 1
+    assert delay > 2
+
+
+def test_priority_order():
+    queue = SendQueue(10, 0, 100)
+    queue.put(b"PRIVMSG #a :text\r\nMODE #a +i\r\n@tag=1 PONG :s\r\n")
+    data, _ = queue.pop_batch()
+    assert data == b"@tag=1 PONG :s\r\nMODE #a +i\r\nPRIVMSG #a :text\r\n"
+
+
+def test_overflow():
+    queue = SendQueue(1, 0.5, 2)
+    queue.put(b"PRIVMSG #a :1\r\nPRIVMSG #a :2\r\n")
+    queue.put(b"PRIVMSG #a :3\r\nPONG :s\r\n")
+    assert queue.depth == 3
+    assert queue.stats()["dropped_lines"] == 1
+
+
+def test_quit_skips_ahead_on_disconnect(tested_client):
+    tested_client.is_registered = True
+    queue = tested_client.active.send_queue
+    queue.put(b"".join(b"PRIVMSG #test :%d\r\n" % i for i in range(20)))
+    with mock.patch.object(tested_client.active, "sock") as sock:
+        tested_client.process_user_input("/quit")
+    data = b"".join(call.args[0] for call in sock.sendall.call_args_list)
+    assert data.startswith(b"QUIT\r\nPRIVMSG #test :0\r\n")
+    sock.close.assert_called_once()
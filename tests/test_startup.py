@@ -0,0 +1,78 @@
+import os
+import subprocess
+import sys
+
+from irc.engine import AsyncEngine
+from irc.testing.fake_server import FakeIrcServer
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+STARTUP_BUDGET = 0.1
+HEAVY_MODULES = {
+    "asyncio",
+    "ssl",
+    "sqlite3",
+    "http.server",
+    "PyQt5",
+    "irc.models.commands",
+    "irc.models.messages",
+}
+
+
+def run_python(*args: str, cwd: str = ROOT) -> subprocess.CompletedProcess:
+    env = dict(os.environ, PYTHONPATH=ROOT)
+    return subprocess.run(
+        [sys.executable, *args],
+        cwd=cwd,
+        env=env,
+        capture_output=True,
+        text=True,
+        timeout=30,
+    )
+
+
+def measure_startup() -> tuple:
+    code = (
+        "import sys, irc.__main__, irc.cli.app\n"
+        "print(' '.join(sys.modules))"
+    )
+    result = run_python("-X", "importtime", "-c", code)
+    total = 0
+    for line in result.stderr.splitlines()[1:]:
+        _, cumulative, name = line.split("|")
+        if name.startswith(" irc"):
+            total += int(cumulative)
+    return total / 1e6, set(result.stdout.split())
+
+
+def test_cli_startup_budget():
+    elapsed, modules = min(measure_startup() for _ in range(3))
+    assert not HEAVY_MODULES & modules
+    assert elapsed < STARTUP_BUDGET
+
+
+def test_headless_runs_script(tmp_path):
+    engine = AsyncEngine()
+    engine.start()
+    server = FakeIrcServer()
+    engine.run(server.start())
+    (tmp_path / "config.ini").write_text(
+        "[Settings]\nnickname = Script\ncodepage = utf-8\n\n[Servers]\n"
+    )
+    try:
+        result = run_python(
+            "-m",
+            "irc",
+            "headless",
+            f"/server 127.0.0.1 {server.port}",
+            "/join #script",
+            "/pm #script hello",
+            "/exit",
+            cwd=str(tmp_path),
+        )
+        assert result.returncode == 0, result.stderr
+        assert [line for _, line in server.history["#script"]] == [
+            ":Script!1@127.0.0.1 PRIVMSG #script :hello"
+        ]
+    finally:
+        engine.run(server.stop())
+        engine.stop()
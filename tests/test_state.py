@@ -0,0 +1,96 @@
+import os
+import stat
+
+from configparser import ConfigParser
+from unittest import mock
+
+from irc.cli.view import CliView
+from irc.client import Client
+from irc.state import StateStore
+
+CONFIG = """[Settings]
+nickname = TestName
+codepage = cp1251
+ping_interval = 60
+
+[Servers]
+irc.ircnet.su = #casual
+irc.libera.chat +6697 =
+"""
+
+
+def read_config(path) -> ConfigParser:
+    config = ConfigParser(allow_no_value=True)
+    config.read(path, encoding="utf-8")
+    return config
+
+
+def test_changes_are_saved_atomically(tmp_path):
+    path = tmp_path / "config.ini"
+    path.write_text(CONFIG, encoding="utf-8")
+    client = Client(
+        "TestName", "cp1251", {"irc.ircnet.su": "#casual"}, CliView()
+    )
+    client.state = StateStore(str(path), interval=0.05)
+    client.process_user_input("/chcp koi8_r")
+    client.process_user_input("/nick Renamed")
+    client.exit_client()
+
+    config = read_config(path)
+    assert config["Settings"]["nickname"] == "Renamed"
+    assert config["Settings"]["codepage"] == "koi8_r"
+    assert config["Settings"]["ping_interval"] == "60"
+    assert config["Servers"]["irc.libera.chat +6697"] == ""
+    assert os.listdir(tmp_path) == ["config.ini"]
+
+
+def test_joined_channels_are_saved(tested_client, tmp_path):
+    path = tmp_path / "config.ini"
+    path.write_text(CONFIG, encoding="utf-8")
+    tested_client.favourites["test_server"] = ""
+    tested_client.state = StateStore(str(path), interval=0.05)
+    with mock.patch.object(tested_client.active, "sock"):
+        tested_client.process_user_input("/join #second")
+    tested_client.state.close()
+    assert read_config(path)["Servers"]["test_server"] == "#second,#test"
+
+
+def test_saves_are_debounced(tmp_path):
+    path = tmp_path / "config.ini"
+    path.write_text(CONFIG, encoding="utf-8")
+    store = StateStore(str(path), interval=10)
+    for i in range(100):
+        store.save({"nickname": f"n{i}", "codepage": "cp866", "servers": {}})
+    store.close()
+    assert store.saved_count == 1
+    assert read_config(path)["Settings"]["nickname"] == "n99"
+
+
+def test_fallback_nick_is_not_saved(tested_client, tmp_path):
+    path = tmp_path / "config.ini"
+    path.write_text(CONFIG, encoding="utf-8")
+    tested_client.state = StateStore(str(path), interval=0.05)
+    with mock.patch.object(tested_client.active, "sock"):
+        tested_client.active.handle_data(
+            b":srv 433 * TestName :Nickname is already in use\r\n"
+            b":srv 001 TestName_ :Welcome\r\n"
+        )
+        assert tested_client.nickname == "TestName_"
+        tested_client.state.close()
+        assert read_config(path)["Settings"]["nickname"] == "TestName"
+
+        tested_client.state = StateStore(str(path), interval=0.05)
+        tested_client.process_user_input("/nick Renamed")
+        tested_client.active.handle_data(b":TestName_!u@h NICK :Renamed\r\n")
+    tested_client.state.close()
+    assert read_config(path)["Settings"]["nickname"] == "Renamed"
+
+
+def test_file_mode_is_kept(tmp_path):
+    path = tmp_path / "config.ini"
+    path.write_text(CONFIG, encoding="utf-8")
+    path.chmod(0o644)
+    store = StateStore(str(path), interval=0.05)
+    store.save({"nickname": "Никита", "codepage": "utf-8", "servers": {}})
+    store.close()
+    assert stat.S_IMODE(path.stat().st_mode) == 0o644